@@ -0,0 +1,332 @@
+"""
+Benchmarks the frame-processing hot path stage by stage.
+
+Usage (from the project root):
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --tolerance 0.15
+    python benchmarks/run_benchmarks.py --source recording.landmarks --stages full_loop
+
+Every stage reports frames/sec and p50/p95/p99 latency. In compare mode the
+script exits with status 1 if any stage regressed against the baseline.
+"""
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+from core.action_dispatcher import ActionDispatcher
+from core.calibrator import Calibrator
+from core.config_manager import ConfigManager
+from core.detection_scheduler import DetectionScheduler
+from core.expression_analyzer import get_eyebrows_raised_ratio, get_mouth_open_ratio, get_smile_ratio
+from core.face_roi import FaceRoi
+from core.frame_pipeline import FramePipeline
+from core.gesture_registry import GESTURE_REGISTRY, GestureFeatureEngine
+from core.landmark_frame import LandmarkFrame
+from core.motion_gate import MotionGate
+from core.output_backends import RecordingBackend, compile_action
+from core.perf_stats import compare_results, summarize_latencies
+from core.ratio_filter import Hysteresis, RatioFilter
+
+MONITORED_EXPRESSIONS = list(GESTURE_REGISTRY.keys())
+# ConfigManager writes a default file when it is missing, keep it out of the repository
+CONFIG_DIRECTORY = tempfile.TemporaryDirectory()
+
+
+def synthetic_landmarks(rng, open_mouth=False):
+    """A plausible 468 point face centered in the image."""
+    points = rng.uniform(0.3, 0.7, (468, 3)).astype(np.float32); points[:, 2] *= 0.1
+    points[33] = (0.38, 0.42, 0); points[263] = (0.62, 0.42, 0)
+    points[13] = (0.5, 0.62, 0); points[14] = (0.5, 0.72 if open_mouth else 0.63, 0)
+    return LandmarkFrame(points, image_size=(640, 480))
+
+
+class SyntheticDetector:
+    """Returns alternating synthetic faces, so the loop measures everything but FaceMesh."""
+    def __init__(self, rng): self.faces = [synthetic_landmarks(rng, i % 20 >= 10) for i in range(20)]; self.index = 0
+    def detect_landmarks(self, frame_rgb):
+        self.index += 1
+        return types.SimpleNamespace(multi_face_landmarks=[self.faces[self.index % len(self.faces)]])
+    def close(self): pass
+
+
+class SyntheticSource:
+    """Endless frames with some texture, delivered without pacing. Flips them like WebcamHandler."""
+    threaded = False
+    def __init__(self, rng, size=(640, 480)):
+        self.frames = [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(4)]; self.last_timestamp = None; self.index = 0
+    def read_frame(self):
+        self.index += 1; self.last_timestamp = time.monotonic()
+        frame = self.frames[self.index % len(self.frames)]
+        return True, cv2.flip(frame, 1)
+    def is_opened(self): return True
+    def release(self): pass
+
+
+def time_stage(function, iterations, warmup):
+    samples = np.empty(iterations, dtype=np.int64)
+    # The pipeline logs triggers and calibration phases with print(); keep them out of the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup): function()
+        for i in range(iterations):
+            started = time.perf_counter_ns()
+            function()
+            samples[i] = time.perf_counter_ns() - started
+    return summarize_latencies(samples)
+
+
+def make_drawing_utils_renderer():
+    import mediapipe as mp
+    from gui import drawing_utils
+    return lambda image, landmark_frame, in_place=False: drawing_utils.draw_landmarks_on_image(
+        image, landmark_frame, mp_drawing=mp.solutions.drawing_utils,
+        mp_face_mesh=mp.solutions.face_mesh, mp_drawing_styles=mp.solutions.drawing_styles, in_place=in_place)
+
+def make_overlay_renderer(level="full"):
+    from gui.overlay_renderer import OverlayRenderer
+    return OverlayRenderer(level=level)
+
+
+def make_pipeline(overlay_renderer=None, settings=None):
+    config_manager = ConfigManager(os.path.join(CONFIG_DIRECTORY.name, "benchmark_config.json"))
+    config_manager.save = lambda: True # Never touch the disk from the benchmark
+    config_manager.config_data["settings"].update(settings or {})
+    return FramePipeline(config_manager, Calibrator(), MONITORED_EXPRESSIONS, overlay_renderer=overlay_renderer, action_executor=lambda key, action: None)
+
+
+def bench_analyzer(context):
+    face = context["face"]
+    return lambda: (get_mouth_open_ratio(face), get_eyebrows_raised_ratio(face), get_smile_ratio(face))
+
+def bench_feature_engine(context):
+    engine, face = GestureFeatureEngine(), context["face"]
+    return lambda: engine.compute_dict(face)
+
+def bench_calibrator(context):
+    calibrator, face = Calibrator(), context["face"]
+    timestamps = itertools.count(0.0, 1 / 30) # Simulated 30 fps, so every phase is run through
+    def step():
+        if not calibrator.is_calibrating(): calibrator.start(MONITORED_EXPRESSIONS)
+        calibrator.process_landmarks(face, next(timestamps))
+    return step
+
+def bench_draw_landmarks(context):
+    renderer, frame, face = make_drawing_utils_renderer(), context["frame"], context["face"]
+    return lambda: renderer(frame, face)
+
+def bench_overlay_renderer(context, level):
+    renderer, frame, face = make_overlay_renderer(level), context["frame"], context["face"]
+    return lambda: renderer(frame, face)
+
+def bench_convert_cv_qt(context):
+    from PyQt6.QtWidgets import QApplication
+    from gui.main_window import convert_cv_qt
+    context["qt_app"] = QApplication.instance() or QApplication(sys.argv[:1])
+    frame = context["frame"]
+    return lambda: convert_cv_qt(frame)
+
+def bench_action_dispatch(context):
+    """Cost of handing a triggered action to the dispatcher thread, as seen by the frame loop."""
+    dispatcher = ActionDispatcher(lambda key, action: None, max_pending=len(MONITORED_EXPRESSIONS))
+    dispatcher.start()
+    context["cleanup"].append(dispatcher.shutdown)
+    counter = iter(range(1 << 62))
+    action = compile_action({"type": "press", "value": "a"})
+    return lambda: dispatcher.submit(MONITORED_EXPRESSIONS[next(counter) % len(MONITORED_EXPRESSIONS)], action)
+
+def bench_trigger_to_keystroke(context):
+    """Time from submitting a hotkey until its last key event was injected, through the dispatcher thread."""
+    backend = RecordingBackend()
+    dispatcher = ActionDispatcher(backend=backend)
+    dispatcher.start()
+    context["cleanup"].append(dispatcher.shutdown)
+    action = compile_action({"type": "hotkey", "value": "ctrl,shift,s"})
+    def step():
+        backend.clear()
+        dispatcher.submit("smile", action)
+        backend.wait_for_events(6)
+    return step
+
+def bench_config_save(context, write_behind):
+    """Cost of toggling a gesture as seen by the GUI thread, writing to a temporary directory."""
+    directory = tempfile.TemporaryDirectory()
+    manager = ConfigManager(os.path.join(directory.name, "config.json"), write_behind=write_behind)
+    context["cleanup"] += [manager.close, directory.cleanup]
+    counter = iter(range(1 << 62))
+    return lambda: manager.update_gesture_enabled("smile", next(counter) % 2 == 0)
+
+def make_video_widget(context):
+    from PyQt6.QtGui import QImage
+    from gui.video_widget import VideoWidget
+    bench_convert_cv_qt(context) # Ensures a QApplication exists
+    widget = VideoWidget(max_fps=0)
+    widget.resize(640, 480)
+    target = QImage(widget.size(), QImage.Format.Format_RGB32)
+    context["cleanup"].append(widget.close)
+    def paint(frame):
+        widget.set_frame(frame)
+        widget.render(target)
+    return paint
+
+def bench_video_widget_paint(context):
+    paint, frame = make_video_widget(context), context["frame"]
+    return lambda: paint(frame)
+
+def bench_triggers(context):
+    pipeline = make_pipeline()
+    states = [{key: (i // 10) % 2 == 0 for key in MONITORED_EXPRESSIONS} for i in range(20)]
+    enabled = {key: True for key in MONITORED_EXPRESSIONS}
+    counter = iter(range(1 << 62))
+    def step():
+        i = next(counter)
+        pipeline._handle_triggers(states[i % 20], enabled, i / 30)
+    return step
+
+def bench_ratio_filter(context):
+    ratios, counter = context["rng"].uniform(0.0, 0.6, (30, len(MONITORED_EXPRESSIONS))), iter(range(1 << 62))
+    ratio_filter, hysteresis = RatioFilter(len(MONITORED_EXPRESSIONS), "one_euro"), Hysteresis(np.full(len(MONITORED_EXPRESSIONS), 0.35), np.full(len(MONITORED_EXPRESSIONS), 0.25))
+    def step():
+        i = next(counter)
+        hysteresis(ratio_filter(ratios[i % 30], i / 30))
+    return step
+
+def bench_motion_gate(context):
+    gate, frame = MotionGate(), context["frame"]
+    gate.update(frame, context["face"], 0.0)
+    return lambda: gate.check(frame, 0.0)
+
+def bench_detection_scheduler(context):
+    scheduler, counter = DetectionScheduler(budget_ms=1e12), iter(range(1 << 62))
+    hysteresis, ratios = Hysteresis(np.full(len(MONITORED_EXPRESSIONS), 0.35)), np.full(len(MONITORED_EXPRESSIONS), 0.05)
+    scheduler.update(context["face"], -0.2); scheduler.update(context["face"], 0.0)
+    hysteresis(ratios); scheduler.plan(ratios, hysteresis, 0.0)
+    def step():
+        timestamp = next(counter) / 1e6
+        scheduler.plan(ratios, hysteresis, timestamp)
+        scheduler.check(timestamp)
+    return step
+
+def bench_face_roi_crop(context):
+    """Detector input preparation on a 1080p frame: crop, resize, convert to RGB and map the landmarks back."""
+    face_roi, frame = FaceRoi(), context["rng"].integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+    region = (810, 390, 300) # A face of about 230 pixels with the default margin
+    def step():
+        face_roi.crop_rgb(frame, region)
+        face_roi.to_frame_coordinates(context["face"], region, 1920, 1080)
+    return step
+
+def bench_full_loop(context, size=(640, 480), **settings):
+    paint = make_video_widget(context)
+    pipeline = make_pipeline(make_overlay_renderer(), settings)
+    if context["source"] is None:
+        pipeline.webcam, pipeline.detector = SyntheticSource(context["rng"], size), SyntheticDetector(context["rng"])
+        context["meta"]["full_loop_input"] = "synthetic frames and landmarks"
+    else:
+        from core.frame_sources import open_frame_source
+        pipeline.webcam = open_frame_source(context["source"], pacing="fast", loop=True)
+        if hasattr(pipeline.webcam, "read_detection"): pipeline.detector = pipeline.webcam
+        else:
+            from core.landmark_detector import LandmarkDetector
+            pipeline.detector = LandmarkDetector(max_faces=1)
+        context["meta"]["full_loop_input"] = context["source"]
+        context["cleanup"].append(pipeline.webcam.release)
+    def step():
+        result = None
+        while result is None: result = pipeline.step()
+        if result.frame is not None: paint(result.frame)
+    return step
+
+STAGES = {
+    "analyzer_ratios": bench_analyzer,
+    "feature_engine": bench_feature_engine,
+    "calibrator_process_landmarks": bench_calibrator,
+    "draw_landmarks_on_image": bench_draw_landmarks,
+    "overlay_renderer_full": lambda context: bench_overlay_renderer(context, "full"),
+    "overlay_renderer_contours": lambda context: bench_overlay_renderer(context, "contours"),
+    "overlay_renderer_keypoints": lambda context: bench_overlay_renderer(context, "keypoints"),
+    "convert_cv_qt": bench_convert_cv_qt,
+    "video_widget_paint": bench_video_widget_paint,
+    "ratio_filter": bench_ratio_filter,
+    "motion_gate_check": bench_motion_gate,
+    "face_roi_crop": bench_face_roi_crop,
+    "detection_scheduler": bench_detection_scheduler,
+    "handle_triggers": bench_triggers,
+    "action_dispatch": bench_action_dispatch,
+    "trigger_to_keystroke": bench_trigger_to_keystroke,
+    "config_save": lambda context: bench_config_save(context, write_behind=False),
+    "config_save_write_behind": lambda context: bench_config_save(context, write_behind=True),
+    "full_loop": bench_full_loop,
+    "full_loop_motion_gate": lambda context: bench_full_loop(context, motion_gate=True),
+    "full_loop_adaptive_detection": lambda context: bench_full_loop(context, adaptive_detection=True),
+    "full_loop_1080p": lambda context: bench_full_loop(context, size=(1920, 1080)),
+    "full_loop_1080p_display_overlay": lambda context: bench_full_loop(context, overlay_resolution="display", size=(1920, 1080)),
+}
+
+
+def run(stage_names, iterations, warmup, source=None):
+    rng = np.random.default_rng(42)
+    context = {"rng": rng, "face": synthetic_landmarks(rng), "frame": rng.integers(0, 255, (480, 640, 3), dtype=np.uint8),
+               "source": source, "cleanup": [],
+               "meta": {"created": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                        "platform": platform.platform(), "numpy": np.__version__, "opencv": cv2.__version__,
+                        "iterations": iterations, "warmup": warmup}}
+    stages = {}
+    try:
+        for name in stage_names:
+            try:
+                function = STAGES[name](context)
+            except ImportError as e:
+                print(f"Skipping {name}: {e}"); continue
+            stage_iterations = max(1, iterations // 10) if name.startswith("full_loop") else iterations
+            stages[name] = time_stage(function, stage_iterations, warmup)
+            print(f"{name:32s} {stages[name]['fps']:>12.1f} fps  p50 {stages[name]['p50_ms']:.3f} ms  p95 {stages[name]['p95_ms']:.3f} ms  p99 {stages[name]['p99_ms']:.3f} ms")
+    finally:
+        for cleanup in context["cleanup"]: cleanup()
+    return {"meta": context["meta"], "stages": stages}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="Stages to run (default: all).")
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed iterations per stage (the full loop runs a tenth).")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed iterations before measuring.")
+    parser.add_argument("--source", help="Video file, image directory or .landmarks archive driving the full loop.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a baseline JSON file and fail on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown in compare mode.")
+    parser.add_argument("--min-delta-ms", type=float, default=0.01, help="Ignore slowdowns smaller than this many milliseconds.")
+    args = parser.parse_args(argv)
+
+    results = run(args.stages, args.iterations, args.warmup, args.source)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f: baseline = json.load(f)
+        regressions = compare_results(results["stages"], baseline.get("stages", {}), args.tolerance, args.min_delta_ms)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} {r['metric']}: {r['baseline']} -> {r['current']} ({r['change']:+.1%})")
+        if regressions: return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
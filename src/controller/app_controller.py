@@ -1,19 +1,28 @@
 import sys
-import cv2
-import pyautogui
 import mediapipe as mp
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
 from PyQt6.QtWidgets import QDialog, QMessageBox
 
 from core.config_manager import ConfigManager
-from core.webcam_handler import WebcamHandler
+from core.frame_sources import open_frame_source
 from core.calibrator import Calibrator
-from core.expression_analyzer import get_mouth_open_ratio, get_eyebrows_raised_ratio, get_smile_ratio
+from core.frame_pipeline import FramePipeline
+from core.action_dispatcher import ActionDispatcher
+from core.output_backends import create_output_backend
+from core.detection_process import DetectionProcess
+from core.gesture_registry import gesture_landmark_indices
+from core.landmark_archive import LandmarkRecorder
+from core.load_governor import LoadGovernor
 
 from gui.main_window import MainWindow
 from gui.set_action_dialog import SetActionDialog
-from gui import drawing_utils
+from gui.overlay_renderer import OverlayRenderer
+from controller.pipeline_worker import PipelineWorker
 import os
+import time
+
+FRAME_INTERVAL_MS = 30
 
 class AppController(QObject):
     def __init__(self, app):
@@ -25,10 +34,10 @@ class AppController(QObject):
         config_file_path = os.path.abspath(os.path.join(script_dir, "..", "..", "config.json"))
         self.config_manager = ConfigManager(config_file_path=config_file_path)
 
-        self.calibrator = Calibrator()
+        self.calibrator = Calibrator(phase_ms=self.config_manager.get_setting("calibration_phase_ms", 2000),
+                                     statistic=self.config_manager.get_setting("calibration_statistic", "mean"))
         self.webcam = None
         self.detector = None
-        self.mp_drawing = mp.solutions.drawing_utils
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_drawing_styles = mp.solutions.drawing_styles
 
@@ -41,13 +50,28 @@ class AppController(QObject):
 
         self.is_capturing = False
         self.current_expression_states = {expr: False for expr in self.monitored_expressions}
-        self.active_frame_counts = {expr: 0 for expr in self.monitored_expressions}
+
+        self.overlay_renderer = OverlayRenderer(self.mp_face_mesh, self.mp_drawing_styles, level=self.config_manager.get_setting("overlay_level", "full"))
+        self.action_dispatcher = ActionDispatcher(rate_limit_ms=self.config_manager.get_setting("action_rate_limit_ms", 0),
+                                                  max_pending=self.config_manager.get_setting("action_queue_size", 8),
+                                                  backend=create_output_backend(self.config_manager.get_setting("output_backend", "pyautogui")))
+        self.action_dispatcher.start()
+        self.pipeline = FramePipeline(self.config_manager, self.calibrator, self.monitored_expressions, overlay_renderer=self.overlay_renderer, action_executor=self.action_dispatcher)
+        self.worker = None
 
         self.view = MainWindow(self.monitored_expressions)
+        self.view.video_widget.profiler = self.pipeline.profiler
+        self.view.video_widget.display_size_changed.connect(self._on_display_size_changed)
+        self.view.video_widget.set_max_fps(self.config_manager.get_setting("display_max_fps", 60))
         self._update_view_action_displays()
 
         self.timer = QTimer()
-        self.timer.setInterval(30)
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+        self.frame_interval_ms = FRAME_INTERVAL_MS
+        self._showing_idle = False
+        self.governor = None
+        self._capture_size = None
+        self._capture_scale = 1.0
         self.timer.timeout.connect(self._process_frame)
 
         self._connect_signals()
@@ -57,7 +81,15 @@ class AppController(QObject):
         print("Controller: Loading settings...")
         self.thresholds = self.config_manager.get_thresholds()
         self.enabled_gestures = self.config_manager.get_enabled_gestures()
-        self.hold_frames = self.config_manager.get_setting("hold_frames", 5)
+        self.hold_ms = self.config_manager.get_setting("hold_ms", 130)
+        self.pipeline_mode = self.config_manager.get_setting("pipeline_mode", "worker_thread")
+        if hasattr(self, 'action_dispatcher'):
+            self.action_dispatcher.set_rate_limit(self.config_manager.get_setting("action_rate_limit_ms", 0))
+            backend_name = self.config_manager.get_setting("output_backend", "pyautogui")
+            if backend_name != self.action_dispatcher.backend.name: self.action_dispatcher.backend = create_output_backend(backend_name)
+        if hasattr(self, 'overlay_renderer'): self.overlay_renderer.set_level(self.config_manager.get_setting("overlay_level", "full"))
+        if hasattr(self, 'pipeline'): self.pipeline.load_settings()
+        if hasattr(self, 'view'): self.view.video_widget.set_max_fps(self.config_manager.get_setting("display_max_fps", 60))
 
     def _update_view_action_displays(self):
         actions = self.config_manager.get_actions()
@@ -70,7 +102,7 @@ class AppController(QObject):
     def _print_initial_config(self):
         print("--- Initial Configuration (Controller) ---")
         actions = self.config_manager.get_actions()
-        print(f"Hold Frames Required: {self.hold_frames}")
+        print(f"Hold Time Required: {self.hold_ms} ms")
         for key in self.monitored_expressions:
              print(f"{key.replace('_',' ').title()} Threshold: {self.thresholds.get(key)}")
              action_display = self.view._format_action_for_display(actions.get(key))
@@ -97,9 +129,21 @@ class AppController(QObject):
         print("Controller: Start Capture Requested")
         if not self.is_capturing:
             try:
+                if self.config_manager.get_setting("pipeline_mode", "worker_thread") == "process":
+                    if self.webcam is None:
+                        print("Starting DetectionProcess...")
+                        frame_size = (self.config_manager.get_setting("capture_width", 640), self.config_manager.get_setting("capture_height", 480))
+                        self.webcam = DetectionProcess(source=self.config_manager.get_setting("capture_source", 0), frame_size=frame_size, max_faces=1,
+                                                       pacing=self.config_manager.get_setting("source_pacing", "realtime"), loop=bool(self.config_manager.get_setting("source_loop", False)))
+                    elif isinstance(self.webcam, DetectionProcess): self.webcam.resume() # Paused by stop_capture
                 if self.webcam is None:
-                    print("Initializing WebcamHandler...")
-                    self.webcam = WebcamHandler(source=0)
+                    print("Initializing frame source...")
+                    self.webcam = open_frame_source(self.config_manager.get_setting("capture_source", 0),
+                                                    threaded=bool(self.config_manager.get_setting("threaded_capture", True)),
+                                                    pacing=self.config_manager.get_setting("source_pacing", "realtime"),
+                                                    loop=bool(self.config_manager.get_setting("source_loop", False)))
+                if self.detector is None and hasattr(self.webcam, "read_detection"):
+                    self.detector = self.webcam # The source delivers landmarks (detection process or replay)
                 if self.detector is None:
                     print("Importing and Initializing LandmarkDetector...")
                     from core.landmark_detector import LandmarkDetector
@@ -112,9 +156,15 @@ class AppController(QObject):
                  self.view.show_message("Error", f"Failed to initialize components: {e}", type='critical'); self.webcam = None; self.detector = None; return
 
             self._load_settings()
-            self.active_frame_counts = {expr: 0 for expr in self.monitored_expressions}
+            self.pipeline.webcam = self.webcam
+            self.pipeline.detector = self.detector
+            self.pipeline.reset_trigger_state()
+            self.pipeline.profiler.reset()
+            self._start_recording()
+            self._start_governor()
             self.is_capturing = True
-            self.timer.start()
+            if self.pipeline_mode in ("worker_thread", "process"): self._start_worker()
+            else: self.timer.start()
             self.enabled_gestures = self.config_manager.get_enabled_gestures()
             self.view.set_capture_controls_state(True, self.enabled_gestures)
             print("Detection started by Controller.")
@@ -122,18 +172,96 @@ class AppController(QObject):
     def stop_capture(self):
         print("Controller: Stop Capture Received")
         if self.is_capturing:
+            self.is_capturing = False
+            self.timer.stop()
+            self._stop_worker()
+            self._stop_recording()
+            self._stop_governor()
+            # The child process would keep the camera and FaceMesh busy while nothing reads its frames
+            if isinstance(self.webcam, DetectionProcess): self.webcam.pause()
+            self.action_dispatcher.cancel_pending()
             if self.calibrator.is_calibrating():
                  print("Controller: Stopping calibration due to capture stop.")
                  self.calibrator.state = "idle"
                  self.view.set_calibration_controls_state(False)
 
-            self.is_capturing = False
-            self.timer.stop()
             enabled_gestures = self.config_manager.get_enabled_gestures()
             self.view.set_capture_controls_state(False, enabled_gestures)
-            self.active_frame_counts = {expr: 0 for expr in self.monitored_expressions}
+            self.pipeline.reset_trigger_state()
             print("Detection stopped by Controller.")
 
+    def _start_recording(self):
+        path = self.config_manager.get_setting("landmark_recording_path", "")
+        if not path: return
+        indices = gesture_landmark_indices() if self.config_manager.get_setting("landmark_recording_subset", "gestures") == "gestures" else None
+        dtype = np.float32 if self.config_manager.get_setting("landmark_recording_dtype", "float16") == "float32" else np.float16
+        try:
+            self.pipeline.landmark_recorder = LandmarkRecorder(path, landmark_indices=indices, dtype=dtype, append=True)
+        except (OSError, ValueError) as e:
+            self.view.show_message("Recording", f"Could not record landmarks to {path}: {e}", type='warning')
+
+    def _stop_recording(self):
+        recorder = self.pipeline.landmark_recorder
+        if recorder is None: return
+        self.pipeline.landmark_recorder = None
+        recorder.close()
+
+    def _start_governor(self):
+        self.frame_interval_ms = FRAME_INTERVAL_MS
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+        if not self.config_manager.get_setting("governor", False): self.governor = None; return
+        baseline = {"display_fps": self.config_manager.get_setting("display_max_fps", 60), "overlay_level": self.overlay_renderer.level,
+                    "frame_interval_ms": FRAME_INTERVAL_MS, "capture_scale": 1.0}
+        self.governor = LoadGovernor(baseline, metric=self.config_manager.get_setting("governor_metric", "latency"),
+                                     target_ms=self.config_manager.get_setting("governor_target_ms", 20.0),
+                                     target_cpu_percent=self.config_manager.get_setting("governor_target_cpu_percent", 50.0),
+                                     hysteresis=self.config_manager.get_setting("governor_hysteresis", 0.2),
+                                     window_ms=self.config_manager.get_setting("governor_window_ms", 2000))
+        self._capture_size = self.webcam.get_resolution() if hasattr(self.webcam, "get_resolution") else None
+        self._capture_scale = 1.0
+        print(f"Controller: Load governor started, target {self.governor.target} ({self.governor.metric}).")
+
+    def _stop_governor(self):
+        if self.governor is None: return
+        self.governor.set_level(0)
+        self._apply_governor_decisions() # Restores the capture resolution for the next start
+        self.frame_interval_ms = FRAME_INTERVAL_MS
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+
+    def _apply_governor_decisions(self):
+        decisions = self.governor.decisions
+        print(f"Controller: Load governor level {self.governor.level}/{len(self.governor.steps)} (load {self.governor.load}): {decisions}")
+        self.view.video_widget.set_max_fps(decisions["display_fps"])
+        with self.pipeline.lock: self.overlay_renderer.set_level(decisions["overlay_level"])
+        self.frame_interval_ms = decisions["frame_interval_ms"]
+        # Fast-paced file sources keep running back to back
+        if self.worker is not None and self.worker.interval_s > 0: self.worker.interval_s = self.frame_interval_ms / 1000.0
+        scale = decisions["capture_scale"]
+        if scale != self._capture_scale and self._capture_size is not None:
+            self._capture_scale = scale
+            self.webcam.set_resolution(round(self._capture_size[0] * scale), round(self._capture_size[1] * scale))
+
+    def _start_worker(self):
+        print("Controller: Starting pipeline worker thread...")
+        # Fast-paced file sources are processed back to back instead of at the timer rate
+        interval_ms = 0 if getattr(self.webcam, "pacing", None) == "fast" else self.frame_interval_ms
+        self.worker = PipelineWorker(self.pipeline, interval_ms=interval_ms)
+        self.worker.frame_ready.connect(self._on_frame_ready, Qt.ConnectionType.QueuedConnection)
+        self.worker.start()
+
+    def _stop_worker(self):
+        if self.worker is None: return
+        print("Controller: Stopping pipeline worker thread...")
+        self.worker.stop()
+        print(f"Controller: Worker dropped {self.worker.dropped_results} results while the GUI was busy.")
+        self.worker.deleteLater()
+        self.worker = None
+
+    def _on_frame_ready(self, result):
+        if self.worker is None: return # Result queued before the worker was stopped
+        self._present_frame_result(result)
+        if self.worker is not None: self.worker.acknowledge_frame()
+
     def start_calibration(self):
         print("Controller: Calibration Requested")
         if not self.is_capturing or not self.webcam or not self.detector:
@@ -144,7 +272,9 @@ class AppController(QObject):
         if not enabled_gestures_keys:
              self.view.show_message("Calibration", "No gestures enabled for calibration...", type='warning'); return
 
-        if self.calibrator.start(enabled_gestures_keys):
+        with self.pipeline.lock:
+            calibration_started = self.calibrator.start(enabled_gestures_keys)
+        if calibration_started:
             print("Controller: Starting calibration process...")
             self.view.set_calibration_controls_state(True)
         else:
@@ -155,6 +285,7 @@ class AppController(QObject):
          current_action = self.config_manager.get_action(expression_key)
          if new_action_config != current_action:
              if self.config_manager.update_action(expression_key, new_action_config):
+                 self.pipeline.load_actions()
                  if hasattr(self.view, 'update_action_displays'): self._update_view_action_displays()
                  elif hasattr(self.view, 'update_action_combos'): self.view.update_action_combos(self.config_manager.get_actions())
 
@@ -173,6 +304,7 @@ class AppController(QObject):
             if new_action != current_action:
                 print(f"Controller: Updating action for '{expression_key}'...")
                 if self.config_manager.update_action(expression_key, new_action):
+                    self.pipeline.load_actions()
                     if hasattr(self.view, 'update_action_displays'): self._update_view_action_displays()
                     elif hasattr(self.view, 'update_action_combos'): self.view.update_action_combos(self.config_manager.get_actions())
                     self.view.show_message("Configuration", f"Action for '{expression_key}' updated.", type='info')
@@ -192,7 +324,7 @@ class AppController(QObject):
                   self.view.action_combos[expression_key].setEnabled(is_enabled and self.is_capturing)
 
              if not is_enabled:
-                 if expression_key in self.active_frame_counts: self.active_frame_counts[expression_key] = 0
+                 self.pipeline.reset_expression(expression_key)
                  if expression_key in self.current_expression_states: self.current_expression_states[expression_key] = False
              self.view.update_expression_status(self.current_expression_states, self.enabled_gestures)
         else:
@@ -200,94 +332,100 @@ class AppController(QObject):
 
     def _process_frame(self):
         if not self.is_capturing or not self.webcam or not self.detector: return
-
-        success, frame = self.webcam.read_frame()
-        if not success or frame is None: self.view.update_video_display(None); return
-
-        processing_frame = frame.copy()
-        frame_rgb = cv2.cvtColor(processing_frame, cv2.COLOR_BGR2RGB)
-        frame_rgb.flags.writeable = False
-        results = self.detector.detect_landmarks(frame_rgb)
-        annotated_frame = processing_frame
-        face_landmarks = results.multi_face_landmarks[0] if results.multi_face_landmarks else None
-
-        current_enabled_status = self.config_manager.get_enabled_gestures()
-
-        if self.calibrator.is_calibrating():
-            self.calibrator.process_landmarks(face_landmarks)
-            instruction = self.calibrator.get_current_instruction()
-            if face_landmarks:
-                 annotated_frame = drawing_utils.draw_landmarks_on_image(processing_frame, results, self.mp_drawing, self.mp_face_mesh, self.mp_drawing_styles)
-                 cv2.putText(annotated_frame, f"CALIBRATING: {instruction}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2, cv2.LINE_AA)
-            else:
-                 cv2.putText(annotated_frame, f"CALIBRATING: {instruction}\n(Look at camera)", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2, cv2.LINE_AA)
-
-            self.view.update_expression_status({}, current_enabled_status)
-
-            if self.calibrator.state == "done" or self.calibrator.state == "error":
-                 self.view.set_calibration_controls_state(False)
-                 if self.calibrator.state == "done":
-                     new_thresholds = self.calibrator.get_calculated_thresholds()
-                     if new_thresholds:
-                         print("Controller: Calibration finished, saving config...")
-                         if self.config_manager.update_thresholds(new_thresholds):
-                             self._load_settings()
-                             self.view.show_message("Calibration", f"Calibration Complete!\nNew thresholds saved:\n{new_thresholds}", type='info')
-                         else: self.view.show_message("Calibration Error", "Failed to save calibrated thresholds.", type='warning')
-                     else: self.view.show_message("Calibration", "Calibration finished, but failed to retrieve thresholds.", type='warning')
-                 else:
-                     error_msg = self.calibrator.get_error_message(); self.view.show_message("Calibration Error", f"Calibration failed:\n{error_msg}", type='critical')
-                 self.calibrator.state = "idle"
-
+        result = self.pipeline.step()
+        if result is None: return
+        self._present_frame_result(result)
+        # Polls slowly while nobody is in front of the camera
+        interval_ms = round(self.pipeline.frame_interval(self.frame_interval_ms / 1000.0) * 1000)
+        if self.timer.interval() != interval_ms: self.timer.setInterval(interval_ms)
+
+    def _present_frame_result(self, result):
+        if result.idle:
+            # The preview keeps a message instead of being repainted until a face is back
+            if not self._showing_idle:
+                self._showing_idle = True
+                self.current_expression_states = dict(result.expression_states)
+                self.view.update_expression_status(self.current_expression_states, result.enabled_gestures)
+                self.view.video_widget.set_text("Idle - waiting for a face")
+            return
+        self._showing_idle = False
+        if result.frame is None: self.view.update_video_display(None); return
+        if self.governor is not None and self.governor.observe(result.processing_ms, result.timestamp): self._apply_governor_decisions()
+
+        if result.calibration_state in ("done", "error"):
+            self._finish_calibration()
+            self.view.update_expression_status({}, result.enabled_gestures)
+        elif result.calibration_state != "idle":
+            self.view.update_expression_status({}, result.enabled_gestures)
+        else:
+            self.current_expression_states = dict(result.expression_states)
+            self.view.update_expression_status(self.current_expression_states, result.enabled_gestures)
+
+        profiler = self.pipeline.profiler
+        started = time.perf_counter_ns() if profiler.enabled else 0
+        self.view.update_video_display(result.frame)
+        if profiler.enabled: profiler.record("display", time.perf_counter_ns() - started)
+
+    def _on_display_size_changed(self, width, height):
+        self.pipeline.display_size = (width, height)
+
+    def get_performance_stats(self):
+        """
+        Returns the rolling per-stage latency statistics of the pipeline.
+
+        :return: The PipelineProfiler snapshot plus 'enabled', the number of
+                 frames the capture thread overwrote ('capture_dropped_frames'),
+                 the pipeline mode, the ActionDispatcher stats ('actions') and,
+                 with the motion gate on, how often inference was skipped ('motion_gate').
+                 With face_roi on, 'face_roi' counts cropped and full-frame detections.
+                 With adaptive_detection on, 'detection_scheduler' counts predicted frames.
+                 With idle_mode on, 'idle' holds the state and the time spent in each state.
+                 With the governor on, 'governor' holds its load, level and current decisions.
+        """
+        stats = self.pipeline.profiler.snapshot()
+        stats["enabled"] = self.pipeline.profiler.enabled
+        stats["pipeline_mode"] = self.pipeline_mode
+        capture_stats = self.webcam.get_capture_stats() if hasattr(self.webcam, "get_capture_stats") else {}
+        stats["capture_dropped_frames"] = capture_stats.get("dropped_frames", 0)
+        stats["actions"] = self.action_dispatcher.get_stats()
+        motion_gate = self.pipeline.motion_gate
+        if motion_gate is not None: stats["motion_gate"] = motion_gate.get_stats()
+        face_roi = self.pipeline.face_roi
+        if face_roi is not None: stats["face_roi"] = face_roi.get_stats()
+        detection_scheduler = self.pipeline.detection_scheduler
+        if detection_scheduler is not None: stats["detection_scheduler"] = detection_scheduler.get_stats()
+        idle_monitor = self.pipeline.idle_monitor
+        if idle_monitor is not None: stats["idle"] = idle_monitor.get_stats()
+        if self.governor is not None: stats["governor"] = self.governor.get_stats()
+        return stats
+
+    def _finish_calibration(self):
+        with self.pipeline.lock:
+            calibration_state = self.calibrator.state
+            if calibration_state not in ("done", "error"): return
+            new_thresholds = self.calibrator.get_calculated_thresholds()
+            neutral_ratios = self.calibrator.get_neutral_ratios()
+            error_msg = self.calibrator.get_error_message()
+            self.calibrator.state = "idle"
+
+        self.view.set_calibration_controls_state(False)
+        if calibration_state == "done":
+            if new_thresholds:
+                print("Controller: Calibration finished, saving config...")
+                if self.config_manager.update_neutral_ratios(neutral_ratios or {}) and self.config_manager.update_thresholds(new_thresholds):
+                    self._load_settings()
+                    self.view.show_message("Calibration", f"Calibration Complete!\nNew thresholds saved:\n{new_thresholds}", type='info')
+                else: self.view.show_message("Calibration Error", "Failed to save calibrated thresholds.", type='warning')
+            else: self.view.show_message("Calibration", "Calibration finished, but failed to retrieve thresholds.", type='warning')
         else:
-            for key in self.monitored_expressions: self.current_expression_states[key] = False
-            if face_landmarks:
-                mouth_ratio = get_mouth_open_ratio(face_landmarks) if current_enabled_status.get("mouth_open", True) else None
-                eyebrow_ratio = get_eyebrows_raised_ratio(face_landmarks) if current_enabled_status.get("eyebrows_raised", True) else None
-                smile_ratio = get_smile_ratio(face_landmarks) if current_enabled_status.get("smile", True) else None
-
-                if current_enabled_status.get("mouth_open", True) and mouth_ratio is not None: self.current_expression_states["mouth_open"] = mouth_ratio > self.thresholds.get("mouth_open", 0.35)
-                if current_enabled_status.get("eyebrows_raised", True) and eyebrow_ratio is not None: self.current_expression_states["eyebrows_raised"] = eyebrow_ratio > self.thresholds.get("eyebrows_raised", 0.28)
-                if current_enabled_status.get("smile", True) and smile_ratio is not None: self.current_expression_states["smile"] = smile_ratio > self.thresholds.get("smile", 0.35)
-
-                annotated_frame = drawing_utils.draw_landmarks_on_image(processing_frame, results, self.mp_drawing, self.mp_face_mesh, self.mp_drawing_styles)
-                self._handle_triggers()
-
-            self.view.update_expression_status(self.current_expression_states, current_enabled_status)
-
-        self.view.update_video_display(annotated_frame)
-
-
-    def _handle_triggers(self):
-        actions_config = self.config_manager.get_actions()
-        enabled_status = self.config_manager.get_enabled_gestures()
-        hold_frames_required = self.hold_frames
-
-        for expr_key in self.monitored_expressions:
-            current_state = self.current_expression_states.get(expr_key, False)
-
-            if current_state and enabled_status.get(expr_key, True):
-                self.active_frame_counts[expr_key] = self.active_frame_counts.get(expr_key, 0) + 1
-            else:
-                self.active_frame_counts[expr_key] = 0
-
-            if self.active_frame_counts.get(expr_key, 0) == hold_frames_required:
-                action_config = actions_config.get(expr_key, None)
-                if action_config:
-                    action_type = action_config.get("type"); action_value = action_config.get("value")
-                    if not action_type or action_value is None: print(f"Warn: Incomplete action {expr_key}"); continue
-                    print(f"****** Triggered ({hold_frames_required} frames): {expr_key} (Action: {action_config}) ******")
-                    try:
-                        if action_type == "press": pyautogui.press(action_value)
-                        elif action_type == "hotkey": keys = [k.strip() for k in action_value.split(',') if k.strip()]; pyautogui.hotkey(*keys)
-                        elif action_type == "write": pyautogui.typewrite(action_value, interval=0.01)
-                        else: print(f"Warn: Unknown action type '{action_type}' for {expr_key}.")
-                    except Exception as e: print(f"Error pyautogui action {action_config} for {expr_key}: {e}")
+            self.view.show_message("Calibration Error", f"Calibration failed:\n{error_msg}", type='critical')
 
     def cleanup(self):
         print("Controller: Cleaning up resources...")
         if self.is_capturing: self.stop_capture()
+        self.action_dispatcher.shutdown()
+        self.config_manager.close()
         if hasattr(self, 'webcam') and self.webcam: self.webcam.release()
-        if hasattr(self, 'detector') and self.detector: self.detector.close()
+        if hasattr(self, 'detector') and self.detector and self.detector is not self.webcam: self.detector.close()
         print("Controller: Resources released.")
         self.app.quit()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class PipelineWorker(QThread):
+    """
+    Runs the FramePipeline on a dedicated thread and hands results to the GUI.
+
+    Only one result is in flight at a time: while the GUI has not acknowledged
+    the previous result, new results are dropped instead of being queued.
+    """
+    frame_ready = pyqtSignal(object)
+
+    def __init__(self, pipeline, interval_ms=30, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.interval_s = interval_ms / 1000.0
+        self.dropped_results = 0
+        self._stop_event = threading.Event()
+        self._delivery_pending = threading.Event()
+
+    def run(self):
+        print("PipelineWorker: Thread started.")
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                result = self.pipeline.step()
+            except Exception as e:
+                print(f"PipelineWorker: Error processing frame: {e}")
+                result = None
+            if result is None:
+                self._stop_event.wait(0.002); continue
+            self._deliver(result)
+            remaining = self.pipeline.frame_interval(self.interval_s) - (time.monotonic() - started)
+            if remaining > 0: self._stop_event.wait(remaining)
+        print("PipelineWorker: Thread finished.")
+
+    def _deliver(self, result):
+        profiler = self.pipeline.profiler
+        if self._delivery_pending.is_set():
+            self.dropped_results += 1
+            profiler.add_dropped()
+            return
+        self._delivery_pending.set()
+        self.frame_ready.emit(result)
+
+    def acknowledge_frame(self):
+        """Called by the GUI once a delivered result has been painted."""
+        self._delivery_pending.clear()
+
+    def stop(self):
+        self._stop_event.set()
+        self.wait()
@@ -0,0 +1,128 @@
+import collections
+import threading
+import time
+
+from .output_backends import PyAutoGUIBackend
+from .perf_stats import PipelineProfiler
+
+
+class ActionDispatcher:
+    """
+    Executes triggered actions on a dedicated thread, so keyboard simulation
+    (including PyAutoGUI's pause after every call) never blocks the frame loop.
+
+    Instances are callables with the action_executor signature of FramePipeline.
+    Pending actions are coalesced per gesture: while an action of a gesture
+    waits in the queue, further triggers of that gesture are dropped. A gesture
+    whose last action was accepted less than `rate_limit_ms` ago is dropped too.
+    """
+    def __init__(self, executor=None, rate_limit_ms=0, max_pending=8, backend=None):
+        """
+        :param executor: Callable (expression_key, action) run on the dispatcher thread.
+                         Defaults to executing the CompiledAction with `backend`.
+        :param rate_limit_ms: Minimum time between two accepted actions of the same gesture.
+        :param max_pending: Maximum number of queued actions, further actions are dropped.
+        :param backend: The OutputBackend of the default executor, PyAutoGUIBackend if None.
+        """
+        self.backend = backend or PyAutoGUIBackend()
+        self.executor = executor or self._execute_with_backend
+        self.rate_limit_s = rate_limit_ms / 1000.0
+        self.max_pending = max(1, max_pending)
+        self.latencies = PipelineProfiler(enabled=True)
+        self._condition = threading.Condition()
+        self._pending = collections.OrderedDict() # expression_key -> (action, submitted_ns)
+        self._last_accepted = {}
+        self._counts = dict.fromkeys(("submitted", "executed", "coalesced", "rate_limited", "overflow", "cancelled", "failed"), 0)
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None: return
+            self._cancel_event.clear()
+            self._thread = threading.Thread(target=self._run, name="ActionDispatcher", daemon=True)
+            self._thread.start()
+        print("ActionDispatcher: Thread started.")
+
+    def set_rate_limit(self, rate_limit_ms):
+        self.rate_limit_s = rate_limit_ms / 1000.0
+
+    def __call__(self, expr_key, action):
+        return self.submit(expr_key, action)
+
+    def submit(self, expr_key, action):
+        """
+        Queues an action without waiting for it.
+
+        :return: True if the action was queued, False if it was coalesced, rate
+                 limited or the queue was full.
+        """
+        started = time.perf_counter_ns()
+        with self._condition:
+            self._counts["submitted"] += 1
+            now = time.monotonic()
+            if expr_key in self._pending: reason = "coalesced"
+            elif now - self._last_accepted.get(expr_key, -float("inf")) < self.rate_limit_s: reason = "rate_limited"
+            elif len(self._pending) >= self.max_pending: reason = "overflow"
+            else: reason = None
+            if reason is None:
+                self._pending[expr_key] = (action, started)
+                self._last_accepted[expr_key] = now
+                self._condition.notify()
+            else: self._counts[reason] += 1
+        self.latencies.record("enqueue", time.perf_counter_ns() - started)
+        if reason is not None: print(f"Action for {expr_key} dropped ({reason}).")
+        return reason is None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._cancel_event.is_set(): self._condition.wait()
+                if self._cancel_event.is_set(): return
+                expr_key, (action, submitted_ns) = self._pending.popitem(last=False)
+            started = time.perf_counter_ns()
+            self.latencies.record("queue_wait", started - submitted_ns)
+            try:
+                self.executor(expr_key, action)
+                outcome = "executed"
+            except Exception as e:
+                print(f"ActionDispatcher: Error executing {action} for {expr_key}: {e}")
+                outcome = "failed"
+            finished = time.perf_counter_ns()
+            self.latencies.record("execute", finished - started)
+            self.latencies.record("trigger_to_done", finished - submitted_ns)
+            with self._condition: self._counts[outcome] += 1
+
+    def _execute_with_backend(self, expr_key, action):
+        if not self.backend.execute(action, self._cancel_event): print(f"Action {expr_key} cancelled while typing.")
+
+    def cancel_pending(self):
+        """Drops all queued actions. An action already executing is finished."""
+        with self._condition:
+            self._counts["cancelled"] += len(self._pending)
+            self._pending.clear()
+
+    def shutdown(self, timeout=1.0):
+        """Cancels queued actions, interrupts typing and stops the thread."""
+        self.cancel_pending()
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._cancel_event.set()
+            self._condition.notify_all()
+        if thread is None: return
+        thread.join(timeout)
+        if thread.is_alive(): print("ActionDispatcher: Thread did not stop in time.")
+        else: print("ActionDispatcher: Thread finished.")
+
+    def get_stats(self):
+        """
+        :return: A dict with the action counters ('submitted', 'executed', 'coalesced',
+                 'rate_limited', 'overflow', 'cancelled', 'failed'), 'pending', and
+                 latency summaries per stage ('enqueue', 'queue_wait', 'execute',
+                 'trigger_to_done') under 'latencies'.
+        """
+        with self._condition:
+            stats = dict(self._counts)
+            stats["pending"] = len(self._pending)
+        stats["latencies"] = self.latencies.snapshot()["stages"]
+        return stats
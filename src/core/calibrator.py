@@ -1,52 +1,124 @@
 # src/core/calibrator.py
-import numpy as np
 import time
-from .expression_analyzer import (get_mouth_open_ratio, get_eyebrows_raised_ratio, get_smile_ratio)
+from typing import NamedTuple
 
-class Calibrator:
-    GESTURES_WITH_ACTIVE_PHASE = {"mouth_open", "eyebrows_raised", "smile"}
-    ACTIVE_PHASE_ORDER = ["mouth", "eyebrows", "smile"]
-    PHASE_TO_KEY_MAP = {"mouth": "mouth_open", "eyebrows": "eyebrows_raised", "smile": "smile"}
+from .gesture_registry import GESTURE_REGISTRY, GestureFeatureEngine
+from .running_stats import RunningStats
+
+NEUTRAL_PHASE = "neutral"
+CALIBRATION_STATISTICS = ("mean", "median")
+
+
+class CalibrationPhase(NamedTuple):
+    """One step of a calibration run: the gestures sampled and the instruction shown."""
+    name: str
+    gesture_keys: tuple
+    instruction: str
+
+
+def build_phase_table(registry=None):
+    """
+    Derives the active calibration phases from the gesture registry.
+
+    Gestures sharing a calibration_phase are sampled together. Phases keep the
+    registration order of their first gesture.
 
-    def __init__(self, frames_to_collect=60, threshold_factor=0.6):
-        self.frames_to_collect = frames_to_collect
+    :return: A list of CalibrationPhase, without the neutral phase.
+    """
+    registry = GESTURE_REGISTRY if registry is None else registry
+    phases = {}
+    for definition in registry.values():
+        phase = phases.get(definition.calibration_phase)
+        if phase is None: phases[definition.calibration_phase] = CalibrationPhase(definition.calibration_phase, (definition.key,), definition.calibration_instruction)
+        else: phases[definition.calibration_phase] = phase._replace(gesture_keys=phase.gesture_keys + (definition.key,))
+    return list(phases.values())
+
+
+def _display_name(gesture_key):
+    return gesture_key.replace("_", " ")
+
+
+class Calibrator:
+    """
+    Derives gesture thresholds from a neutral phase followed by one phase per
+    gesture group.
+
+    Ratios are folded into RunningStats per phase and gesture as they arrive,
+    so memory and per-frame cost do not grow with the calibration length.
+    Each phase only computes the ratios of the gestures it samples.
+
+    Phases last `phase_ms` measured with the frame timestamps, so their length
+    does not depend on the frame rate. A phase is only completed once it has
+    `min_samples` frames with a face.
+    """
+    def __init__(self, phase_ms=2000, threshold_factor=0.6, statistic="mean", min_samples=10, registry=None, clock=None):
+        """
+        :param phase_ms: Duration of each phase in milliseconds.
+        :param threshold_factor: Position of the threshold between the neutral (0) and active (1) value.
+        :param statistic: 'mean' or 'median' of the sampled ratios. The median ignores
+                          outliers such as blinks or a briefly lost face.
+        :param min_samples: Minimum number of frames sampled per phase.
+        :param registry: Mapping of key -> GestureDefinition, defaults to GESTURE_REGISTRY.
+        :param clock: Callable returning monotonic seconds, used for frames without a
+                      timestamp. Defaults to time.monotonic.
+        """
+        if statistic not in CALIBRATION_STATISTICS:
+            print(f"Warning: Unknown calibration statistic '{statistic}', using 'mean'.")
+            statistic = "mean"
+        self.phase_seconds = phase_ms / 1000.0
+        self.min_samples = max(1, min_samples)
+        self.clock = clock or time.monotonic
         self.threshold_factor = threshold_factor
+        self.statistic = statistic
+        self.registry = GESTURE_REGISTRY if registry is None else registry
+        self.phase_table = build_phase_table(self.registry)
         self.state = "idle"
         self.frame_count = 0
         self.calculated_thresholds = {}
+        self.calculated_neutral_ratios = {}
         self.current_instruction = ""
         self.error_message = ""
-        self.data = {}
-        self._reset_data()
+        self.stats = {}
         self.enabled_keys_in_run = set()
         self.active_phases_in_run = []
         self.current_phase_index = -1
+        self.phase_started = None
+        self._phases = {}
+        self._reset_data()
 
     def _reset_data(self):
-        self.data = {
-            "neutral": {"mouth_ratios": [], "eyebrow_ratios": [], "smile_ratios": []},
-            "mouth": {"mouth_ratios": []},
-            "eyebrows": {"eyebrow_ratios": []},
-            "smile": {"smile_ratios": []}
-        }
+        self.stats = {}
+        self._phases = {}
         self.frame_count = 0
         self.calculated_thresholds = {}
+        self.calculated_neutral_ratios = {}
         self.error_message = ""
         self.enabled_keys_in_run = set()
         self.active_phases_in_run = []
         self.current_phase_index = -1
+        self.phase_started = None
+
+    def _new_stats(self):
+        return RunningStats(quantiles=(0.5,) if self.statistic == "median" else ())
+
+    def _add_phase(self, name, gesture_keys, instruction):
+        self._phases[name] = (CalibrationPhase(name, gesture_keys, instruction), GestureFeatureEngine(gesture_keys, self.registry))
+        self.stats[name] = {key: self._new_stats() for key in gesture_keys}
 
     def start(self, enabled_gestures_keys):
         print(f"Starting calibration for: {enabled_gestures_keys}")
         self._reset_data()
         self.enabled_keys_in_run = set(enabled_gestures_keys)
-        self.active_phases_in_run = [ p for p in self.ACTIVE_PHASE_ORDER if self.PHASE_TO_KEY_MAP.get(p) in self.enabled_keys_in_run ]
+        calibrated_keys = tuple(key for key in self.registry if key in self.enabled_keys_in_run)
+        self._add_phase(NEUTRAL_PHASE, calibrated_keys, "Look Neutral")
+        for phase in self.phase_table:
+            keys = tuple(key for key in phase.gesture_keys if key in self.enabled_keys_in_run)
+            if not keys: continue
+            self._add_phase(phase.name, keys, phase.instruction)
+            self.active_phases_in_run.append(phase.name)
         print(f"Active calibration phases: {self.active_phases_in_run}")
-        self.state = "neutral"
-        self.frame_count = 0
-        self.current_phase_index = -1
-        duration = self.frames_to_collect // 30
-        self.current_instruction = f"Look Neutral (Gathering base data for {duration} sec...)"
+        self.state = NEUTRAL_PHASE
+        self.current_instruction = f"Look Neutral (Gathering base data for {self.phase_seconds:g} sec...)"
         return True
 
     def is_calibrating(self):
@@ -58,173 +130,100 @@ class Calibrator:
     def get_calculated_thresholds(self):
         return self.calculated_thresholds if self.state == "done" else None
 
+    def get_neutral_ratios(self):
+        """:return: The neutral ratio of every calibrated gesture, or None if calibration did not finish."""
+        return self.calculated_neutral_ratios if self.state == "done" else None
+
     def get_error_message(self):
         return self.error_message
 
-    def process_landmarks(self, face_landmarks):
+    def _show_problem(self, problem):
+        base_instruction = self.current_instruction.split(" (")[0]
+        self.current_instruction = f"{base_instruction} ({problem})"
+
+    def _phase_elapsed(self, timestamp):
+        """Returns the seconds since the first frame of the current phase."""
+        if timestamp is None: timestamp = self.clock()
+        if self.phase_started is None or timestamp < self.phase_started: self.phase_started = timestamp
+        return timestamp - self.phase_started
+
+    def process_landmarks(self, face_landmarks, timestamp=None):
+        """
+        :param face_landmarks: The landmarks of the frame, None if no face was detected.
+        :param timestamp: Monotonic timestamp of the frame in seconds, defaults to the clock.
+        """
         if not self.is_calibrating(): return
-        if face_landmarks is None:
-             base_instruction = self.current_instruction.split(" (")[0]
-             self.current_instruction = f"{base_instruction} (No face detected!)"
-             return
-
-        current_mouth_ratio = get_mouth_open_ratio(face_landmarks)
-        current_eyebrow_ratio = get_eyebrows_raised_ratio(face_landmarks)
-        current_smile_ratio = get_smile_ratio(face_landmarks)
-
-        print(f"DEBUG - Ratios Calculated -> Mouth: {current_mouth_ratio}, Brows: {current_eyebrow_ratio}, Smile: {current_smile_ratio}")
-
-        if any(v is None for v in [current_mouth_ratio, current_eyebrow_ratio, current_smile_ratio]):
+        if timestamp is None: timestamp = self.clock()
+        self._phase_elapsed(timestamp)
+        if face_landmarks is None: self._show_problem("No face detected!"); return
+        phase, engine = self._phases[self.state]
+        ratios = engine.compute_dict(face_landmarks) if len(engine) else {}
+        if len(ratios) != len(engine):
             print("Warning: Skipping frame during calibration due to missing ratio.")
-            base_instruction = self.current_instruction.split(" (")[0]
-            self.current_instruction = f"{base_instruction} (Ratio Error!)"
+            self._show_problem("Ratio Error!")
             return
+        self.process_ratios(ratios, timestamp)
 
-        duration = self.frames_to_collect // 30
-        progress = f"({self.frame_count + 1}/{self.frames_to_collect})"
-
-        print(f"DEBUG - Entering state check with self.state = '{self.state}'")
-
-        if self.state == "neutral":
-            self.data["neutral"]["mouth_ratios"].append(current_mouth_ratio)
-            self.data["neutral"]["eyebrow_ratios"].append(current_eyebrow_ratio)
-            self.data["neutral"]["smile_ratios"].append(current_smile_ratio)
-            self.frame_count += 1
-            self.current_instruction = f"Look Neutral {progress}"
-            if self.frame_count >= self.frames_to_collect:
-                print("Neutral phase complete.")
-                self.current_phase_index = 0
-                if self.current_phase_index < len(self.active_phases_in_run):
-                    next_phase = self.active_phases_in_run[self.current_phase_index]
-                    self.state = next_phase
-                    self.frame_count = 0
-                    phase_display_name = next_phase.replace('_', ' ').title()
-                    if next_phase == "mouth": phase_display_name = "Open Mouth Wide"
-                    elif next_phase == "eyebrows": phase_display_name = "Raise Eyebrows High"
-                    elif next_phase == "smile": phase_display_name = "Smile Naturally"
-                    self.current_instruction = f"{phase_display_name} for {duration} sec..."
-                    print(f"Starting {next_phase} phase.")
-                else:
-                    self.state = "calculating"
-                    self.current_instruction = "Calculating thresholds..."
-                    print("No active phases required. Calculating...")
-                    self._calculate_thresholds()
-
-        elif self.state == "mouth":
-            self.data["mouth"]["mouth_ratios"].append(current_mouth_ratio)
-            self.frame_count += 1
-            self.current_instruction = f"Open Mouth Wide {progress}"
-            if self.frame_count >= self.frames_to_collect:
-                 print(f"{self.state.title()} phase complete.")
-                 self.current_phase_index += 1
-                 if self.current_phase_index < len(self.active_phases_in_run):
-                     next_phase = self.active_phases_in_run[self.current_phase_index]
-                     self.state = next_phase
-                     self.frame_count = 0
-                     next_phase_display_name = next_phase.replace('_', ' ').title()
-                     if next_phase == "mouth": next_phase_display_name = "Open Mouth Wide"
-                     elif next_phase == "eyebrows": next_phase_display_name = "Raise Eyebrows High"
-                     elif next_phase == "smile": next_phase_display_name = "Smile Naturally"
-                     self.current_instruction = f"{next_phase_display_name} for {duration} sec..."
-                     print(f"Starting {next_phase} phase.")
-                 else:
-                     self.state = "calculating"
-                     self.current_instruction = "Calculating thresholds..."
-                     print("All active phases complete. Calculating...")
-                     self._calculate_thresholds()
-
-        elif self.state == "eyebrows":
-             self.data["eyebrows"]["eyebrow_ratios"].append(current_eyebrow_ratio)
-             self.frame_count += 1
-             progress = f"({self.frame_count}/{self.frames_to_collect})"
-             self.current_instruction = f"Raise Eyebrows High {progress}"
-             print(f"DEBUG [Eyebrows Phase]: Frame Count = {self.frame_count}, Target = {self.frames_to_collect}")
-             if self.frame_count >= self.frames_to_collect:
-                 print(f"DEBUG: Eyebrows phase complete check passed.")
-                 print(f"DEBUG: Old Phase Index: {self.current_phase_index}")
-                 self.current_phase_index += 1
-                 print(f"DEBUG: New Phase Index: {self.current_phase_index}, Active Phases Length: {len(self.active_phases_in_run)}")
-                 if self.current_phase_index < len(self.active_phases_in_run):
-                     next_phase = self.active_phases_in_run[self.current_phase_index]
-                     print(f"DEBUG: Next phase determined: {next_phase}")
-                     self.state = next_phase
-                     self.frame_count = 0
-                     next_phase_display_name = next_phase.replace('_', ' ').title()
-                     if next_phase == "mouth": next_phase_display_name = "Open Mouth Wide"
-                     elif next_phase == "eyebrows": next_phase_display_name = "Raise Eyebrows High"
-                     elif next_phase == "smile": next_phase_display_name = "Smile Naturally"
-                     self.current_instruction = f"{next_phase_display_name} for {duration} sec..."
-                     print(f"DEBUG: State changed to '{self.state}'. Starting next phase.")
-                 else:
-                     print("DEBUG: Last active phase (eyebrows) complete. Changing state to calculating.")
-                     self.state = "calculating"
-                     self.current_instruction = "Calculating thresholds..."
-                     self._calculate_thresholds()
-             print(f"DEBUG [End of Eyebrows Logic]: State is now {self.state}, Frame Count is {self.frame_count}")
-
-        elif self.state == "smile":
-             self.data["smile"]["smile_ratios"].append(current_smile_ratio)
-             self.frame_count += 1
-             self.current_instruction = f"Smile Naturally {progress}"
-             if self.frame_count >= self.frames_to_collect:
-                 print(f"{self.state.title()} phase complete.")
-                 self.current_phase_index += 1
-                 if self.current_phase_index < len(self.active_phases_in_run):
-                     next_phase = self.active_phases_in_run[self.current_phase_index]
-                     self.state = next_phase; self.frame_count = 0
-                     print(f"Starting {next_phase} phase.")
-                 else:
-                     self.state = "calculating"; self.current_instruction = "Calculating thresholds..."
-                     print("All active phases complete. Calculating...")
-                     self._calculate_thresholds()
+    def process_ratios(self, ratios, timestamp=None):
+        """
+        Adds one frame of ratios (gesture key -> ratio) to the current phase.
+
+        :param timestamp: Monotonic timestamp of the frame in seconds, defaults to the clock.
+        """
+        if not self.is_calibrating(): return
+        elapsed = self._phase_elapsed(timestamp)
+        phase, _ = self._phases[self.state]
+        phase_stats = self.stats[phase.name]
+        for key in phase.gesture_keys: phase_stats[key].add(ratios[key])
+        self.frame_count += 1
+        self.current_instruction = f"{phase.instruction} ({min(elapsed, self.phase_seconds):.1f}/{self.phase_seconds:.1f} s)"
+        if elapsed >= self.phase_seconds and self.frame_count >= self.min_samples: self._advance_phase()
+
+    def _advance_phase(self):
+        print(f"{self.state.title()} phase complete.")
+        self.current_phase_index += 1
+        self.frame_count = 0
+        self.phase_started = None
+        if self.current_phase_index < len(self.active_phases_in_run):
+            self.state = self.active_phases_in_run[self.current_phase_index]
+            self.current_instruction = f"{self._phases[self.state][0].instruction} for {self.phase_seconds:g} sec..."
+            print(f"Starting {self.state} phase.")
+        else:
+            self.state = "calculating"
+            self.current_instruction = "Calculating thresholds..."
+            print("All active phases complete. Calculating...")
+            self._calculate_thresholds()
+
+    def _value(self, stats):
+        return stats.quantile(0.5) if self.statistic == "median" else stats.mean
 
     def _calculate_thresholds(self):
-        new_thresholds = {}
+        new_thresholds = {}; neutral_ratios = {}
         try:
-            min_samples = max(1, self.frames_to_collect // 4)
-            neutral_data = self.data["neutral"]
-
-            if len(neutral_data.get("mouth_ratios", [])) < min_samples or \
-               len(neutral_data.get("eyebrow_ratios", [])) < min_samples or \
-               len(neutral_data.get("smile_ratios", [])) < min_samples:
-                 raise ValueError("Not enough data collected during neutral phase.")
-
-            gestures_calculated = set()
-            for key in self.enabled_keys_in_run:
-                if key == "mouth_open" and "mouth" in self.active_phases_in_run:
-                    active_ratios = self.data["mouth"].get("mouth_ratios", [])
-                    if len(active_ratios) < min_samples: raise ValueError(f"Not enough data collected for {key}.")
-                    neutral_val = np.mean(neutral_data["mouth_ratios"]); active_val = np.mean(active_ratios)
-                    if active_val <= neutral_val: raise ValueError(f"Active ratio not higher than neutral for {key}.")
-                    threshold = neutral_val + self.threshold_factor * (active_val - neutral_val); new_thresholds[key] = round(threshold, 4)
-                    gestures_calculated.add(key)
-                elif key == "eyebrows_raised" and "eyebrows" in self.active_phases_in_run:
-                    active_ratios = self.data["eyebrows"].get("eyebrow_ratios", [])
-                    if len(active_ratios) < min_samples: raise ValueError(f"Not enough data collected for {key}.")
-                    neutral_val = np.mean(neutral_data["eyebrow_ratios"]); active_val = np.mean(active_ratios)
-                    if active_val <= neutral_val: raise ValueError(f"Active ratio not higher than neutral for {key}.")
-                    threshold = neutral_val + self.threshold_factor * (active_val - neutral_val); new_thresholds[key] = round(threshold, 4)
-                    gestures_calculated.add(key)
-                elif key == "smile" and "smile" in self.active_phases_in_run:
-                    active_ratios = self.data["smile"].get("smile_ratios", [])
-                    if len(active_ratios) < min_samples: raise ValueError(f"Not enough data collected for {key}.")
-                    neutral_val = np.mean(neutral_data["smile_ratios"]); active_val = np.mean(active_ratios)
-                    if active_val <= neutral_val: raise ValueError(f"Active ratio not higher than neutral for {key}.")
-                    threshold = neutral_val + self.threshold_factor * (active_val - neutral_val); new_thresholds[key] = round(threshold, 4)
-                    gestures_calculated.add(key)
-
-            # Check if any enabled gesture requiring an active phase was actually calculated
-            enabled_active_gestures = {k for k,v in self.PHASE_TO_KEY_MAP.items() if v in self.enabled_keys_in_run}
-            if not new_thresholds and enabled_active_gestures:
+            min_samples = self.min_samples
+            neutral_stats = self.stats.get(NEUTRAL_PHASE, {})
+            if any(stats.count < min_samples for stats in neutral_stats.values()):
+                raise ValueError("Not enough data collected during neutral phase.")
+
+            for phase_name in self.active_phases_in_run:
+                for key, active_stats in self.stats[phase_name].items():
+                    if active_stats.count < min_samples: raise ValueError(f"Not enough data collected for {_display_name(key)}.")
+                    neutral_val = self._value(neutral_stats[key]); active_val = self._value(active_stats)
+                    if active_val <= neutral_val: raise ValueError(f"Active {_display_name(key)} ratio not higher than neutral.")
+                    threshold = neutral_val + self.threshold_factor * (active_val - neutral_val); new_thresholds[key] = round(float(threshold), 4)
+                    neutral_ratios[key] = round(float(neutral_val), 4)
+
+            if not new_thresholds and self.active_phases_in_run:
                  raise ValueError("No thresholds could be calculated for enabled active gestures.")
 
             self.calculated_thresholds = new_thresholds
+            self.calculated_neutral_ratios = neutral_ratios
             self.state = "done"
             summary = ", ".join([f"{k.replace('_',' ').title()}: {v}" for k,v in self.calculated_thresholds.items()]) if new_thresholds else "No thresholds calculated (check enabled gestures)."
             self.current_instruction = f"Calibration Complete! {summary}"
             print(f"Thresholds calculated: {self.calculated_thresholds}")
 
         except ValueError as ve:
-            self.state = "error"; self.error_message = f"Calc Error: {ve}."; self.current_instruction = f"Error: {ve}"; self.calculated_thresholds = {}; print(f"Calibration Error: {ve}")
+            self.state = "error"; self.error_message = f"Calc Error: {ve}"; self.current_instruction = f"Error: {ve}"; self.calculated_thresholds = {}; print(f"Calibration Error: {ve}")
         except Exception as e:
-            self.state = "error"; self.error_message = f"Unexpected calc error: {e}"; self.current_instruction = "Error during calculation."; self.calculated_thresholds = {}; print(f"Unexpected Calibration Error: {e}")
\ No newline at end of file
+            self.state = "error"; self.error_message = f"Unexpected calc error: {e}"; self.current_instruction = "Error during calculation."; self.calculated_thresholds = {}; print(f"Unexpected Calibration Error: {e}")
@@ -1,11 +1,61 @@
 # src/core/config_manager.py
 import json
 import os
+import threading
+import time
+
+# Frame rate the former 'hold_frames' setting was counted at, used to migrate it to 'hold_ms'
+LEGACY_HOLD_FPS = 30
 
 class ConfigManager:
     DEFAULT_CONFIG = {
         "settings": {
-            "hold_frames": 5
+            "hold_ms": 130,
+            "calibration_phase_ms": 2000,
+            "threaded_capture": True,
+            "pipeline_mode": "worker_thread",
+            "capture_width": 640,
+            "capture_height": 480,
+            "capture_source": 0,
+            "source_pacing": "realtime",
+            "source_loop": False,
+            "landmark_recording_path": "",
+            "landmark_recording_subset": "gestures",
+            "landmark_recording_dtype": "float16",
+            "performance_stats": False,
+            "performance_hud": False,
+            "overlay_level": "full",
+            "overlay_resolution": "capture",
+            "display_max_fps": 60,
+            "action_rate_limit_ms": 0,
+            "action_queue_size": 8,
+            "output_backend": "pyautogui",
+            "config_write_behind": False,
+            "config_write_delay_ms": 250,
+            "calibration_statistic": "mean",
+            "ratio_filter": "off",
+            "ratio_filter_min_cutoff": 2.0,
+            "ratio_filter_beta": 1.0,
+            "ratio_hysteresis": 0.0,
+            "motion_gate": False,
+            "motion_gate_threshold": 1.5,
+            "motion_gate_max_stale_ms": 250,
+            "face_roi": False,
+            "face_roi_size": 256,
+            "face_roi_margin": 0.3,
+            "adaptive_detection": False,
+            "adaptive_detection_budget_ms": 100,
+            "adaptive_detection_margin": 0.25,
+            "idle_mode": False,
+            "idle_timeout_ms": 5000,
+            "idle_poll_interval_ms": 500,
+            "idle_scale": 0.5,
+            "governor": False,
+            "governor_metric": "latency",
+            "governor_target_ms": 20.0,
+            "governor_target_cpu_percent": 50.0,
+            "governor_hysteresis": 0.2,
+            "governor_window_ms": 2000
             # wink_hold_frames removed
         },
         "thresholds": {
@@ -25,45 +75,63 @@ class ConfigManager:
             "eyebrows_raised": True,
             "smile": True
             # left_wink, right_wink removed
+        },
+        "neutral_ratios": { # Measured by calibration, used to derive hysteresis release thresholds
+            "mouth_open": 0.0,
+            "eyebrows_raised": 0.0,
+            "smile": 0.0
         }
     }
 
-    def __init__(self, config_file_path="config.json"):
+    def __init__(self, config_file_path="config.json", write_behind=None):
+        """
+        :param config_file_path: Path of the JSON file, relative names are resolved against the project root.
+        :param write_behind: If True, save() only marks the config dirty and a background
+                             thread writes it after a short delay, coalescing changes.
+                             None uses the 'config_write_behind' setting.
+        """
+        self._lock = threading.RLock()
+        self._writer_wakeup = threading.Condition(self._lock)
+        self._file_lock = threading.Lock()
+        self._writer = None
+        self._closing = False
+        self._dirty = False
+        self._dirty_since = 0.0
+        self._generation = 0
+        self._written_generation = 0
         if not os.path.dirname(config_file_path):
              script_dir = os.path.dirname(os.path.realpath(__file__))
              self.config_path = os.path.abspath(os.path.join(script_dir, "..", "..", config_file_path))
         else:
              self.config_path = os.path.abspath(config_file_path)
+        config_exists = os.path.exists(self.config_path)
         self.config_data = self._load()
         print(f"ConfigManager initialized. Config path: {self.config_path}")
         self._sync_sections()
+        self.write_behind = bool(self.get_setting("config_write_behind", False)) if write_behind is None else write_behind
+        self.write_delay_s = self.get_setting("config_write_delay_ms", 250) / 1000.0
+        if not config_exists: self.save() # Gives the user a complete file to edit
 
     def _sync_sections(self):
-        needs_save = False
         threshold_keys = set(self.config_data.get("thresholds", {}).keys())
         default_threshold_keys = set(self.DEFAULT_CONFIG.get("thresholds", {}).keys())
         master_keys = threshold_keys.union(default_threshold_keys) # Use keys from both loaded and default
 
         for section, defaults in self.DEFAULT_CONFIG.items():
-             if section != "thresholds": # Sync actions and enabled based on threshold keys
-                 config_section = self.config_data.setdefault(section, {})
-                 # Add missing default keys
-                 for key in master_keys:
-                      if key in defaults: # Check if default exists for this key
-                          if key not in config_section:
-                              config_section[key] = defaults[key]
-                              needs_save = True
-                 # Remove orphaned keys
-                 keys_to_remove = [k for k in config_section if k not in master_keys and k in defaults]
-                 for k in keys_to_remove:
-                      del config_section[k]
-                      needs_save = True
-             elif section == "settings": # Ensure settings section has defaults
-                  config_section = self.config_data.setdefault(section, {})
+             if section == "thresholds": continue
+             config_section = self.config_data.setdefault(section, {})
+             if section == "settings": # Settings are not keyed by gesture, only add missing defaults
                   for key, value in defaults.items():
-                       if key not in config_section:
-                            config_section[key] = value
-                            needs_save = True
+                       if key not in config_section: config_section[key] = value
+                  continue
+             # Sync gesture sections (actions, enabled, neutral ratios) based on threshold keys
+             # Add missing default keys
+             for key in master_keys:
+                  if key in defaults: # Check if default exists for this key
+                      if key not in config_section: config_section[key] = defaults[key]
+             # Remove orphaned keys
+             keys_to_remove = [k for k in config_section if k not in master_keys and k in defaults]
+             for k in keys_to_remove: del config_section[k]
 
     def _load(self):
         print(f"Attempting to load configuration from: {self.config_path}")
@@ -99,27 +167,106 @@ class ConfigManager:
                       config_section[key] = loaded_section_data.get(key, default_value)
             # Allow loading sections not in default? No, stick to defined structure.
 
+        loaded_settings = loaded_data.get("settings")
+        if isinstance(loaded_settings, dict) and "hold_frames" in loaded_settings and "hold_ms" not in loaded_settings:
+            try:
+                # The Nth active frame triggered, N - 1 frame intervals after the gesture started
+                config_data["settings"]["hold_ms"] = max(0, round((float(loaded_settings["hold_frames"]) - 1) * 1000 / LEGACY_HOLD_FPS))
+                print(f"Migrated 'hold_frames' ({loaded_settings['hold_frames']}) to 'hold_ms' ({config_data['settings']['hold_ms']}).")
+            except (TypeError, ValueError):
+                print(f"Warning: Ignoring invalid 'hold_frames' value {loaded_settings['hold_frames']!r}, using default 'hold_ms'.")
+
         print("Configuration loaded and merged with defaults.")
         return config_data
 
 
-    def _save_internal(self, data_to_save):
+    def _save_internal(self, payload):
+        # Written to a temporary file first, so a crash never leaves a truncated config.json
+        temp_path = self.config_path + ".tmp"
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=4)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
             return True
-        except Exception as e: print(f"Error saving configuration internally: {e}"); return False
+        except Exception as e:
+            print(f"Error saving configuration internally: {e}")
+            try: os.remove(temp_path)
+            except OSError: pass
+            return False
 
-    def save(self):
+    def _snapshot(self):
+        """Serializes the config and clears the dirty flag. Called with the lock held."""
         self._sync_sections()
-        if self._save_internal(self.config_data):
-             print(f"Configuration successfully saved to {self.config_path}"); return True
-        else: print(f"Error saving configuration to {self.config_path}"); return False
+        self._dirty = False
+        self._generation += 1
+        return self._generation, json.dumps(self.config_data, indent=4)
+
+    def _write(self, generation, payload):
+        with self._file_lock:
+            if generation < self._written_generation: return True # A newer snapshot is already on disk
+            if not self._save_internal(payload):
+                print(f"Error saving configuration to {self.config_path}"); return False
+            self._written_generation = generation
+        print(f"Configuration successfully saved to {self.config_path}"); return True
+
+    def save(self):
+        """
+        Writes the config to disk. In write-behind mode the write is only scheduled.
+
+        :return: True if the config was written (or scheduled), False on errors.
+        """
+        with self._lock:
+            if self.write_behind and not self._closing:
+                if not self._dirty: self._dirty, self._dirty_since = True, time.monotonic()
+                self._start_writer()
+                self._writer_wakeup.notify()
+                return True
+            generation, payload = self._snapshot()
+        return self._write(generation, payload)
+
+    def _start_writer(self):
+        if self._writer is not None: return
+        self._writer = threading.Thread(target=self._writer_loop, name="ConfigWriter", daemon=True)
+        self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                while not self._dirty and not self._closing: self._writer_wakeup.wait()
+                if not self._dirty: return
+                # Changes within the delay after the first one are written together
+                remaining = self._dirty_since + self.write_delay_s - time.monotonic()
+                if remaining > 0 and not self._closing:
+                    self._writer_wakeup.wait(remaining); continue
+                generation, payload = self._snapshot()
+            self._write(generation, payload)
+
+    def is_dirty(self):
+        with self._lock: return self._dirty
+
+    def flush(self):
+        """Writes pending changes now. Returns False if writing failed."""
+        with self._lock:
+            if not self._dirty: return True
+            generation, payload = self._snapshot()
+        return self._write(generation, payload)
+
+    def close(self):
+        """Flushes pending changes and stops the background writer."""
+        with self._lock:
+            self._closing = True
+            writer, self._writer = self._writer, None
+            self._writer_wakeup.notify_all()
+        if writer is not None: writer.join(timeout=2.0)
+        return self.flush()
 
     def get_config(self): return self.config_data
     def get_thresholds(self): return self.config_data.get("thresholds", {})
     def get_actions(self): return self.config_data.get("actions", {})
     def get_enabled_gestures(self): return self.config_data.get("enabled_gestures", {})
+    def get_neutral_ratios(self): return self.config_data.get("neutral_ratios", {})
     def get_setting(self, key, default=None):
         default_value = self.DEFAULT_CONFIG.get("settings", {}).get(key, default)
         return self.config_data.get("settings", {}).get(key, default_value)
@@ -130,15 +277,24 @@ class ConfigManager:
         default_value = self.DEFAULT_CONFIG.get("actions", {}).get(key, None)
         return self.get_actions().get(key, default_value)
 
+    # Mutations hold the lock, so the background writer never serializes a half-updated config
     def update_thresholds(self, new_thresholds_dict):
-        self.config_data.setdefault("thresholds", {}).update(new_thresholds_dict)
+        with self._lock: self.config_data.setdefault("thresholds", {}).update(new_thresholds_dict)
         print(f"Updating thresholds in config: {new_thresholds_dict}")
         return self.save()
+    def update_neutral_ratios(self, neutral_ratios_dict):
+        with self._lock: self.config_data.setdefault("neutral_ratios", {}).update(neutral_ratios_dict)
+        print(f"Updating neutral ratios in config: {neutral_ratios_dict}")
+        return self.save()
     def update_actions(self, new_actions_dict):
-        self.config_data["actions"] = new_actions_dict; print(f"Updating actions in config: {new_actions_dict}"); return self.save()
+        with self._lock: self.config_data["actions"] = new_actions_dict
+        print(f"Updating actions in config: {new_actions_dict}"); return self.save()
     def update_action(self, key, action_config):
-         self.config_data.setdefault("actions", {})[key] = action_config; print(f"Updating action '{key}' in config: {action_config}"); return self.save()
+         with self._lock: self.config_data.setdefault("actions", {})[key] = action_config
+         print(f"Updating action '{key}' in config: {action_config}"); return self.save()
     def update_gesture_enabled(self, key, is_enabled):
-        self.config_data.setdefault("enabled_gestures", {})[key] = bool(is_enabled); print(f"Updating enabled status for '{key}' to {is_enabled}"); return self.save()
+        with self._lock: self.config_data.setdefault("enabled_gestures", {})[key] = bool(is_enabled)
+        print(f"Updating enabled status for '{key}' to {is_enabled}"); return self.save()
     def update_setting(self, key, value):
-        self.config_data.setdefault("settings", {})[key] = value; print(f"Updating setting '{key}' in config to {value}"); return self.save()
\ No newline at end of file
+        with self._lock: self.config_data.setdefault("settings", {})[key] = value
+        print(f"Updating setting '{key}' in config to {value}"); return self.save()
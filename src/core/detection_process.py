@@ -0,0 +1,205 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from .landmark_frame import LandmarkFrame
+from .shared_frame_ring import SharedFrameRing
+
+MAX_LANDMARKS = 478
+
+
+def _detection_process_main(source, frame_ring_spec, landmark_ring_spec, stop_event, max_faces, pacing="realtime", loop=False):
+    """
+    Entry point of the capture/detector child process.
+
+    Reads frames, runs FaceMesh and publishes the frame and its landmarks under
+    the same sequence number. Must stay a module level function for 'spawn'.
+    """
+    import cv2
+    from .frame_sources import open_frame_source
+    from .webcam_handler import WebcamHandler
+    from .landmark_detector import LandmarkDetector
+
+    frame_ring = SharedFrameRing.attach(*frame_ring_spec)
+    landmark_ring = SharedFrameRing.attach(*landmark_ring_spec)
+    height, width = frame_ring.shape[:2]
+    webcam = open_frame_source(source, threaded=False, pacing=pacing, loop=loop)
+    if isinstance(webcam, WebcamHandler):
+        webcam.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        webcam.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    detector = LandmarkDetector(max_faces=max_faces)
+    resized_frame = np.empty(frame_ring.shape, dtype=np.uint8)
+    frame_rgb = np.empty(frame_ring.shape, dtype=np.uint8)
+    landmark_buffer = np.zeros(landmark_ring.shape, dtype=np.float32)
+    sequence = max(frame_ring.latest_sequence(), landmark_ring.latest_sequence())
+    try:
+        while not stop_event.is_set():
+            success, frame = webcam.read_frame()
+            if not success or frame is None:
+                if not webcam.is_opened(): break
+                time.sleep(0.001)
+                continue
+            if frame.shape != frame_ring.shape:
+                frame = cv2.resize(frame, (width, height), dst=resized_frame)
+            timestamp_ns = time.monotonic_ns()
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+            results = detector.detect_landmarks(frame_rgb)
+            count = 0
+            if results.multi_face_landmarks:
+                points = LandmarkFrame.points_from_face_landmarks(results.multi_face_landmarks[0])
+                count = min(points.shape[0], landmark_buffer.shape[0])
+                landmark_buffer[:count] = points[:count]
+            sequence += 1
+            frame_ring.write(frame, sequence, timestamp_ns)
+            landmark_ring.write(landmark_buffer, sequence, timestamp_ns, meta=count)
+    finally:
+        webcam.release()
+        detector.close()
+        frame_ring.close()
+        landmark_ring.close()
+
+
+class DetectionProcess:
+    """
+    Runs capture and FaceMesh in a child process and reads its output from
+    shared memory rings.
+
+    Offers the webcam interface (read_frame/release/is_opened) plus
+    read_detection(), which returns the frame together with its landmarks.
+    A crashed child is restarted with a growing back-off. pause() stops the
+    child but keeps the shared memory, resume() starts a new one.
+    """
+    threaded = True
+
+    def __init__(self, source=0, frame_size=(640, 480), max_faces=1, slots=4, max_restarts=5, pacing="realtime", loop=False):
+        """
+        :param source: The camera index, video file or image directory opened by the child process.
+        :param frame_size: (width, height) of the shared frame buffers. Frames of
+                           another size are resized by the child.
+        :param max_faces: Maximum number of faces passed to FaceMesh.
+        :param slots: Number of buffers per ring.
+        :param max_restarts: How often a crashed child is restarted before giving up.
+        :param pacing: Pacing of file sources, 'realtime' or 'fast'.
+        :param loop: Whether file sources restart when they end.
+        """
+        width, height = frame_size
+        self.source = source
+        self.max_faces = max_faces
+        self.max_restarts = max_restarts
+        self.pacing = pacing
+        self.loop = loop
+        self.restart_count = 0
+        self.last_timestamp = None
+        self.last_sequence = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._process = None
+        self._stopped = False
+        self._paused = False
+        self._source_finished = False
+        self._next_restart_time = 0.0
+        self._next_health_check = 0.0
+        self.frame_ring = SharedFrameRing.create(slots, (height, width, 3), np.uint8)
+        self.landmark_ring = SharedFrameRing.create(slots, (MAX_LANDMARKS, 3), np.float32)
+        self._frame_buffer = np.empty(self.frame_ring.shape, dtype=np.uint8)
+        self._landmark_buffer = np.empty(self.landmark_ring.shape, dtype=np.float32)
+        self._start_process()
+
+    def _start_process(self):
+        self._stop_event.clear()
+        self._process = self._context.Process(
+            target=_detection_process_main,
+            args=(self.source, self.frame_ring.spec(), self.landmark_ring.spec(), self._stop_event, self.max_faces, self.pacing, self.loop),
+            name="DetectionProcess", daemon=True)
+        self._process.start()
+        print(f"DetectionProcess: Child started (pid {self._process.pid}).")
+
+    def _check_process(self):
+        """Restarts the child if it died unexpectedly."""
+        now = time.monotonic()
+        if self._stopped or self._paused or now < self._next_health_check: return
+        self._next_health_check = now + 0.25
+        if self._process.is_alive(): return
+        if self._process.exitcode == 0:
+            if not self._source_finished: print("DetectionProcess: Source ended, child exited.")
+            self._source_finished = True
+            return
+        if self.restart_count >= self.max_restarts:
+            if self._next_restart_time >= 0:
+                print(f"DetectionProcess: Child exited (code {self._process.exitcode}), restart limit reached.")
+                self._next_restart_time = -1
+            return
+        if self._next_restart_time == 0.0:
+            backoff = min(5.0, 0.5 * (2 ** self.restart_count))
+            print(f"DetectionProcess: Child exited (code {self._process.exitcode}), restarting in {backoff:.1f}s.")
+            self._next_restart_time = now + backoff
+        elif now >= self._next_restart_time:
+            self.restart_count += 1
+            self._next_restart_time = 0.0
+            self._start_process()
+
+    def read_detection(self):
+        """
+        Returns the newest frame and its landmarks without blocking.
+
+        :return: A tuple (success, frame, landmark_frame). landmark_frame is None
+                 if no face was detected. success is False if no new frame was
+                 published since the previous call.
+        """
+        self._check_process()
+        item = self.landmark_ring.read_latest(self._landmark_buffer, newer_than=self.last_sequence)
+        if item is None: return False, None, None
+        sequence, timestamp_ns, count = item
+        if self.frame_ring.read(sequence, self._frame_buffer) is None: return False, None, None
+        self.last_sequence = sequence
+        self.last_timestamp = timestamp_ns / 1e9
+        landmark_frame = None
+        if count > 0:
+            height, width = self.frame_ring.shape[:2]
+            landmark_frame = LandmarkFrame(self._landmark_buffer[:count].copy(), self.last_timestamp, 0, (width, height))
+        return True, self._frame_buffer, landmark_frame
+
+    def read_frame(self):
+        success, frame, _ = self.read_detection()
+        return success, frame
+
+    def is_opened(self):
+        if self._stopped or self._source_finished: return False
+        return self._paused or self._process.is_alive() or self.restart_count < self.max_restarts
+
+    def _stop_child(self, timeout):
+        self._stop_event.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            print("DetectionProcess: Child did not stop in time, terminating.")
+            self._process.terminate()
+            self._process.join(timeout)
+
+    def pause(self, timeout=2.0):
+        """Stops the child process, so the camera and FaceMesh are idle until resume()."""
+        if self._stopped or self._paused: return
+        self._paused = True
+        self._stop_child(timeout)
+        print("DetectionProcess: Paused.")
+
+    def resume(self):
+        """Starts a new child process after pause(), which reopens the source."""
+        if self._stopped or not self._paused: return
+        self._paused = False
+        self._source_finished = False
+        self._next_restart_time = 0.0
+        self._start_process()
+
+    def stop(self, timeout=2.0):
+        """Stops the child process and frees the shared memory."""
+        if self._stopped: return
+        self._stopped = True
+        if not self._paused: self._stop_child(timeout)
+        for ring in (self.frame_ring, self.landmark_ring):
+            ring.close()
+            ring.unlink()
+        print("DetectionProcess: Stopped and shared memory released.")
+
+    def release(self): self.stop()
+    def close(self): self.stop()
@@ -0,0 +1,95 @@
+import threading
+
+import numpy as np
+
+from .landmark_frame import LandmarkFrame
+
+
+class DetectionScheduler:
+    """
+    Decides on which frames Face Mesh runs and predicts the landmarks in between.
+
+    After each frame the gesture ratios are compared with the threshold that
+    would change their state (the on threshold of an inactive gesture, the off
+    threshold of an active one). While every ratio is further than `margin`
+    (a fraction of its threshold) from it, the next inference is postponed
+    until the ratio could reach the margin at its current speed, but never
+    by more than `budget_ms` after the last inference. This bounds the extra
+    trigger latency. Skipped frames get landmarks extrapolated with the
+    velocity between the last two inferences.
+    """
+    def __init__(self, budget_ms=100, margin=0.25):
+        """
+        :param budget_ms: Maximum time between two inferences, measured with the frame timestamps.
+        :param margin: Distance to a threshold, as a fraction of the threshold, below which every frame is inferred.
+        """
+        self.budget_s = budget_ms / 1000.0
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(("checked", "predicted"), 0)
+        self.reset()
+
+    def reset(self):
+        """Forgets the last inferences, so the next frame is inferred."""
+        self._landmark_frame = None
+        self._velocity = None
+        self._inferred_at = None
+        self._next_inference = None
+        self._ratios = None
+        self._ratios_at = None
+
+    def check(self, timestamp):
+        """
+        :param timestamp: Monotonic timestamp of the frame in seconds.
+        :return: Landmarks extrapolated to this frame's timestamp if inference
+                 can be skipped, None if the frame must be inferred.
+        """
+        with self._lock: self._counts["checked"] += 1
+        if self._next_inference is None or timestamp >= self._next_inference or timestamp < self._inferred_at: return None
+        with self._lock: self._counts["predicted"] += 1
+        last = self._landmark_frame
+        points = last.points if self._velocity is None else last.points + self._velocity * (timestamp - self._inferred_at)
+        return LandmarkFrame(points, timestamp, last.face_index, last.image_size)
+
+    def update(self, landmark_frame, timestamp):
+        """Remembers the result of an inference. The next frame is inferred unless plan() allows otherwise."""
+        if landmark_frame is None: self.reset(); return
+        last, elapsed = self._landmark_frame, None if self._inferred_at is None else timestamp - self._inferred_at
+        # Motion over a long gap says little about the next frames
+        if last is not None and 0.0 < elapsed <= 2.0 * self.budget_s and last.points.shape == landmark_frame.points.shape:
+            self._velocity = (landmark_frame.points - last.points) / elapsed
+        else: self._velocity = None
+        self._landmark_frame = landmark_frame
+        self._inferred_at = timestamp
+        self._next_inference = timestamp
+
+    def plan(self, ratios, hysteresis, timestamp):
+        """
+        Schedules the next inference from the ratios of the current frame.
+
+        :param ratios: Array of the (filtered) gesture ratios of this frame.
+        :param hysteresis: The Hysteresis that turned the ratios into states.
+        :param timestamp: Monotonic timestamp of the frame in seconds.
+        """
+        if self._inferred_at is None: return
+        previous, previous_at = self._ratios, self._ratios_at
+        self._ratios, self._ratios_at = ratios.copy(), timestamp
+        thresholds = np.where(hysteresis.active, hysteresis.off_thresholds, hysteresis.on_thresholds)
+        headroom = np.abs(ratios - thresholds) - self.margin * np.abs(hysteresis.on_thresholds)
+        if not np.all(headroom > 0.0): self._next_inference = timestamp; return
+        # Between inferences the schedule is only ever brought forward
+        next_inference = self._inferred_at + self.budget_s if timestamp == self._inferred_at else self._next_inference
+        if previous is not None and previous.shape == ratios.shape and 0.0 < timestamp - previous_at <= self.budget_s:
+            speed = np.abs(ratios - previous) / (timestamp - previous_at)
+            moving = speed > 0.0
+            if np.any(moving): next_inference = min(next_inference, timestamp + float(np.min(headroom[moving] / speed[moving])))
+        self._next_inference = next_inference
+
+    def get_stats(self):
+        """
+        :return: A dict with the number of 'checked' frames, the 'predicted'
+                 ones that skipped inference and the 'predict_rate' (0-1).
+        """
+        with self._lock: stats = dict(self._counts)
+        stats["predict_rate"] = round(stats["predicted"] / stats["checked"], 4) if stats["checked"] else 0.0
+        return stats
@@ -0,0 +1,93 @@
+import threading
+
+import cv2
+import numpy as np
+
+from .landmark_frame import LandmarkFrame
+
+
+class FaceRoi:
+    """
+    Crops the detector input to the region of the face found in the previous frame.
+
+    The landmark bounding box of the last face is enlarged by `margin` on each
+    side, made square and resized to `input_size` pixels, so the detector and
+    the color conversion only process a small image. Landmarks detected in the
+    crop are mapped back to normalized full-frame coordinates. Without a
+    previous face, or if the face is not found in the crop, the full frame
+    is used.
+    """
+    def __init__(self, input_size=256, margin=0.3):
+        """
+        :param input_size: Side in pixels of the square image passed to the detector.
+        :param margin: Margin added on each side of the face bounding box, as a fraction of its size.
+        """
+        self.input_size = input_size
+        self.margin = margin
+        self._bounds = None # (x_min, y_min, x_max, y_max) of the last face, normalized
+        self._bgr_buffer = None
+        self._rgb_buffer = None
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(("cropped", "full_frame", "lost"), 0)
+
+    def reset(self):
+        """Forgets the last face, so the next frame is detected on the full frame."""
+        self._bounds = None
+
+    def region(self, width, height):
+        """
+        :return: The square crop (left, top, side) in pixels for a frame of this
+                 size, or None if the full frame has to be used.
+        """
+        if self._bounds is None: return None
+        x_min, y_min, x_max, y_max = self._bounds
+        face_side = max((x_max - x_min) * width, (y_max - y_min) * height)
+        side = int(np.ceil(face_side * (1.0 + 2.0 * self.margin)))
+        if side < 2 or side >= min(width, height): return None
+        center_x, center_y = (x_min + x_max) / 2.0 * width, (y_min + y_max) / 2.0 * height
+        left = int(min(max(center_x - side / 2.0, 0), width - side))
+        top = int(min(max(center_y - side / 2.0, 0), height - side))
+        return left, top, side
+
+    def crop_rgb(self, bgr_frame, region):
+        """Returns the region resized to input_size and converted to RGB, in a reused buffer."""
+        left, top, side = region
+        size = self.input_size
+        if self._rgb_buffer is None or self._rgb_buffer.shape[0] != size:
+            self._bgr_buffer = np.empty((size, size, 3), dtype=np.uint8)
+            self._rgb_buffer = np.empty((size, size, 3), dtype=np.uint8)
+        # Linear interpolation is much cheaper than area averaging for non-integer factors,
+        # and the detector shrinks the face to its own, smaller input anyway
+        cv2.resize(bgr_frame[top:top + side, left:left + side], (size, size), dst=self._bgr_buffer, interpolation=cv2.INTER_LINEAR)
+        self._rgb_buffer.flags.writeable = True
+        cv2.cvtColor(self._bgr_buffer, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        self._rgb_buffer.flags.writeable = False
+        return self._rgb_buffer
+
+    @staticmethod
+    def to_frame_coordinates(landmark_frame, region, width, height):
+        """Maps landmarks detected in the crop to normalized coordinates of the full frame."""
+        left, top, side = region
+        points = landmark_frame.points.copy()
+        points[:, 0] = (left + points[:, 0] * side) / width
+        points[:, 1] = (top + points[:, 1] * side) / height
+        points[:, 2] *= side / width # MediaPipe scales z like x
+        return LandmarkFrame(points, landmark_frame.timestamp, landmark_frame.face_index, (width, height))
+
+    def update(self, landmark_frame, cropped):
+        """
+        Remembers the face of the current frame for the next crop.
+
+        :param landmark_frame: The full-frame landmarks, None if no face was found.
+        :param cropped: Whether the landmarks were detected in a crop.
+        """
+        with self._lock:
+            self._counts["cropped" if cropped else "full_frame"] += 1
+            if landmark_frame is None and self._bounds is not None: self._counts["lost"] += 1
+        if landmark_frame is None: self._bounds = None; return
+        points = landmark_frame.points
+        self._bounds = (float(points[:, 0].min()), float(points[:, 1].min()), float(points[:, 0].max()), float(points[:, 1].max()))
+
+    def get_stats(self):
+        """:return: A dict with the number of 'cropped' and 'full_frame' detections and how often the face was 'lost'."""
+        with self._lock: return dict(self._counts)
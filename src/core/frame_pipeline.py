@@ -0,0 +1,408 @@
+import threading
+import time
+from typing import Any, NamedTuple
+
+import cv2
+import numpy as np
+
+from .detection_scheduler import DetectionScheduler
+from .face_roi import FaceRoi
+from .gesture_registry import GESTURE_REGISTRY, GestureFeatureEngine
+from .idle_monitor import IdleMonitor
+from .landmark_frame import LandmarkFrame
+from .motion_gate import MotionGate
+from .output_backends import PyAutoGUIBackend, compile_actions
+from .perf_stats import PipelineProfiler
+from .ratio_filter import Hysteresis, RatioFilter, release_thresholds
+
+HUD_REFRESH_SECONDS = 0.5
+
+
+class FrameResult(NamedTuple):
+    """Immutable outcome of processing one frame, handed from the pipeline to the view."""
+    frame: Any
+    landmark_frame: Any
+    ratios: dict
+    expression_states: dict
+    enabled_gestures: dict
+    calibration_state: str
+    calibration_instruction: str
+    timestamp: float
+    sequence: int
+    idle: bool = False # Nobody is in front of the camera, the frame was only checked for a face
+    processing_ms: float = 0.0 # Time process_frame took for this frame
+
+
+class FramePipeline:
+    """
+    Runs capture -> detect -> analyze -> trigger for single frames.
+
+    The pipeline has no Qt dependency, so it can be driven from the GUI timer,
+    from a worker thread or from a headless loop. Callers that mutate shared
+    state (calibrator, settings) from another thread should hold `lock`.
+    """
+    def __init__(self, config_manager, calibrator, monitored_expressions, overlay_renderer=None, action_executor=None, clock=None):
+        """
+        :param config_manager: The ConfigManager providing thresholds, actions and settings.
+        :param calibrator: The Calibrator fed with landmarks while a calibration runs.
+        :param monitored_expressions: List of expression keys to analyze.
+        :param overlay_renderer: Optional callable (bgr_image, landmark_frame, in_place=False) -> annotated image.
+        :param action_executor: Optional callable (expression_key, CompiledAction) executing
+                                a triggered action, e.g. an ActionDispatcher. Defaults to
+                                executing the action with PyAutoGUI on the calling thread.
+        :param clock: Callable returning monotonic seconds, used for frames without
+                      a capture timestamp. Defaults to time.monotonic.
+        """
+        self.config_manager = config_manager
+        self.calibrator = calibrator
+        self.monitored_expressions = list(monitored_expressions)
+        self.overlay_renderer = overlay_renderer
+        self.action_executor = action_executor or self._execute_action
+        self.clock = clock or time.monotonic
+        self.actions = {}
+        self._output_backend = None
+        self.webcam = None
+        self.detector = None
+        self.landmark_recorder = None
+        self.motion_gate = None
+        self.face_roi = None
+        self.detection_scheduler = None
+        self.idle_monitor = None
+        self.profiler = PipelineProfiler()
+        self.show_hud = False
+        self._hud_lines = []
+        self._hud_updated = 0.0
+        self.overlay_at_display_resolution = False
+        self.display_size = (640, 480)
+        self.lock = threading.RLock()
+        self.sequence = 0
+        self.active_since = {} # expression_key -> timestamp of the first frame of the current hold, or None
+        self._triggered = set() # Expressions whose current hold already fired its action
+        self._feature_engines = {}
+        self.load_settings()
+        self.reset_trigger_state()
+
+    def load_settings(self):
+        with self.lock:
+            self.thresholds = dict(self.config_manager.get_thresholds())
+            self.load_actions()
+            self._feature_engines = {}
+            self.hold_seconds = self.config_manager.get_setting("hold_ms", 130) / 1000.0
+            self.neutral_ratios = dict(self.config_manager.get_neutral_ratios())
+            self.ratio_filter_mode = self.config_manager.get_setting("ratio_filter", "off")
+            self.ratio_filter_min_cutoff = self.config_manager.get_setting("ratio_filter_min_cutoff", 2.0)
+            self.ratio_filter_beta = self.config_manager.get_setting("ratio_filter_beta", 1.0)
+            self.ratio_hysteresis = self.config_manager.get_setting("ratio_hysteresis", 0.0)
+            self._load_motion_gate()
+            self._load_face_roi()
+            self._load_detection_scheduler()
+            self._load_idle_monitor()
+            self.show_hud = bool(self.config_manager.get_setting("performance_hud", False))
+            self.overlay_at_display_resolution = self.config_manager.get_setting("overlay_resolution", "capture") == "display"
+            self.profiler.enabled = self.show_hud or bool(self.config_manager.get_setting("performance_stats", False))
+
+    def _load_motion_gate(self):
+        if not self.config_manager.get_setting("motion_gate", False): self.motion_gate = None; return
+        threshold = self.config_manager.get_setting("motion_gate_threshold", 1.5)
+        max_stale_ms = self.config_manager.get_setting("motion_gate_max_stale_ms", 250)
+        if self.motion_gate is None: self.motion_gate = MotionGate(threshold, max_stale_ms)
+        else: self.motion_gate.threshold = threshold; self.motion_gate.max_stale_s = max_stale_ms / 1000.0 # Keeps the skip counters
+
+    def _load_face_roi(self):
+        if not self.config_manager.get_setting("face_roi", False): self.face_roi = None; return
+        input_size = self.config_manager.get_setting("face_roi_size", 256)
+        margin = self.config_manager.get_setting("face_roi_margin", 0.3)
+        if self.face_roi is None: self.face_roi = FaceRoi(input_size, margin)
+        else: self.face_roi.input_size = input_size; self.face_roi.margin = margin
+
+    def _load_detection_scheduler(self):
+        if not self.config_manager.get_setting("adaptive_detection", False): self.detection_scheduler = None; return
+        budget_ms = self.config_manager.get_setting("adaptive_detection_budget_ms", 100)
+        margin = self.config_manager.get_setting("adaptive_detection_margin", 0.25)
+        if self.detection_scheduler is None: self.detection_scheduler = DetectionScheduler(budget_ms, margin)
+        else: self.detection_scheduler.budget_s = budget_ms / 1000.0; self.detection_scheduler.margin = margin
+
+    def _load_idle_monitor(self):
+        if not self.config_manager.get_setting("idle_mode", False): self.idle_monitor = None; return
+        timeout_ms = self.config_manager.get_setting("idle_timeout_ms", 5000)
+        poll_interval_ms = self.config_manager.get_setting("idle_poll_interval_ms", 500)
+        scale = self.config_manager.get_setting("idle_scale", 0.5)
+        if self.idle_monitor is None: self.idle_monitor = IdleMonitor(timeout_ms, poll_interval_ms, scale)
+        else: self.idle_monitor.timeout_s = timeout_ms / 1000.0; self.idle_monitor.poll_interval_s = poll_interval_ms / 1000.0; self.idle_monitor.scale = scale
+
+    def load_actions(self):
+        """Recompiles the actions after they were changed in the config."""
+        actions = compile_actions(self.config_manager.get_actions())
+        with self.lock: self.actions = actions
+
+    def reset_trigger_state(self):
+        with self.lock:
+            self.active_since = {expr: None for expr in self.monitored_expressions}
+            self._triggered.clear()
+            self._reset_ratio_filters()
+            if self.motion_gate is not None: self.motion_gate.reset()
+            if self.face_roi is not None: self.face_roi.reset()
+            if self.detection_scheduler is not None: self.detection_scheduler.reset()
+            if self.idle_monitor is not None: self.idle_monitor.reset()
+
+    def _reset_ratio_filters(self):
+        for _, ratio_filter, hysteresis in self._feature_engines.values(): ratio_filter.reset(); hysteresis.reset()
+
+    def reset_expression(self, expression_key):
+        with self.lock:
+            if expression_key in self.active_since: self.active_since[expression_key] = None
+            self._triggered.discard(expression_key)
+
+    def step(self):
+        """
+        Reads the next frame from the webcam and processes it.
+
+        :return: A FrameResult, a FrameResult with frame None if the capture failed,
+                 or None if no new frame is available yet.
+        """
+        if not self.webcam or not self.detector: return None
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler is not None: profiler.begin_frame()
+        detect = not hasattr(self.webcam, "read_detection")
+        landmark_frame = None
+        if detect: success, frame = self.webcam.read_frame()
+        else: success, frame, landmark_frame = self.webcam.read_detection()
+        if not success or frame is None:
+            if profiler is not None: profiler.cancel_frame()
+            if getattr(self.webcam, "threaded", False) and self.webcam.is_opened(): return None
+            return self._empty_result()
+        if profiler is not None: profiler.mark("capture")
+        return self.process_frame(frame, getattr(self.webcam, "last_timestamp", None), landmark_frame, detect=detect)
+
+    def frame_interval(self, active_interval_s):
+        """:return: The time in seconds the caller should wait between frames, longer while idle."""
+        idle_monitor = self.idle_monitor
+        if idle_monitor is None or not idle_monitor.idle: return active_interval_s
+        return max(active_interval_s, idle_monitor.poll_interval_s)
+
+    def _empty_result(self):
+        return FrameResult(None, None, {}, {}, dict(self.config_manager.get_enabled_gestures()), self.calibrator.state, self.calibrator.get_current_instruction(), self.clock(), self.sequence)
+
+    def process_frame(self, frame, timestamp=None, landmark_frame=None, detect=True):
+        """
+        Detects, analyzes and annotates a single BGR frame and fires triggers.
+
+        The frame is copied (or shrunk) once into a new output frame that the
+        overlay draws on in place, so results never share a buffer.
+
+        :param frame: The BGR frame (numpy array). It is not modified.
+        :param timestamp: Monotonic capture timestamp in seconds, defaults to the clock.
+                          Hold durations are measured with these timestamps.
+        :param landmark_frame: LandmarkFrame computed elsewhere (e.g. by the
+                               detection process). Only used if detect is False.
+        :param detect: Whether to run the detector on the frame.
+        :return: A FrameResult for this frame.
+        """
+        started = time.perf_counter()
+        if timestamp is None: timestamp = self.clock()
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler is not None and not profiler.in_frame: profiler.begin_frame()
+        idle_monitor = self.idle_monitor
+        if detect and idle_monitor is not None and idle_monitor.idle and not self.calibrator.is_calibrating():
+            # A face found by the check is processed at full resolution right away
+            if not self._poll_for_face(frame, timestamp, profiler, idle_monitor): return self._idle_result(timestamp, profiler, started)
+        output_size = self._display_output_size(frame) if self.overlay_at_display_resolution else None
+        if output_size: processing_frame = cv2.resize(frame, output_size, interpolation=cv2.INTER_AREA)
+        else: processing_frame = frame.copy()
+        if detect:
+            landmark_frame = self._detect(frame, timestamp, profiler)
+            if idle_monitor is not None: idle_monitor.observe(landmark_frame is not None, timestamp)
+        recorder = self.landmark_recorder
+        if recorder is not None: recorder.record(timestamp, landmark_frame)
+        annotated_frame = processing_frame
+
+        with self.lock:
+            self.sequence += 1
+            enabled_status = dict(self.config_manager.get_enabled_gestures())
+            ratios = {}
+            expression_states = {}
+
+            if self.calibrator.is_calibrating():
+                self.calibrator.process_landmarks(landmark_frame, timestamp)
+                instruction = self.calibrator.get_current_instruction()
+                if profiler is not None: profiler.mark("analyze")
+                if landmark_frame is not None:
+                    annotated_frame = self._draw_overlay(processing_frame, landmark_frame, in_place=True)
+                    cv2.putText(annotated_frame, f"CALIBRATING: {instruction}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2, cv2.LINE_AA)
+                else:
+                    cv2.putText(annotated_frame, f"CALIBRATING: {instruction}\n(Look at camera)", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2, cv2.LINE_AA)
+            else:
+                expression_states = {key: False for key in self.monitored_expressions}
+                if landmark_frame is not None:
+                    engine, ratio_filter, hysteresis = self._feature_engine_for(enabled_status)
+                    ratios = engine.compute_dict(landmark_frame)
+                    if ratios:
+                        filtered = ratio_filter(np.fromiter(ratios.values(), dtype=np.float64, count=len(ratios)), timestamp)
+                        if ratio_filter.mode != "off": ratios = dict(zip(engine.keys, filtered.tolist()))
+                        expression_states.update(zip(engine.keys, hysteresis(filtered).tolist()))
+                        if detect and self.detection_scheduler is not None: self.detection_scheduler.plan(filtered, hysteresis, timestamp)
+                    else: ratio_filter.reset(); hysteresis.reset()
+                    if profiler is not None: profiler.mark("analyze")
+                    annotated_frame = self._draw_overlay(processing_frame, landmark_frame, in_place=True)
+                    if profiler is not None: profiler.mark("draw")
+                    self._handle_triggers(expression_states, enabled_status, timestamp)
+                    if profiler is not None: profiler.mark("triggers")
+                else: self._reset_ratio_filters()
+
+            calibration_state = self.calibrator.state
+            calibration_instruction = self.calibrator.get_current_instruction()
+            sequence = self.sequence
+
+        if self.show_hud: self._draw_hud(annotated_frame)
+        if profiler is not None: profiler.end_frame()
+        annotated_frame.flags.writeable = False
+        return FrameResult(annotated_frame, landmark_frame, ratios, expression_states, enabled_status, calibration_state, calibration_instruction, timestamp, sequence,
+                           processing_ms=(time.perf_counter() - started) * 1000.0)
+
+    def _poll_for_face(self, bgr_frame, timestamp, profiler, idle_monitor):
+        """Checks a shrunk copy of the frame for a face while idle."""
+        scale = idle_monitor.scale
+        small = cv2.resize(bgr_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else bgr_frame
+        frame_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        frame_rgb.flags.writeable = False
+        if profiler is not None: profiler.mark("convert")
+        results = self.detector.detect_landmarks(frame_rgb)
+        if profiler is not None: profiler.mark("detect")
+        idle_monitor.observe(bool(results.multi_face_landmarks), timestamp)
+        return not idle_monitor.idle
+
+    def _idle_result(self, timestamp, profiler, started):
+        """Result of an idle frame: no output frame, overlay or analysis."""
+        recorder = self.landmark_recorder
+        if recorder is not None: recorder.record(timestamp, None)
+        with self.lock:
+            self.sequence += 1
+            enabled_status = dict(self.config_manager.get_enabled_gestures())
+            result = FrameResult(None, None, {}, {key: False for key in self.monitored_expressions}, enabled_status, self.calibrator.state,
+                                 self.calibrator.get_current_instruction(), timestamp, self.sequence, idle=True,
+                                 processing_ms=(time.perf_counter() - started) * 1000.0)
+        if profiler is not None: profiler.end_frame()
+        return result
+
+    def _display_output_size(self, frame):
+        """Returns the (width, height) the frame is shrunk to for display, or None if it already fits."""
+        height, width = frame.shape[:2]
+        scale = min(self.display_size[0] / width, self.display_size[1] / height)
+        if scale >= 1.0: return None
+        return (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    def _feature_engine_for(self, enabled_status):
+        """
+        Returns the compiled engine, the RatioFilter and the Hysteresis for the
+        enabled gestures. Filter and hysteresis state persists across frames.
+        """
+        enabled_keys = tuple(key for key in self.monitored_expressions if enabled_status.get(key, True) and key in GESTURE_REGISTRY)
+        cached = self._feature_engines.get(enabled_keys)
+        if cached is None:
+            default_thresholds = self.config_manager.DEFAULT_CONFIG.get("thresholds", {})
+            engine = GestureFeatureEngine(enabled_keys)
+            thresholds = np.array([self.thresholds.get(key, default_thresholds.get(key, 0.35)) for key in engine.keys], dtype=np.float64)
+            neutral = np.array([self.neutral_ratios.get(key, np.nan) for key in engine.keys], dtype=np.float64)
+            ratio_filter = RatioFilter(len(engine), self.ratio_filter_mode, self.ratio_filter_min_cutoff, self.ratio_filter_beta)
+            hysteresis = Hysteresis(thresholds, release_thresholds(thresholds, self.ratio_hysteresis, neutral))
+            cached = self._feature_engines[enabled_keys] = (engine, ratio_filter, hysteresis)
+        return cached
+
+    def _detect(self, bgr_frame, timestamp, profiler=None):
+        scheduler = self.detection_scheduler
+        if scheduler is not None:
+            predicted = scheduler.check(timestamp)
+            if profiler is not None: profiler.mark("schedule")
+            if predicted is not None: return predicted
+        landmark_frame = self._infer(bgr_frame, timestamp, profiler)
+        if scheduler is not None: scheduler.update(landmark_frame, timestamp)
+        return landmark_frame
+
+    def _infer(self, bgr_frame, timestamp, profiler=None):
+        motion_gate = self.motion_gate
+        if motion_gate is not None:
+            reused = motion_gate.check(bgr_frame, timestamp)
+            if profiler is not None: profiler.mark("motion_gate")
+            if reused is not None: return reused
+        height, width = bgr_frame.shape[:2]
+        face_roi = self.face_roi
+        if face_roi is not None:
+            landmark_frame = self._detect_in_face_roi(bgr_frame, timestamp, profiler, face_roi)
+            if landmark_frame is not None:
+                if motion_gate is not None: motion_gate.update(bgr_frame, landmark_frame, timestamp)
+                return landmark_frame
+        frame_rgb = cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2RGB)
+        frame_rgb.flags.writeable = False
+        if profiler is not None: profiler.mark("convert")
+        results = self.detector.detect_landmarks(frame_rgb)
+        if profiler is not None: profiler.mark("detect")
+        landmark_frame = LandmarkFrame.from_results(results, timestamp, (width, height))
+        if face_roi is not None: face_roi.update(landmark_frame, cropped=False)
+        if motion_gate is not None: motion_gate.update(bgr_frame, landmark_frame, timestamp)
+        return landmark_frame
+
+    def _detect_in_face_roi(self, bgr_frame, timestamp, profiler, face_roi):
+        """
+        Detects on the crop around the previous face.
+
+        :return: The full-frame LandmarkFrame, or None if there was no previous
+                 face or the face was not found in the crop.
+        """
+        height, width = bgr_frame.shape[:2]
+        region = face_roi.region(width, height)
+        if region is None: return None
+        frame_rgb = face_roi.crop_rgb(bgr_frame, region)
+        if profiler is not None: profiler.mark("convert")
+        results = self.detector.detect_landmarks(frame_rgb)
+        if profiler is not None: profiler.mark("detect")
+        landmark_frame = LandmarkFrame.from_results(results, timestamp)
+        if landmark_frame is not None: landmark_frame = face_roi.to_frame_coordinates(landmark_frame, region, width, height)
+        face_roi.update(landmark_frame, cropped=True)
+        return landmark_frame
+
+    def _draw_hud(self, bgr_image):
+        """Draws fps and per-stage milliseconds, refreshed a few times per second."""
+        now = time.monotonic()
+        if now - self._hud_updated >= HUD_REFRESH_SECONDS:
+            self._hud_updated = now
+            stats = self.profiler.snapshot()
+            self._hud_lines = [f"{stats['fps']:.1f} fps  late {stats['late_frames']}  dropped {stats['dropped_frames']}"]
+            self._hud_lines += [f"{stage}: {summary['mean_ms']:.1f} ms (p95 {summary['p95_ms']:.1f})" for stage, summary in stats["stages"].items()]
+        x = bgr_image.shape[1] - 260
+        for i, line in enumerate(self._hud_lines):
+            cv2.putText(bgr_image, line, (x, 20 + 18 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1, cv2.LINE_AA)
+
+    def _draw_overlay(self, bgr_image, landmark_frame, in_place=False):
+        if self.overlay_renderer is None: return bgr_image
+        if in_place: return self.overlay_renderer(bgr_image, landmark_frame, in_place=True)
+        return self.overlay_renderer(bgr_image, landmark_frame)
+
+    def _handle_triggers(self, expression_states, enabled_status, timestamp):
+        """
+        Fires the action of an expression once it was active for `hold_seconds`,
+        measured from the timestamp of its first active frame. It fires once per hold.
+        """
+        actions = self.actions
+        hold_seconds = self.hold_seconds
+
+        for expr_key in self.monitored_expressions:
+            current_state = expression_states.get(expr_key, False)
+
+            if not (current_state and enabled_status.get(expr_key, True)):
+                self.active_since[expr_key] = None
+                self._triggered.discard(expr_key)
+                continue
+            since = self.active_since.get(expr_key)
+            if since is None or timestamp < since: since = self.active_since[expr_key] = timestamp # Timestamps restart when a replay loops
+
+            if expr_key not in self._triggered and timestamp - since >= hold_seconds:
+                self._triggered.add(expr_key)
+                action = actions.get(expr_key)
+                if action is not None:
+                    print(f"****** Triggered (held {(timestamp - since) * 1000:.0f} ms): {expr_key} (Action: {dict(action.config)}) ******")
+                    self.action_executor(expr_key, action)
+
+    def _execute_action(self, expr_key, action):
+        if self._output_backend is None: self._output_backend = PyAutoGUIBackend()
+        try: self._output_backend.execute(action)
+        except Exception as e: print(f"Error pyautogui action {dict(action.config)} for {expr_key}: {e}")
@@ -0,0 +1,245 @@
+import abc
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+
+from .landmark_archive import ARCHIVE_EXTENSION, LandmarkReplaySource
+from .webcam_handler import WebcamHandler
+
+PACING_MODES = ("realtime", "fast")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+_END_OF_STREAM = object()
+
+
+class _PrefetchFrameSource(abc.ABC):
+    """
+    Base class for file-backed frame sources.
+
+    A daemon thread decodes frames into a bounded queue, so decoding overlaps
+    with detection. The source offers the same read_frame()/release()/
+    is_opened() interface as WebcamHandler.
+
+    Timestamps are derived from the frame index and the source FPS, which makes
+    replayed sessions reproducible regardless of how fast they are processed.
+    """
+    threaded = True
+
+    def __init__(self, source, fps, pacing="realtime", loop=False, queue_size=8, mirror=False):
+        """
+        :param source: Description of the source, used in log messages.
+        :param fps: Frame rate the frames were recorded at.
+        :param pacing: 'realtime' delivers frames at the source FPS,
+                       'fast' delivers them as fast as they are consumed.
+        :param loop: If True, the source restarts at the first frame when it ends.
+        :param queue_size: Maximum number of decoded frames held in memory.
+        :param mirror: If True, frames are flipped horizontally like the webcam feed.
+        """
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Unknown pacing '{pacing}', expected one of {PACING_MODES}.")
+        self.source = source
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.pacing = pacing
+        self.loop = loop
+        self.mirror = mirror
+        self.last_timestamp = None
+        self.last_sequence = 0
+        self.dropped_frames = 0
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._pending = None
+        self._frame_index = 0
+        self._end_queued = False
+        self._finished = False
+        self._start_time = None
+        self._stop_event = threading.Event()
+        self._reader_thread = threading.Thread(target=self._reader_loop, name="FrameSourceReader", daemon=True)
+        self._reader_thread.start()
+        print(f"Frame source {self.source} opened ({self.fps:.1f} FPS, {self.pacing} pacing).")
+
+    @abc.abstractmethod
+    def _rewind(self):
+        """Restarts the source at its first frame. Returns False if that is not possible."""
+
+    @abc.abstractmethod
+    def _decode_next(self):
+        """Returns the next decoded BGR frame, or None at the end of the source."""
+
+    def _close_source(self):
+        pass
+
+    def _put(self, item):
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader_loop(self):
+        try:
+            while not self._stop_event.is_set():
+                frame = self._decode_next()
+                if frame is None:
+                    if self.loop and self._rewind(): continue
+                    self._put(_END_OF_STREAM)
+                    return
+                if self.mirror: frame = cv2.flip(frame, 1)
+                if not self._put(frame): return
+        except Exception as e:
+            print(f"Error decoding frame source {self.source}: {e}")
+            self._put(_END_OF_STREAM)
+
+    def read_frame(self):
+        """
+        Returns the next frame of the source.
+
+        With 'realtime' pacing this never blocks and returns (False, None) until
+        the next frame is due. With 'fast' pacing it waits for the decoder.
+
+        :return: A tuple (success, frame). (False, None) once the source ended.
+        """
+        if self._finished: return False, None
+        if self._pending is None and self._end_queued:
+            self._pending = _END_OF_STREAM
+        if self._pending is None:
+            try:
+                self._pending = self._queue.get(timeout=0.5) if self.pacing == "fast" else self._queue.get_nowait()
+            except queue.Empty:
+                return False, None
+        if self._pending is _END_OF_STREAM:
+            self._finished = True
+            self._pending = None
+            print(f"Frame source {self.source} reached its end after {self._frame_index} frames.")
+            return False, None
+
+        now = time.monotonic()
+        if self._start_time is None: self._start_time = now
+        if self.pacing == "realtime":
+            elapsed = now - self._start_time
+            if elapsed < self._frame_index / self.fps: return False, None
+            self._skip_late_frames(elapsed)
+
+        frame = self._pending
+        self._pending = None
+        self.last_timestamp = self._start_time + self._frame_index / self.fps
+        self._frame_index += 1
+        self.last_sequence += 1
+        return True, frame
+
+    def _skip_late_frames(self, elapsed):
+        """Drops queued frames whose successor is already due, like a camera that is not read in time."""
+        while (self._frame_index + 1) / self.fps <= elapsed:
+            try:
+                next_item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if next_item is _END_OF_STREAM:
+                self._end_queued = True
+                return
+            self._pending = next_item
+            self._frame_index += 1
+            self.dropped_frames += 1
+
+    def has_new_frame(self):
+        return not self._finished and (self._pending is not None or self._end_queued or not self._queue.empty())
+
+    def get_capture_stats(self):
+        return {"sequence": self.last_sequence, "timestamp": self.last_timestamp, "dropped_frames": self.dropped_frames}
+
+    def release(self):
+        """Stops the prefetch thread and closes the source."""
+        self._stop_event.set()
+        if self._reader_thread is not None:
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
+            self._close_source()
+            print(f"Frame source {self.source} released.")
+
+    def is_opened(self):
+        """
+        :return: False once all frames were read or the source was released.
+        """
+        return not self._finished and not self._stop_event.is_set()
+
+
+class VideoFileSource(_PrefetchFrameSource):
+    """
+    Reads frames from a video file with OpenCV.
+    """
+    def __init__(self, path, pacing="realtime", loop=False, queue_size=8, fps=None, mirror=False):
+        """
+        :param path: Path of the video file.
+        :param fps: Overrides the frame rate stored in the file.
+        """
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            print(f"Error: Could not open video file {path}.")
+            sys.exit(f"Application exiting, video file {path} could not be opened.")
+        super().__init__(path, fps or self.capture.get(cv2.CAP_PROP_FPS), pacing, loop, queue_size, mirror)
+
+    def _rewind(self):
+        return self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _decode_next(self):
+        success, frame = self.capture.read()
+        return frame if success else None
+
+    def _close_source(self):
+        self.capture.release()
+
+
+class ImageSequenceSource(_PrefetchFrameSource):
+    """
+    Reads the images of a directory in file name order.
+    """
+    def __init__(self, directory, pacing="realtime", loop=False, queue_size=8, fps=30.0, mirror=False):
+        """
+        :param directory: Directory containing the images.
+        :param fps: Frame rate the images are played back at.
+        """
+        if not os.path.isdir(directory):
+            print(f"Error: Image directory {directory} not found.")
+            sys.exit(f"Application exiting, image directory {directory} not found.")
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            print(f"Error: Image directory {directory} contains no images.")
+            sys.exit(f"Application exiting, image directory {directory} contains no images.")
+        self._index = 0
+        super().__init__(directory, fps, pacing, loop, queue_size, mirror)
+
+    def _rewind(self):
+        self._index = 0
+        return True
+
+    def _decode_next(self):
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            self._index += 1
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is not None: return frame
+            print(f"Warn: Skipping unreadable image {path}.")
+        return None
+
+
+def open_frame_source(source=0, threaded=True, pacing="realtime", loop=False, mirror=False):
+    """
+    Opens a camera, video file, image directory or landmark archive.
+
+    :param source: A camera index (int or digit string), a video file path,
+                   a directory of images or a recorded landmark archive.
+    :param threaded: Passed to WebcamHandler for camera sources.
+    :param pacing: 'realtime' or 'fast', only used for file sources.
+    :param loop: Whether file sources restart when they end.
+    :param mirror: Whether file sources are flipped like the webcam feed.
+    :return: An object with the read_frame()/release()/is_opened() interface.
+    """
+    if isinstance(source, str) and source.strip().isdigit(): source = int(source)
+    if isinstance(source, int): return WebcamHandler(source=source, threaded=threaded)
+    if source.endswith(ARCHIVE_EXTENSION): return LandmarkReplaySource(source, pacing=pacing, loop=loop)
+    if os.path.isdir(source): return ImageSequenceSource(source, pacing=pacing, loop=loop, mirror=mirror)
+    return VideoFileSource(source, pacing=pacing, loop=loop, mirror=mirror)
@@ -0,0 +1,123 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .expression_analyzer import (
+    LIP_TOP_INDEX, LIP_BOTTOM_INDEX,
+    LEFT_EYE_CORNER_INDEX, RIGHT_EYE_CORNER_INDEX,
+    LEFT_EYEBROW_TOP_INDEX, LEFT_EYE_TOP_INDEX,
+    RIGHT_EYEBROW_TOP_INDEX, RIGHT_EYE_TOP_INDEX,
+    MOUTH_CORNER_LEFT, MOUTH_CORNER_RIGHT)
+from .landmark_frame import landmark_points
+
+# Axis weights applied to the (dx, dy) difference of a landmark pair.
+METRIC_AXES = {
+    "dx": (1.0, 0.0),        # horizontal gap
+    "dy": (0.0, 1.0),        # vertical gap
+    "distance": (1.0, 1.0),  # 2D euclidean distance
+}
+
+# All ratios are normalized by the horizontal distance between the eye corners.
+NORMALIZATION_PAIR = (LEFT_EYE_CORNER_INDEX, RIGHT_EYE_CORNER_INDEX)
+
+
+class GestureDefinition(NamedTuple):
+    """
+    Declares how a gesture ratio is computed from landmarks.
+
+    The ratio is the mean `metric` over all landmark `pairs`, divided by the
+    horizontal eye corner distance.
+    """
+    key: str
+    pairs: tuple
+    metric: str
+    calibration_phase: str
+    calibration_instruction: str
+
+
+GESTURE_REGISTRY = {}
+
+def register_gesture(definition):
+    """Adds a gesture to the registry, replacing an existing one with the same key."""
+    if definition.metric not in METRIC_AXES:
+        raise ValueError(f"Unknown metric '{definition.metric}' for gesture '{definition.key}'.")
+    if not definition.pairs:
+        raise ValueError(f"Gesture '{definition.key}' declares no landmark pairs.")
+    GESTURE_REGISTRY[definition.key] = definition
+    return definition
+
+register_gesture(GestureDefinition("mouth_open", ((LIP_TOP_INDEX, LIP_BOTTOM_INDEX),), "dy", "mouth", "Open Mouth Wide"))
+register_gesture(GestureDefinition("eyebrows_raised", ((LEFT_EYEBROW_TOP_INDEX, LEFT_EYE_TOP_INDEX), (RIGHT_EYEBROW_TOP_INDEX, RIGHT_EYE_TOP_INDEX)), "dy", "eyebrows", "Raise Eyebrows High"))
+register_gesture(GestureDefinition("smile", ((MOUTH_CORNER_LEFT, MOUTH_CORNER_RIGHT),), "distance", "smile", "Smile Naturally"))
+
+
+def gesture_landmark_indices(registry=None):
+    """Returns the sorted landmark indices needed by the registered gestures."""
+    registry = GESTURE_REGISTRY if registry is None else registry
+    indices = set(NORMALIZATION_PAIR)
+    for definition in registry.values():
+        for pair in definition.pairs: indices.update(pair)
+    return sorted(indices)
+
+
+class GestureFeatureEngine:
+    """
+    Computes the ratios of several gestures in one NumPy pass.
+
+    The gestures are compiled into gather-index arrays once. compute() accepts
+    a single (N, 3) landmark array or a (T, N, 3) batch.
+    """
+    def __init__(self, gesture_keys=None, registry=None):
+        """
+        :param gesture_keys: Keys of the gestures to compute, in output order.
+                             Defaults to all registered gestures. Unknown keys are skipped.
+        :param registry: Mapping of key -> GestureDefinition, defaults to GESTURE_REGISTRY.
+        """
+        registry = GESTURE_REGISTRY if registry is None else registry
+        if gesture_keys is None: gesture_keys = list(registry.keys())
+        definitions = [registry[key] for key in gesture_keys if key in registry]
+        self.keys = tuple(d.key for d in definitions)
+
+        first_indices, second_indices, axes = [], [], []
+        pair_weights = np.zeros((len(definitions), sum(len(d.pairs) for d in definitions)), dtype=np.float32)
+        column = 0
+        for row, definition in enumerate(definitions):
+            for first, second in definition.pairs:
+                first_indices.append(first); second_indices.append(second); axes.append(METRIC_AXES[definition.metric])
+                pair_weights[row, column] = 1.0 / len(definition.pairs)
+                column += 1
+        self._first_indices = np.array(first_indices, dtype=np.intp)
+        self._second_indices = np.array(second_indices, dtype=np.intp)
+        self._axis_weights = np.array(axes, dtype=np.float32).reshape(-1, 2)
+        self._pair_weights_t = np.ascontiguousarray(pair_weights.T)
+        self.max_index = max([NORMALIZATION_PAIR[0], NORMALIZATION_PAIR[1]] + first_indices + second_indices)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def compute(self, points):
+        """
+        :param points: Landmark coordinates, shape (N, 3) or (T, N, 3).
+        :return: Ratios with shape (G,) or (T, G), in the order of `keys`.
+                 A zero eye distance yields a ratio of 0.0.
+        """
+        points = np.asarray(points)
+        if points.shape[-2] <= self.max_index:
+            raise IndexError(f"Landmark array with {points.shape[-2]} points is too small for index {self.max_index}.")
+        deltas = (points[..., self._first_indices, :2] - points[..., self._second_indices, :2]) * self._axis_weights
+        pair_values = np.sqrt(np.einsum("...pk,...pk->...p", deltas, deltas))
+        eye_distance_x = np.abs(points[..., NORMALIZATION_PAIR[0], 0] - points[..., NORMALIZATION_PAIR[1], 0])
+        gesture_values = pair_values @ self._pair_weights_t
+        safe_distance = np.where(eye_distance_x == 0, 1.0, eye_distance_x)[..., None]
+        return np.where(eye_distance_x[..., None] == 0, 0.0, gesture_values / safe_distance)
+
+    def compute_dict(self, face_landmarks):
+        """
+        :param face_landmarks: A LandmarkFrame (or any input accepted by landmark_points).
+        :return: A dict key -> ratio (float), or {} if the landmarks are incomplete.
+        """
+        try:
+            ratios = self.compute(landmark_points(face_landmarks))
+        except (IndexError, AttributeError):
+            return {}
+        return dict(zip(self.keys, ratios.tolist()))
@@ -0,0 +1,65 @@
+import threading
+
+ACTIVE, IDLE = "active", "idle"
+
+
+class IdleMonitor:
+    """
+    Tracks whether anybody is in front of the camera.
+
+    The monitor switches to idle once no face was found for `timeout_ms`, and
+    back to active on the first frame with a face. While idle, the pipeline
+    only polls for a face every `poll_interval_ms` on a frame shrunk by
+    `scale`. Time spent in each state is measured with the frame timestamps.
+    """
+    def __init__(self, timeout_ms=5000, poll_interval_ms=500, scale=0.5):
+        """
+        :param timeout_ms: Time without a face after which the monitor becomes idle.
+        :param poll_interval_ms: Time between two frames processed while idle.
+        :param scale: Factor the frame is resized by for the face check while idle.
+        """
+        self.timeout_s = timeout_ms / 1000.0
+        self.poll_interval_s = poll_interval_ms / 1000.0
+        self.scale = scale
+        self._lock = threading.Lock()
+        self._durations = {ACTIVE: 0.0, IDLE: 0.0}
+        self._idle_entries = 0
+        self.state = ACTIVE
+        self._last_face_at = None
+        self._last_timestamp = None
+
+    @property
+    def idle(self):
+        return self.state == IDLE
+
+    def reset(self):
+        """Returns to the active state and restarts the timeout, keeping the statistics."""
+        self.state = ACTIVE
+        self._last_face_at = None
+        self._last_timestamp = None
+
+    def observe(self, face_found, timestamp):
+        """
+        Updates the state with the outcome of one frame.
+
+        :param face_found: Whether a face was detected in the frame.
+        :param timestamp: Monotonic timestamp of the frame in seconds.
+        :return: The new state, "active" or "idle".
+        """
+        with self._lock:
+            if self._last_timestamp is not None and timestamp > self._last_timestamp: self._durations[self.state] += timestamp - self._last_timestamp
+            self._last_timestamp = timestamp
+            if self._last_face_at is None or timestamp < self._last_face_at: self._last_face_at = timestamp # First frame, or restarted timestamps
+            if face_found: self._last_face_at = timestamp; self.state = ACTIVE
+            elif self.state == ACTIVE and timestamp - self._last_face_at >= self.timeout_s:
+                self.state = IDLE
+                self._idle_entries += 1
+            return self.state
+
+    def get_stats(self):
+        """
+        :return: A dict with the current 'state', the seconds spent 'active' and
+                 'idle', and how often the monitor became idle ('idle_entries').
+        """
+        with self._lock:
+            return {"state": self.state, "active_s": round(self._durations[ACTIVE], 3), "idle_s": round(self._durations[IDLE], 3), "idle_entries": self._idle_entries}
@@ -0,0 +1,271 @@
+import json
+import os
+import struct
+import time
+import types
+
+import numpy as np
+
+from .gesture_registry import gesture_landmark_indices
+from .landmark_frame import LandmarkFrame
+
+ARCHIVE_MAGIC = b"FGLMARC1"
+ARCHIVE_EXTENSION = ".landmarks"
+ARCHIVE_VERSION = 1
+HEADER_ALIGNMENT = 64
+# Coordinate stored for landmarks that were not recorded. Lies outside the
+# normalized [0, 1] range, so the overlay treats it as invisible.
+MISSING_COORDINATE = -1.0
+
+
+def _record_dtype(point_dtype, stored_points):
+    return np.dtype([("timestamp", "<f8"), ("face_present", "u1"), ("points", np.dtype(point_dtype).newbyteorder("<"), (stored_points, 3))])
+
+
+def _read_header(file):
+    magic = file.read(len(ARCHIVE_MAGIC))
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError("Not a landmark archive (bad magic).")
+    (json_length,) = struct.unpack("<I", file.read(4))
+    header = json.loads(file.read(json_length).decode("utf-8"))
+    if header.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported landmark archive version {header.get('version')}.")
+    return header
+
+
+class LandmarkRecorder:
+    """
+    Streams per-frame landmarks into an append-only binary archive.
+
+    The file starts with a small JSON header padded to 64 bytes, followed by
+    fixed-size records (timestamp, face_present, points). Records are buffered
+    in chunks and written with one call per chunk. A session cut short keeps
+    every complete chunk that was written.
+    """
+    def __init__(self, path, landmark_indices=None, num_points=468, dtype=np.float16, chunk_frames=256, append=False):
+        """
+        :param path: File path of the archive.
+        :param landmark_indices: Landmark indices to store, e.g. gesture_landmark_indices().
+                                 None stores all num_points landmarks.
+        :param num_points: Number of landmarks per face when all are stored.
+        :param dtype: np.float16 or np.float32 storage of the coordinates.
+        :param chunk_frames: Number of records buffered before they are written.
+        :param append: Appends to an existing archive with the same layout
+                       instead of overwriting it.
+        """
+        self.path = path
+        self.landmark_indices = None if landmark_indices is None else np.array(sorted(set(landmark_indices)), dtype=np.intp)
+        self.num_points = num_points if self.landmark_indices is None else max(num_points, int(self.landmark_indices[-1]) + 1)
+        self.dtype = np.dtype(dtype)
+        stored_points = self.num_points if self.landmark_indices is None else len(self.landmark_indices)
+        self.record_dtype = _record_dtype(self.dtype, stored_points)
+        self.frames_recorded = 0
+        self._chunk = np.zeros(max(1, chunk_frames), dtype=self.record_dtype)
+        self._chunk_fill = 0
+
+        header = {"version": ARCHIVE_VERSION, "dtype": self.dtype.name, "num_points": self.num_points,
+                  "indices": None if self.landmark_indices is None else self.landmark_indices.tolist()}
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as existing:
+                existing_header = _read_header(existing)
+                header_size = existing.tell()
+            if {k: existing_header.get(k) for k in header} != header:
+                raise ValueError(f"Cannot append to {path}: the archive layout differs.")
+            # A trailing partial record (e.g. after a crash) would misalign every appended record
+            complete_size = header_size + (os.path.getsize(path) - header_size) // self.record_dtype.itemsize * self.record_dtype.itemsize
+            if os.path.getsize(path) != complete_size: os.truncate(path, complete_size)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._write_header(header)
+        print(f"Recording landmarks to {path} ({stored_points} points, {self.dtype.name}).")
+
+    def _write_header(self, header):
+        payload = json.dumps(header).encode("utf-8")
+        header_size = len(ARCHIVE_MAGIC) + 4 + len(payload)
+        padding = -header_size % HEADER_ALIGNMENT
+        self._file.write(ARCHIVE_MAGIC + struct.pack("<I", len(payload) + padding) + payload + b" " * padding)
+
+    def record(self, timestamp, landmark_frame):
+        """
+        Adds one frame to the archive.
+
+        :param timestamp: Monotonic capture timestamp in seconds.
+        :param landmark_frame: The LandmarkFrame of the frame, or None if no face was detected.
+        """
+        record = self._chunk[self._chunk_fill]
+        record["timestamp"] = timestamp
+        if landmark_frame is None:
+            record["face_present"] = 0
+            record["points"] = 0
+        else:
+            points = landmark_frame.points
+            record["face_present"] = 1
+            if self.landmark_indices is None:
+                count = min(points.shape[0], self.num_points)
+                record["points"][:count] = points[:count]
+                record["points"][count:] = MISSING_COORDINATE
+            else:
+                count = np.searchsorted(self.landmark_indices, points.shape[0]) # The indices are sorted
+                record["points"][:count] = points[self.landmark_indices[:count]]
+                record["points"][count:] = MISSING_COORDINATE
+        self._chunk_fill += 1
+        self.frames_recorded += 1
+        if self._chunk_fill == len(self._chunk): self.flush()
+
+    def flush(self):
+        """Writes the buffered records to disk."""
+        if self._chunk_fill == 0 or self._file is None: return
+        self._file.write(self._chunk[:self._chunk_fill].tobytes())
+        self._file.flush()
+        self._chunk_fill = 0
+
+    def close(self):
+        if self._file is None: return
+        self.flush()
+        self._file.close()
+        self._file = None
+        print(f"Landmark recording {self.path} closed ({self.frames_recorded} frames).")
+
+
+class LandmarkArchive:
+    """
+    Read-only, memory-mapped view of a landmark archive.
+
+    Opening an archive only reads its header, so even hours of landmarks are
+    available instantly. `timestamps`, `face_present` and `points` are views
+    into the mapped file.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            header = _read_header(file)
+            self.header_size = file.tell()
+        self.dtype = np.dtype(header["dtype"])
+        self.num_points = header["num_points"]
+        indices = header.get("indices")
+        self.landmark_indices = None if indices is None else np.array(indices, dtype=np.intp)
+        stored_points = self.num_points if self.landmark_indices is None else len(self.landmark_indices)
+        self.record_dtype = _record_dtype(self.dtype, stored_points)
+        # A trailing partial record (e.g. after a crash) is ignored.
+        count = (os.path.getsize(path) - self.header_size) // self.record_dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.record_dtype, mode="r", offset=self.header_size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.record_dtype)
+        self.timestamps = self.records["timestamp"]
+        self.face_present = self.records["face_present"].astype(bool)
+        self.points = self.records["points"]
+
+    def __len__(self):
+        return len(self.records)
+
+    def expanded_points(self, start=0, stop=None):
+        """
+        Returns float32 landmarks of a range of records with the original
+        landmark indexing, shape (T, num_points, 3). Landmarks that were not
+        recorded are set to MISSING_COORDINATE.
+        """
+        stored = self.points[start:stop]
+        if self.landmark_indices is None: return stored.astype(np.float32)
+        expanded = np.full((stored.shape[0], self.num_points, 3), MISSING_COORDINATE, dtype=np.float32)
+        expanded[:, self.landmark_indices] = stored
+        return expanded
+
+    def landmark_frame(self, index, image_size=None):
+        """
+        :return: The LandmarkFrame of a record, or None if no face was recorded.
+        """
+        if not self.face_present[index]: return None
+        return LandmarkFrame(self.expanded_points(index, index + 1)[0], float(self.timestamps[index]), 0, image_size)
+
+
+class LandmarkReplayDetector:
+    """
+    Stands in for LandmarkDetector and returns recorded landmarks.
+
+    Each detect_landmarks() call returns the next record, regardless of the
+    frame passed in. The results object mimics MediaPipe's, with LandmarkFrame
+    objects in multi_face_landmarks.
+    """
+    def __init__(self, archive, loop=False):
+        """
+        :param archive: A LandmarkArchive or the path of an archive file.
+        :param loop: Whether to restart at the first record after the last one.
+        """
+        self.archive = archive if isinstance(archive, LandmarkArchive) else LandmarkArchive(archive)
+        self.loop = loop
+        self.index = 0
+        self.last_timestamp = None
+
+    def is_finished(self):
+        return not self.loop and self.index >= len(self.archive)
+
+    def detect_landmarks(self, frame_rgb=None):
+        if self.loop and len(self.archive) and self.index >= len(self.archive): self.index = 0
+        if self.index >= len(self.archive): return types.SimpleNamespace(multi_face_landmarks=None)
+        image_size = None if frame_rgb is None else (frame_rgb.shape[1], frame_rgb.shape[0])
+        landmark_frame = self.archive.landmark_frame(self.index, image_size)
+        self.last_timestamp = float(self.archive.timestamps[self.index])
+        self.index += 1
+        return types.SimpleNamespace(multi_face_landmarks=None if landmark_frame is None else [landmark_frame])
+
+    def close(self):
+        pass
+
+
+class LandmarkReplaySource:
+    """
+    Replays an archive through the read_detection() interface of the pipeline,
+    so analysis, calibration and triggers run without a camera or FaceMesh.
+
+    Frames are blank images of `frame_size`; the recorded timestamps are kept.
+    """
+    threaded = True
+
+    def __init__(self, archive, pacing="fast", loop=False, frame_size=(160, 120)):
+        """
+        :param archive: A LandmarkArchive or the path of an archive file.
+        :param pacing: 'fast' replays as fast as frames are consumed,
+                       'realtime' follows the recorded timestamps.
+        :param loop: Whether to restart at the first record after the last one.
+        :param frame_size: (width, height) of the blank frames.
+        """
+        self.detector = LandmarkReplayDetector(archive, loop=loop)
+        self.archive = self.detector.archive
+        self.source = self.archive.path
+        self.pacing = pacing
+        self.last_timestamp = None
+        self.last_sequence = 0
+        self._frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        self._frame.flags.writeable = False
+        self._start_time = None
+        self._released = False
+        print(f"Replaying {len(self.archive)} recorded frames from {self.source} ({pacing} pacing).")
+
+    def read_detection(self):
+        if self._released or self.detector.is_finished(): return False, None, None
+        if self.pacing == "realtime" and len(self.archive):
+            now = time.monotonic()
+            index = self.detector.index % len(self.archive)
+            # A looping replay starts over at the first recorded timestamp, so the pacing does too
+            if self._start_time is None or (index == 0 and self.detector.index): self._start_time = now - float(self.archive.timestamps[index])
+            if now - self._start_time < float(self.archive.timestamps[index]): return False, None, None
+        results = self.detector.detect_landmarks(self._frame)
+        self.last_timestamp = self.detector.last_timestamp
+        self.last_sequence += 1
+        landmark_frame = results.multi_face_landmarks[0] if results.multi_face_landmarks else None
+        return True, self._frame, landmark_frame
+
+    def read_frame(self):
+        success, frame, _ = self.read_detection()
+        return success, frame
+
+    def is_opened(self):
+        return not self._released and not self.detector.is_finished()
+
+    def release(self):
+        self._released = True
+
+    def close(self):
+        self.release()
@@ -0,0 +1,61 @@
+import numpy as np
+
+class LandmarkFrame:
+    """
+    Landmarks of one face in one frame as a contiguous float32 (N, 3) array.
+
+    Built once per frame from the MediaPipe results, so later stages index the
+    array instead of reading protobuf attributes one at a time.
+    """
+    __slots__ = ("points", "timestamp", "face_index", "image_size")
+
+    def __init__(self, points, timestamp=0.0, face_index=0, image_size=None):
+        """
+        :param points: Normalized (x, y, z) landmark coordinates, shape (N, 3).
+        :param timestamp: Monotonic capture timestamp of the frame in seconds.
+        :param face_index: Index of the face in the detection results.
+        :param image_size: (width, height) of the image the landmarks refer to.
+        """
+        self.points = np.ascontiguousarray(points, dtype=np.float32)
+        self.timestamp = timestamp
+        self.face_index = face_index
+        self.image_size = image_size
+
+    @staticmethod
+    def points_from_face_landmarks(face_landmarks, dtype=np.float32):
+        """Reads a NormalizedLandmarkList (or any object with `.landmark[i].x/.y/.z`) into an array."""
+        landmarks = face_landmarks.landmark
+        return np.array([(lm.x, lm.y, lm.z) for lm in (landmarks[i] for i in range(len(landmarks)))], dtype=dtype).reshape(-1, 3)
+
+    @classmethod
+    def from_face_landmarks(cls, face_landmarks, timestamp=0.0, face_index=0, image_size=None):
+        return cls(cls.points_from_face_landmarks(face_landmarks), timestamp, face_index, image_size)
+
+    @classmethod
+    def from_results(cls, results, timestamp=0.0, image_size=None, face_index=0):
+        """
+        Builds the LandmarkFrame for one face of a MediaPipe Face Mesh result.
+
+        :return: A LandmarkFrame, or None if the face was not detected.
+        """
+        faces = results.multi_face_landmarks
+        if not faces or face_index >= len(faces): return None
+        face = faces[face_index]
+        if isinstance(face, cls): return face
+        return cls.from_face_landmarks(face, timestamp, face_index, image_size)
+
+    def __len__(self):
+        return self.points.shape[0]
+
+    def __repr__(self):
+        return f"LandmarkFrame(n={len(self)}, timestamp={self.timestamp}, face_index={self.face_index}, image_size={self.image_size})"
+
+
+def landmark_points(face_landmarks):
+    """
+    Returns the (N, 3) coordinate array for a LandmarkFrame, a raw array or a
+    protobuf-style landmark list.
+    """
+    if isinstance(face_landmarks, LandmarkFrame): return face_landmarks.points
+    if isinstance(face_landmarks, np.ndarray): return face_landmarks
+    return LandmarkFrame.points_from_face_landmarks(face_landmarks, dtype=np.float64)
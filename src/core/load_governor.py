@@ -0,0 +1,122 @@
+import threading
+import time
+
+# Least to most detailed, in the order of gui.overlay_renderer.OVERLAY_LEVELS
+OVERLAY_DETAIL = ("off", "keypoints", "contours", "full")
+# Degradation steps, cheapest to notice first. Each level applies one more step.
+GOVERNOR_STEPS = (("display_fps", 30), ("overlay_level", "contours"), ("frame_interval_ms", 50), ("display_fps", 15),
+                  ("overlay_level", "keypoints"), ("capture_scale", 0.75), ("frame_interval_ms", 66), ("capture_scale", 0.5),
+                  ("frame_interval_ms", 100))
+# The frame and preview rates lower the CPU use, but not the time a single frame takes
+LATENCY_KNOBS = ("overlay_level", "capture_scale")
+GOVERNOR_METRICS = ("latency", "cpu")
+
+
+def _degrade(knob, current, value):
+    """Returns the cheaper of the current and the step value, so a step never raises the baseline."""
+    if knob == "overlay_level": return min(current, value, key=lambda level: OVERLAY_DETAIL.index(level) if level in OVERLAY_DETAIL else len(OVERLAY_DETAIL))
+    if knob == "display_fps": return value if not current or current <= 0 else min(current, value) # 0 means unlimited
+    if knob == "frame_interval_ms": return max(current, value)
+    return min(current, value)
+
+
+class LoadGovernor:
+    """
+    Trades capture resolution, frame rate, overlay detail and preview rate for a target load.
+
+    The load is measured over windows of `window_ms`: either the mean
+    processing time per frame ('latency' metric) or the CPU use of the whole
+    process in percent of one core ('cpu' metric). A window above the target by
+    more than `hysteresis` applies the next step of GOVERNOR_STEPS. Only after
+    `restore_windows` consecutive windows below the target by more than
+    `hysteresis` is the last step undone, so the governor does not oscillate
+    around the target.
+    """
+    def __init__(self, baseline, metric="latency", target_ms=20.0, target_cpu_percent=50.0, hysteresis=0.2, window_ms=2000, restore_windows=3, cpu_clock=None):
+        """
+        :param baseline: Dict of the configured 'display_fps', 'overlay_level',
+                         'frame_interval_ms' and 'capture_scale', used at level 0.
+        :param metric: One of GOVERNOR_METRICS.
+        :param target_ms: Target mean processing time per frame for the 'latency' metric.
+        :param target_cpu_percent: Target process CPU use for the 'cpu' metric.
+        :param hysteresis: Relative distance from the target that triggers a change.
+        :param window_ms: Length of a measurement window, measured with the frame timestamps.
+        :param restore_windows: Consecutive windows below the target needed to undo a step.
+        :param cpu_clock: Callable returning the process CPU time in seconds. Defaults to time.process_time.
+        """
+        if metric not in GOVERNOR_METRICS:
+            print(f"Warning: Unknown governor metric '{metric}', using 'latency'.")
+            metric = "latency"
+        self.baseline = dict(baseline)
+        self.metric = metric
+        self.target = target_ms if metric == "latency" else target_cpu_percent
+        self.hysteresis = hysteresis
+        self.window_s = window_ms / 1000.0
+        self.restore_windows = restore_windows
+        self.cpu_clock = cpu_clock or time.process_time
+        self.steps = [step for step in GOVERNOR_STEPS if metric != "latency" or step[0] in LATENCY_KNOBS]
+        self._lock = threading.Lock()
+        self.level = 0
+        self.decisions = dict(self.baseline)
+        self.load = None
+        self.changes = 0
+        self._windows_below = 0
+        self._start_window(None)
+
+    def _start_window(self, timestamp):
+        self._window_start = timestamp
+        self._cpu_start = self.cpu_clock()
+        self._frame_ms_sum = 0.0
+        self._frames = 0
+
+    def observe(self, frame_ms, timestamp):
+        """
+        Adds one processed frame.
+
+        :param frame_ms: Processing time of the frame in milliseconds.
+        :param timestamp: Monotonic timestamp of the frame in seconds.
+        :return: True if the decisions changed and have to be applied.
+        """
+        if self._window_start is None or timestamp < self._window_start: self._start_window(timestamp); return False
+        self._frame_ms_sum += frame_ms
+        self._frames += 1
+        elapsed = timestamp - self._window_start
+        if elapsed < self.window_s or not self._frames: return False
+        if self.metric == "latency": load = self._frame_ms_sum / self._frames
+        else: load = (self.cpu_clock() - self._cpu_start) / elapsed * 100.0
+        self._start_window(timestamp)
+        return self._decide(load)
+
+    def _decide(self, load):
+        self.load = load
+        level = self.level
+        if load > self.target * (1.0 + self.hysteresis):
+            self._windows_below = 0
+            level = min(level + 1, len(self.steps))
+        elif load < self.target * (1.0 - self.hysteresis):
+            self._windows_below += 1
+            if self._windows_below >= self.restore_windows: self._windows_below = 0; level = max(level - 1, 0)
+        else: self._windows_below = 0
+        if level == self.level: return False
+        self.set_level(level)
+        return True
+
+    def set_level(self, level):
+        """Applies the first `level` steps to the baseline."""
+        decisions = dict(self.baseline)
+        for knob, value in self.steps[:level]:
+            if knob in decisions: decisions[knob] = _degrade(knob, decisions[knob], value)
+        with self._lock:
+            self.level = level
+            self.decisions = decisions
+            self.changes += 1
+
+    def get_stats(self):
+        """
+        :return: A dict with the 'metric', its 'target', the 'load' of the last
+                 window, the current 'level' out of 'max_level', the 'decisions'
+                 and the number of level 'changes'.
+        """
+        with self._lock:
+            return {"metric": self.metric, "target": self.target, "load": None if self.load is None else round(self.load, 2),
+                    "level": self.level, "max_level": len(self.steps), "decisions": dict(self.decisions), "changes": self.changes}
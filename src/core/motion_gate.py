@@ -0,0 +1,98 @@
+import threading
+
+import cv2
+import numpy as np
+
+from .landmark_frame import LandmarkFrame
+
+THUMBNAIL_SIZE = (32, 32)
+# The face region is point-sampled to this size first; area-averaging the full
+# region directly costs about ten times as much.
+SAMPLE_SIZE = (64, 64)
+
+
+class MotionGate:
+    """
+    Decides whether a frame needs a new Face Mesh inference.
+
+    The region of the last detected face (its landmark bounding box plus a
+    margin) is shrunk to a small grayscale thumbnail and compared with the
+    thumbnail taken at the last inference. While the mean absolute difference
+    stays below `threshold` gray levels, the landmarks of the last inference
+    are reused. They are never reused for longer than `max_stale_ms`, and
+    every frame is inferred while no face is known.
+    """
+    def __init__(self, threshold=1.5, max_stale_ms=250, margin=0.15):
+        """
+        :param threshold: Mean absolute gray level difference (0-255) below which a frame counts as static.
+        :param max_stale_ms: Maximum age of reused landmarks, measured with the frame timestamps.
+        :param margin: Margin added around the face bounding box, as a fraction of its size.
+        """
+        self.threshold = threshold
+        self.max_stale_s = max_stale_ms / 1000.0
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(("checked", "skipped"), 0)
+        self.last_difference = None
+        self.reset()
+
+    def reset(self):
+        """Forgets the last inference, so the next frame is inferred."""
+        self._landmark_frame = None
+        self._region = None
+        self._thumbnail = None
+        self._inferred_at = None
+
+    def _face_region(self, landmark_frame, width, height):
+        points = landmark_frame.points
+        x_min, y_min = points[:, 0].min(), points[:, 1].min()
+        x_max, y_max = points[:, 0].max(), points[:, 1].max()
+        pad_x, pad_y = (x_max - x_min) * self.margin, (y_max - y_min) * self.margin
+        left, right = int(max(0.0, x_min - pad_x) * width), int(np.ceil(min(1.0, x_max + pad_x) * width))
+        top, bottom = int(max(0.0, y_min - pad_y) * height), int(np.ceil(min(1.0, y_max + pad_y) * height))
+        if right - left < 2 or bottom - top < 2: return None
+        return left, top, right, bottom
+
+    @staticmethod
+    def _thumbnail_of(bgr_frame, region):
+        left, top, right, bottom = region
+        sampled = cv2.resize(bgr_frame[top:bottom, left:right], SAMPLE_SIZE, interpolation=cv2.INTER_NEAREST)
+        small = cv2.resize(sampled, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def check(self, bgr_frame, timestamp):
+        """
+        :param bgr_frame: The captured BGR frame.
+        :param timestamp: Monotonic timestamp of the frame in seconds.
+        :return: The last LandmarkFrame with this frame's timestamp if the face
+                 region did not move, None if the frame must be inferred.
+        """
+        with self._lock: self._counts["checked"] += 1
+        if self._thumbnail is None or timestamp - self._inferred_at > self.max_stale_s or timestamp < self._inferred_at: return None
+        difference = cv2.absdiff(self._thumbnail_of(bgr_frame, self._region), self._thumbnail)
+        self.last_difference = float(cv2.mean(difference)[0])
+        if self.last_difference >= self.threshold: return None
+        with self._lock: self._counts["skipped"] += 1
+        last = self._landmark_frame
+        return LandmarkFrame(last.points, timestamp, last.face_index, last.image_size)
+
+    def update(self, bgr_frame, landmark_frame, timestamp):
+        """Remembers the result of an inference on `bgr_frame`."""
+        region = None
+        if landmark_frame is not None:
+            height, width = bgr_frame.shape[:2]
+            region = self._face_region(landmark_frame, width, height)
+        if region is None: self.reset(); return
+        self._landmark_frame = landmark_frame
+        self._region = region
+        self._thumbnail = self._thumbnail_of(bgr_frame, region)
+        self._inferred_at = timestamp
+
+    def get_stats(self):
+        """
+        :return: A dict with the number of 'checked' frames, the 'skipped'
+                 inferences and the 'skip_rate' (0-1).
+        """
+        with self._lock: stats = dict(self._counts)
+        stats["skip_rate"] = round(stats["skipped"] / stats["checked"], 4) if stats["checked"] else 0.0
+        return stats
@@ -0,0 +1,204 @@
+import abc
+import threading
+import time
+import types
+from typing import Any, NamedTuple
+
+ACTION_TYPES = ("press", "hotkey", "write")
+OUTPUT_BACKENDS = ("pyautogui", "low_latency", "recording")
+WRITE_INTERVAL_S = 0.01
+
+
+class CompiledAction(NamedTuple):
+    """An action config parsed once, ready to be executed by an OutputBackend."""
+    kind: str # 'press', 'hotkey' or 'write'
+    keys: tuple # Key names for 'press'/'hotkey', the characters to type for 'write'
+    config: Any # Read-only view of the action config it was compiled from
+
+
+def _normalize_key(key):
+    # Like PyAutoGUI: key names are lower case, single characters keep their case
+    return key.lower() if len(key) > 1 else key
+
+
+def compile_action(action_config):
+    """
+    Parses an action config ({'type': 'press'|'hotkey'|'write', 'value': ...}).
+
+    :return: A CompiledAction, or None if the config is empty or invalid.
+    """
+    if not action_config: return None
+    action_type = action_config.get("type"); action_value = action_config.get("value")
+    if action_type not in ACTION_TYPES or not isinstance(action_value, str) or not action_value:
+        print(f"Warn: Incomplete or invalid action {action_config}, it is ignored.")
+        return None
+    if action_type == "press": keys = (_normalize_key(action_value.strip()),)
+    elif action_type == "hotkey": keys = tuple(_normalize_key(k.strip()) for k in action_value.split(',') if k.strip())
+    else: keys = tuple(action_value)
+    if not keys or not keys[0]:
+        print(f"Warn: Action {action_config} has no keys, it is ignored.")
+        return None
+    return CompiledAction(action_type, keys, types.MappingProxyType(dict(action_config)))
+
+
+def compile_actions(actions_config):
+    """
+    Compiles the actions of ConfigManager.get_actions().
+
+    :return: A dict expression_key -> CompiledAction, without invalid actions.
+    """
+    compiled = {}
+    for expression_key, action_config in (actions_config or {}).items():
+        action = compile_action(action_config)
+        if action is not None: compiled[expression_key] = action
+    return compiled
+
+
+class OutputBackend(abc.ABC):
+    """
+    Injects the key events of compiled actions.
+
+    Subclasses implement key_down()/key_up(), or override press()/hotkey()
+    when the underlying library offers them.
+    """
+    name = "base"
+
+    def __init__(self, write_interval_s=WRITE_INTERVAL_S):
+        """
+        :param write_interval_s: Pause between two typed characters of a 'write' action.
+        """
+        self.write_interval_s = write_interval_s
+
+    @abc.abstractmethod
+    def key_down(self, key):
+        """Presses and holds a key."""
+
+    @abc.abstractmethod
+    def key_up(self, key):
+        """Releases a key."""
+
+    def press(self, key):
+        self.key_down(key)
+        self.key_up(key)
+
+    def hotkey(self, keys):
+        for key in keys: self.key_down(key)
+        for key in reversed(keys): self.key_up(key)
+
+    def type_character(self, character):
+        self.press(character)
+
+    def execute(self, action, cancel_event=None):
+        """
+        Executes a CompiledAction.
+
+        :param cancel_event: Optional threading.Event. 'write' actions stop typing once it is set.
+        :return: False if typing was cancelled, True otherwise.
+        """
+        if action.kind == "press": self.press(action.keys[0])
+        elif action.kind == "hotkey": self.hotkey(action.keys)
+        else:
+            for character in action.keys:
+                if cancel_event is not None and cancel_event.is_set(): return False
+                self.type_character(character)
+                if self.write_interval_s > 0: time.sleep(self.write_interval_s)
+        return True
+
+
+class PyAutoGUIBackend(OutputBackend):
+    """
+    Uses PyAutoGUI's public functions, including its fail-safe check and its
+    pause (pyautogui.PAUSE) after every press or hotkey.
+    """
+    name = "pyautogui"
+
+    def key_down(self, key):
+        import pyautogui
+        pyautogui.keyDown(key)
+
+    def key_up(self, key):
+        import pyautogui
+        pyautogui.keyUp(key)
+
+    def press(self, key):
+        import pyautogui
+        pyautogui.press(key)
+
+    def hotkey(self, keys):
+        import pyautogui
+        pyautogui.hotkey(*keys)
+
+    def type_character(self, character):
+        import pyautogui
+        pyautogui.typewrite(character, _pause=False)
+
+
+class LowLatencyBackend(OutputBackend):
+    """
+    Sends key events through PyAutoGUI's platform layer directly. This skips
+    the pause after every call and the fail-safe mouse position query.
+    """
+    name = "low_latency"
+
+    def __init__(self, write_interval_s=WRITE_INTERVAL_S):
+        super().__init__(write_interval_s)
+        self._platform = None
+
+    def _platform_module(self):
+        if self._platform is None:
+            import pyautogui
+            self._platform = pyautogui.platformModule
+        return self._platform
+
+    def key_down(self, key):
+        self._platform_module()._keyDown(key)
+
+    def key_up(self, key):
+        self._platform_module()._keyUp(key)
+
+
+class RecordingBackend(OutputBackend):
+    """
+    Records key events instead of injecting them. Each event is a tuple
+    (time.perf_counter_ns(), 'down' or 'up', key). Works without a display,
+    e.g. in tests or to measure trigger-to-keystroke latency.
+    """
+    name = "recording"
+
+    def __init__(self, write_interval_s=0.0):
+        super().__init__(write_interval_s)
+        self.events = []
+        self._condition = threading.Condition()
+
+    def _record(self, kind, key):
+        with self._condition:
+            self.events.append((time.perf_counter_ns(), kind, key))
+            self._condition.notify_all()
+
+    def key_down(self, key):
+        self._record("down", key)
+
+    def key_up(self, key):
+        self._record("up", key)
+
+    def wait_for_events(self, count, timeout=1.0):
+        """
+        Waits until at least `count` events were recorded.
+
+        :return: True if they were recorded before the timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.events) >= count, timeout)
+
+    def clear(self):
+        with self._condition: self.events.clear()
+
+
+def create_output_backend(name="pyautogui"):
+    """
+    :param name: One of OUTPUT_BACKENDS. Unknown names fall back to 'pyautogui'.
+    """
+    if name == "low_latency": return LowLatencyBackend()
+    if name == "recording": return RecordingBackend()
+    if name != "pyautogui": print(f"Warning: Unknown output backend '{name}', using 'pyautogui'.")
+    return PyAutoGUIBackend()
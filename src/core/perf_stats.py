@@ -0,0 +1,144 @@
+import threading
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+# Upper bucket edges (ms) of the latency histograms reported by PipelineProfiler.
+HISTOGRAM_EDGES_MS = (0, 1, 2, 5, 10, 16, 33, 50, 100, float("inf"))
+
+
+def summarize_latencies(samples_ns):
+    """
+    Summarizes a list of per-iteration durations.
+
+    :param samples_ns: Durations in nanoseconds.
+    :return: A dict with 'count', 'fps' (iterations per second of busy time)
+             and 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'.
+    """
+    samples = np.asarray(samples_ns, dtype=np.float64)
+    if samples.size == 0:
+        return {"count": 0, "fps": 0.0, "mean_ms": 0.0, **{f"p{p}_ms": 0.0 for p in PERCENTILES}}
+    mean_ns = float(samples.mean())
+    summary = {"count": int(samples.size), "fps": round(1e9 / mean_ns, 2) if mean_ns > 0 else 0.0, "mean_ms": round(mean_ns / 1e6, 4)}
+    for percentile, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+        summary[f"p{percentile}_ms"] = round(float(value) / 1e6, 4)
+    return summary
+
+
+def compare_results(current, baseline, tolerance=0.15, min_delta_ms=0.01):
+    """
+    Compares benchmark summaries against a baseline.
+
+    A stage regresses if its p50 or p95 latency grew, or its fps dropped,
+    by more than `tolerance` (relative). Changes smaller than `min_delta_ms`
+    per iteration are ignored, as they are within timer noise for tiny stages.
+
+    :param current: Mapping stage name -> summary from summarize_latencies().
+    :param baseline: Mapping stage name -> summary of the baseline run.
+    :return: A list of dicts (stage, metric, baseline, current, change), one per regression.
+    """
+    regressions = []
+    for stage, summary in current.items():
+        reference = baseline.get(stage)
+        if not reference: continue
+        for metric in ("p50_ms", "p95_ms", "fps"):
+            old, new = reference.get(metric), summary.get(metric)
+            if not old or not new: continue
+            change = (new - old) / old
+            if metric == "fps": regressed = change < -tolerance and 1000.0 / new - 1000.0 / old > min_delta_ms
+            else: regressed = change > tolerance and new - old > min_delta_ms
+            if regressed:
+                regressions.append({"stage": stage, "metric": metric, "baseline": old, "current": new, "change": round(change, 4)})
+    return regressions
+
+
+class PipelineProfiler:
+    """
+    Collects per-stage latencies of the frame pipeline in rolling windows.
+
+    A frame is timed with begin_frame(), one mark(stage) after each stage and
+    end_frame(). Stages running on other threads (e.g. Qt conversion) report
+    their duration with record(). Callers check `enabled` before timing, so a
+    disabled profiler only costs one attribute lookup per stage.
+    """
+    def __init__(self, enabled=False, window=300, frame_budget_ms=33.3):
+        """
+        :param enabled: Whether timings are collected.
+        :param window: Number of most recent samples kept per stage.
+        :param frame_budget_ms: Frames whose total latency exceeds this are counted as late.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.frame_budget_ns = int(frame_budget_ms * 1e6)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._counts = {}
+            self._frame_ends = np.zeros(self.window, dtype=np.int64)
+            self.frames = 0
+            self.late_frames = 0
+            self.dropped_frames = 0
+            self._frame_start = 0
+            self._last_mark = 0
+            self.in_frame = False
+
+    def begin_frame(self):
+        self._frame_start = self._last_mark = time.perf_counter_ns()
+        self.in_frame = True
+
+    def cancel_frame(self):
+        """Discards a frame that was begun but could not be read."""
+        self.in_frame = False
+
+    def mark(self, stage):
+        """Records the time since the previous mark (or begin_frame) as `stage`."""
+        now = time.perf_counter_ns()
+        self.record(stage, now - self._last_mark)
+        self._last_mark = now
+
+    def end_frame(self):
+        now = time.perf_counter_ns()
+        self.in_frame = False
+        total = now - self._frame_start
+        self.record("total", total)
+        with self._lock:
+            self._frame_ends[self.frames % self.window] = now
+            self.frames += 1
+            if total > self.frame_budget_ns: self.late_frames += 1
+
+    def record(self, stage, duration_ns):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = np.zeros(self.window, dtype=np.int64)
+                self._counts[stage] = 0
+            samples[self._counts[stage] % self.window] = duration_ns
+            self._counts[stage] += 1
+
+    def add_dropped(self, count=1):
+        with self._lock: self.dropped_frames += count
+
+    def snapshot(self):
+        """
+        :return: A dict with 'fps', 'frames', 'late_frames', 'dropped_frames' and
+                 per-stage summaries ('stages') over the rolling window. Each stage
+                 summary holds summarize_latencies() values, 'max_ms' and a
+                 'histogram' of sample counts per HISTOGRAM_EDGES_MS bucket.
+        """
+        with self._lock:
+            stages = {stage: samples[:min(self._counts[stage], self.window)].copy() for stage, samples in self._samples.items()}
+            ends = self._frame_ends[:min(self.frames, self.window)].copy()
+            stats = {"frames": self.frames, "late_frames": self.late_frames, "dropped_frames": self.dropped_frames}
+        ends.sort()
+        stats["fps"] = round((len(ends) - 1) * 1e9 / (ends[-1] - ends[0]), 2) if len(ends) > 1 and ends[-1] > ends[0] else 0.0
+        stats["stages"] = {}
+        for stage, samples in stages.items():
+            summary = summarize_latencies(samples)
+            summary["max_ms"] = round(float(samples.max()) / 1e6, 4) if samples.size else 0.0
+            summary["histogram"] = np.histogram(samples / 1e6, bins=HISTOGRAM_EDGES_MS)[0].tolist()
+            stats["stages"][stage] = summary
+        return stats
@@ -0,0 +1,112 @@
+import math
+
+import numpy as np
+
+RATIO_FILTERS = ("off", "ema", "one_euro")
+DERIVATIVE_CUTOFF_HZ = 1.0
+
+
+def smoothing_factor(dt, cutoff_hz):
+    """Exponential smoothing factor of a first-order low-pass filter, for a scalar or array cutoff."""
+    tau = 1.0 / (2.0 * math.pi * np.asarray(cutoff_hz, dtype=np.float64))
+    return 1.0 / (1.0 + tau / dt)
+
+
+class RatioFilter:
+    """
+    Low-pass filters the ratios of several gestures at once.
+
+    'one_euro' is the One Euro filter (Casiez et al., 2012): the cutoff rises
+    with the speed of the signal, so jitter at rest is smoothed while fast
+    movements pass with little lag. 'ema' is the same filter with a fixed
+    cutoff. The smoothing depends on the time between frames, not on the
+    frame rate. 'off' returns the ratios unchanged.
+    """
+    def __init__(self, size, mode="off", min_cutoff_hz=2.0, beta=1.0):
+        """
+        :param size: Number of gestures, the length of the ratio arrays.
+        :param mode: One of RATIO_FILTERS.
+        :param min_cutoff_hz: Cutoff frequency at rest. Lower values smooth more.
+        :param beta: How fast the cutoff rises with the speed of the ratio ('one_euro' only).
+        """
+        if mode not in RATIO_FILTERS:
+            print(f"Warning: Unknown ratio filter '{mode}', using 'off'.")
+            mode = "off"
+        self.size = size
+        self.mode = mode
+        self.min_cutoff_hz = min_cutoff_hz
+        self.beta = beta if mode == "one_euro" else 0.0
+        self._values = None
+        self._speeds = np.zeros(size, dtype=np.float64)
+        self._timestamp = None
+
+    def reset(self):
+        """Forgets the history, e.g. after the face was lost."""
+        self._values = None
+        self._speeds[:] = 0.0
+        self._timestamp = None
+
+    def __call__(self, ratios, timestamp):
+        """
+        :param ratios: Array of the current ratios, shape (size,).
+        :param timestamp: Monotonic timestamp of the frame in seconds.
+        :return: The filtered ratios, a new array.
+        """
+        ratios = np.asarray(ratios, dtype=np.float64)
+        if self.mode == "off": return ratios
+        dt = None if self._timestamp is None else timestamp - self._timestamp
+        if dt is None or dt <= 0 or self._values is None:
+            # First frame, or timestamps restarted: start from the raw ratios
+            self._values = ratios.copy(); self._speeds[:] = 0.0; self._timestamp = timestamp
+            return self._values.copy()
+        if self.beta:
+            speed_alpha = smoothing_factor(dt, DERIVATIVE_CUTOFF_HZ)
+            self._speeds += speed_alpha * ((ratios - self._values) / dt - self._speeds)
+            alpha = smoothing_factor(dt, self.min_cutoff_hz + self.beta * np.abs(self._speeds))
+        else:
+            alpha = smoothing_factor(dt, self.min_cutoff_hz)
+        self._values += alpha * (ratios - self._values)
+        self._timestamp = timestamp
+        return self._values.copy()
+
+
+class Hysteresis:
+    """
+    Turns ratios into active states with separate on and off thresholds.
+
+    A gesture becomes active above its on threshold and only becomes inactive
+    again below its (lower) off threshold, so a ratio hovering around the
+    threshold does not flicker.
+    """
+    def __init__(self, on_thresholds, off_thresholds=None):
+        """
+        :param on_thresholds: Array of the thresholds that activate a gesture.
+        :param off_thresholds: Array of the thresholds that release it, defaults to on_thresholds.
+        """
+        self.on_thresholds = np.asarray(on_thresholds, dtype=np.float64)
+        self.off_thresholds = self.on_thresholds if off_thresholds is None else np.minimum(np.asarray(off_thresholds, dtype=np.float64), self.on_thresholds)
+        self.active = np.zeros(self.on_thresholds.shape, dtype=bool)
+
+    def reset(self):
+        self.active[:] = False
+
+    def __call__(self, ratios):
+        """:return: A bool array, the active state of each gesture."""
+        self.active = np.where(self.active, ratios > self.off_thresholds, ratios > self.on_thresholds)
+        return self.active
+
+
+def release_thresholds(on_thresholds, hysteresis, neutral_ratios=None):
+    """
+    Derives the off thresholds of Hysteresis.
+
+    :param on_thresholds: Array of the on thresholds.
+    :param hysteresis: Fraction of the way from the on threshold down to the neutral
+                       ratio where a gesture is released. 0 disables hysteresis.
+    :param neutral_ratios: Array of the neutral ratios measured by calibration, NaN
+                           where unknown. Unknown neutral ratios are taken as 0.
+    """
+    on_thresholds = np.asarray(on_thresholds, dtype=np.float64)
+    neutral = np.zeros_like(on_thresholds) if neutral_ratios is None else np.nan_to_num(np.asarray(neutral_ratios, dtype=np.float64), nan=0.0)
+    neutral = np.minimum(neutral, on_thresholds)
+    return on_thresholds - hysteresis * (on_thresholds - neutral)
@@ -0,0 +1,105 @@
+import math
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate with the P-square algorithm (Jain & Chlamtac, 1985).
+
+    Keeps five markers whose heights are adjusted with piecewise-parabolic
+    interpolation, so memory and cost per sample are constant. The first five
+    samples are kept and give an exact result.
+    """
+    def __init__(self, p):
+        """
+        :param p: The quantile to estimate, in [0, 1].
+        """
+        if not 0.0 <= p <= 1.0: raise ValueError(f"Quantile {p} is outside [0, 1].")
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x):
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(x)
+            if self.count == 5: heights.sort()
+            return
+        if x < heights[0]: heights[0] = x; cell = 0
+        elif x >= heights[4]: heights[4] = x; cell = 3
+        else: cell = next(i for i in range(1, 5) if x < heights[i]) - 1
+        positions, desired = self._positions, self._desired
+        for i in range(cell + 1, 5): positions[i] += 1
+        for i in range(5): desired[i] += self._increments[i]
+        for i in range(1, 4):
+            offset = desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not heights[i - 1] < candidate < heights[i + 1]: candidate = self._linear(i, step)
+                heights[i] = candidate
+                positions[i] += step
+
+    def _parabolic(self, i, step):
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def _linear(self, i, step):
+        q, n = self._heights, self._positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    def value(self):
+        """:return: The current estimate, or None before the first sample."""
+        if self.count == 0: return None
+        if self.count > 5: return self._heights[2]
+        # Linear interpolation between the closest ranks, like np.percentile
+        ordered = sorted(self._heights)
+        rank = self.p * (len(ordered) - 1)
+        lower = math.floor(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (rank - lower) * (ordered[upper] - ordered[lower])
+
+
+class RunningStats:
+    """
+    Constant-memory statistics of a stream of values: count, mean and
+    variance (Welford's algorithm), min, max and optional P-square quantiles.
+    """
+    def __init__(self, quantiles=()):
+        """
+        :param quantiles: Quantiles (in [0, 1]) to estimate, e.g. (0.5,) for the median.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+        for estimator in self._quantiles.values(): estimator.add(x)
+
+    @property
+    def variance(self):
+        """Sample variance, 0.0 with fewer than two values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, p):
+        """:return: The estimate of a quantile passed to the constructor, or None without samples."""
+        return self._quantiles[p].value()
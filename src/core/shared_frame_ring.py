@@ -0,0 +1,114 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+class SharedFrameRing:
+    """
+    A ring of preallocated, equally shaped arrays in shared memory.
+
+    One process writes, other processes read without pickling. Every slot is
+    guarded by a sequence lock: the writer makes the slot's counter odd while
+    copying, so readers can detect and discard torn reads.
+    """
+    _CONTROL_FIELDS = 4 # lock counter, sequence, timestamp_ns, meta
+    _HEADER_ALIGN = 64
+
+    def __init__(self, shm, slots, shape, dtype, owner):
+        self.shm = shm
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        control_bytes = (1 + slots * self._CONTROL_FIELDS) * 8
+        data_offset = -(-control_bytes // self._HEADER_ALIGN) * self._HEADER_ALIGN
+        self._latest = np.ndarray((1,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self._control = np.ndarray((slots, self._CONTROL_FIELDS), dtype=np.int64, buffer=shm.buf, offset=8)
+        self._data = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=shm.buf, offset=data_offset)
+
+    @classmethod
+    def _required_size(cls, slots, shape, dtype):
+        control_bytes = (1 + slots * cls._CONTROL_FIELDS) * 8
+        data_offset = -(-control_bytes // cls._HEADER_ALIGN) * cls._HEADER_ALIGN
+        return data_offset + slots * int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    @classmethod
+    def create(cls, slots, shape, dtype=np.uint8):
+        """
+        Allocates a new ring. The creating process is responsible for unlink().
+
+        :param slots: Number of buffers in the ring.
+        :param shape: Shape of a single buffer, e.g. (height, width, 3).
+        :param dtype: Element type of the buffers.
+        """
+        shm = shared_memory.SharedMemory(create=True, size=cls._required_size(slots, shape, dtype))
+        ring = cls(shm, slots, shape, dtype, owner=True)
+        ring._latest[0] = 0
+        ring._control[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, slots, shape, dtype=np.uint8):
+        """Attaches to a ring created by another process (see spec())."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, slots, shape, dtype, owner=False)
+
+    def spec(self):
+        """:return: A tuple (name, slots, shape, dtype) that can be passed to attach()."""
+        return (self.shm.name, self.slots, self.shape, self.dtype.str)
+
+    def latest_sequence(self):
+        return int(self._latest[0])
+
+    def write(self, array, sequence, timestamp_ns, meta=0):
+        """
+        Copies `array` into the slot for `sequence` and publishes it.
+
+        :param sequence: Strictly increasing, positive frame sequence number.
+        """
+        slot = sequence % self.slots
+        control = self._control[slot]
+        control[0] += 1
+        np.copyto(self._data[slot], array, casting="unsafe")
+        control[1] = sequence
+        control[2] = timestamp_ns
+        control[3] = meta
+        control[0] += 1
+        self._latest[0] = sequence
+
+    def read(self, sequence, out):
+        """
+        Copies the buffer published under `sequence` into `out`.
+
+        :return: A tuple (sequence, timestamp_ns, meta), or None if the slot was
+                 overwritten or is being written.
+        """
+        if sequence <= 0: return None
+        control = self._control[sequence % self.slots]
+        for _ in range(3):
+            lock_before = int(control[0])
+            if lock_before % 2 == 1 or int(control[1]) != sequence: return None
+            np.copyto(out, self._data[sequence % self.slots])
+            timestamp_ns = int(control[2]); meta = int(control[3])
+            if int(control[0]) == lock_before and int(control[1]) == sequence:
+                return sequence, timestamp_ns, meta
+        return None
+
+    def read_latest(self, out, newer_than=0):
+        """
+        Copies the newest published buffer into `out`.
+
+        :param newer_than: Only return a buffer whose sequence is larger than this.
+        :return: A tuple (sequence, timestamp_ns, meta), or None if nothing new is available.
+        """
+        for _ in range(3):
+            sequence = self.latest_sequence()
+            if sequence <= newer_than: return None
+            item = self.read(sequence, out)
+            if item is not None: return item
+        return None
+
+    def close(self):
+        self._latest = None; self._control = None; self._data = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner: self.shm.unlink()
@@ -1,17 +1,22 @@
 import cv2
 import sys
+import threading
+import time
 
 class WebcamHandler:
     """
     A class to manage webcam access using OpenCV.
     """
-    def __init__(self, source=0):
+    def __init__(self, source=0, threaded=False):
         """
         Initializes the webcam connection.
 
         :param source: The index of the camera (0 is usually the default webcam).
+        :param threaded: If True, frames are read by a background thread that keeps
+                         only the newest frame, so read_frame() never blocks.
         """
         self.source = source
+        self.threaded = threaded
         self.capture = cv2.VideoCapture(self.source)
 
         if not self.capture.isOpened():
@@ -20,22 +25,125 @@ class WebcamHandler:
 
         print(f"Webcam source {self.source} opened successfully.")
 
+        # Latest-frame slot, only used in threaded mode.
+        self._slot_lock = threading.Lock()
+        self._slot_frame = None
+        self._slot_timestamp = 0.0
+        self._slot_sequence = 0
+        self._last_read_sequence = 0
+        self.dropped_frames = 0
+        self.last_timestamp = None
+        self.last_sequence = 0
+        self._stop_event = threading.Event()
+        self._reader_thread = None
+        self._requested_resolution = None
+
+        if self.threaded:
+            self._reader_thread = threading.Thread(target=self._reader_loop, name="WebcamReader", daemon=True)
+            self._reader_thread.start()
+            print(f"Webcam source {self.source}: background capture thread started.")
+
+    def _reader_loop(self):
+        """Continuously reads frames and stores the newest one in the slot."""
+        while not self._stop_event.is_set():
+            self._apply_requested_resolution()
+            success, frame = self.capture.read()
+            if not success or frame is None:
+                if not self.capture.isOpened(): break
+                time.sleep(0.005)
+                continue
+            frame = cv2.flip(frame, 1)
+            timestamp = time.monotonic()
+            with self._slot_lock:
+                if self._slot_sequence > self._last_read_sequence:
+                    self.dropped_frames += 1
+                self._slot_frame = frame
+                self._slot_timestamp = timestamp
+                self._slot_sequence += 1
+
     def read_frame(self):
         """
         Reads a single frame from the webcam.
 
+        In threaded mode this returns the newest frame from the background reader
+        without blocking. If no new frame arrived since the previous call,
+        (False, None) is returned.
+
         :return: A tuple (success, frame), where success is a boolean
                  and frame is the image (numpy array) or None on error.
         """
+        if self.threaded:
+            return self._read_latest()
+        self._apply_requested_resolution()
         success, frame = self.capture.read()
         if success:
             frame = cv2.flip(frame, 1)
+            self.last_timestamp = time.monotonic()
+            self.last_sequence += 1
         return success, frame
 
+    def _read_latest(self):
+        with self._slot_lock:
+            if self._slot_sequence == self._last_read_sequence:
+                return False, None
+            frame = self._slot_frame
+            self._last_read_sequence = self._slot_sequence
+            self.last_sequence = self._slot_sequence
+            self.last_timestamp = self._slot_timestamp
+        return True, frame
+
+    def has_new_frame(self):
+        """
+        Checks whether the background reader has a frame that was not read yet.
+
+        :return: True if a call to read_frame() would return a new frame.
+        """
+        if not self.threaded: return self.is_opened()
+        with self._slot_lock:
+            return self._slot_sequence > self._last_read_sequence
+
+    def get_resolution(self):
+        """:return: The (width, height) the camera currently captures at."""
+        return int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def set_resolution(self, width, height):
+        """
+        Requests a new capture resolution.
+
+        The request is applied before the next frame is read, on the thread that
+        reads the camera. Cameras that do not support the size pick the closest one
+        or ignore it.
+        """
+        with self._slot_lock: self._requested_resolution = (int(width), int(height))
+
+    def _apply_requested_resolution(self):
+        with self._slot_lock:
+            resolution, self._requested_resolution = self._requested_resolution, None
+        if resolution is None: return
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+        width, height = self.get_resolution()
+        print(f"Webcam source {self.source}: capture resolution {width}x{height} (requested {resolution[0]}x{resolution[1]}).")
+
+    def get_capture_stats(self):
+        """
+        Returns information about the most recently read frame.
+
+        :return: A dict with the frame 'sequence', its monotonic 'timestamp'
+                 and the number of 'dropped_frames' that were overwritten
+                 before they could be read.
+        """
+        with self._slot_lock:
+            return {"sequence": self.last_sequence, "timestamp": self.last_timestamp, "dropped_frames": self.dropped_frames}
+
     def release(self):
         """
         Releases the webcam resource.
         """
+        self._stop_event.set()
+        if self._reader_thread is not None:
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
         if self.capture.isOpened():
             self.capture.release()
             print(f"Webcam source {self.source} released.")
@@ -1,30 +1,46 @@
+import cv2
+import numpy as np
 
-def draw_landmarks_on_image(bgr_image, detection_result,
-                            mp_drawing, mp_face_mesh, mp_drawing_styles):
+
+def _landmarks_to_pixels(points, width, height):
+    """Projects normalized landmarks to pixel coordinates, like MediaPipe's drawing utils."""
+    pixels = np.empty((points.shape[0], 2), dtype=np.int32)
+    np.minimum(np.floor(points[:, 0] * width), width - 1, out=pixels[:, 0], casting="unsafe")
+    np.minimum(np.floor(points[:, 1] * height), height - 1, out=pixels[:, 1], casting="unsafe")
+    visible = (points[:, 0] >= 0) & (points[:, 0] <= 1) & (points[:, 1] >= 0) & (points[:, 1] <= 1)
+    return pixels, visible
+
+
+def _draw_connections(image, pixels, visible, connections, drawing_spec):
+    num_landmarks = pixels.shape[0]
+    for connection in connections:
+        start_idx, end_idx = connection
+        if start_idx >= num_landmarks or end_idx >= num_landmarks: continue
+        if not (visible[start_idx] and visible[end_idx]): continue
+        spec = drawing_spec[connection] if isinstance(drawing_spec, dict) else drawing_spec
+        cv2.line(image, (int(pixels[start_idx, 0]), int(pixels[start_idx, 1])), (int(pixels[end_idx, 0]), int(pixels[end_idx, 1])), spec.color, spec.thickness)
+
+
+def draw_landmarks_on_image(bgr_image, landmark_frame,
+                            mp_drawing, mp_face_mesh, mp_drawing_styles, in_place=False):
     """
     Draws the detected face landmarks onto the image.
-    Uses the passed MediaPipe drawing functions and constants.
+    Uses the passed MediaPipe connection constants and drawing styles.
 
     :param bgr_image: The BGR image (numpy array) to draw upon.
-    :param detection_result: The 'results' object from MediaPipe Face Mesh process().
+    :param landmark_frame: The LandmarkFrame of the detected face, or None.
     :param mp_drawing: The mediapipe.solutions.drawing_utils module.
     :param mp_face_mesh: The mediapipe.solutions.face_mesh module.
     :param mp_drawing_styles: The mediapipe.solutions.drawing_styles module.
-    :return: A new image (numpy array) with the landmarks drawn.
+    :param in_place: Draw onto bgr_image itself instead of a copy.
+    :return: The image (numpy array) with the landmarks drawn.
     """
-    annotated_image = bgr_image.copy()
-    if detection_result.multi_face_landmarks:
-        for face_landmarks in detection_result.multi_face_landmarks:
-            mp_drawing.draw_landmarks(
-                image=annotated_image,
-                landmark_list=face_landmarks,
-                connections=mp_face_mesh.FACEMESH_TESSELATION,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_tesselation_style())
-            mp_drawing.draw_landmarks(
-                image=annotated_image,
-                landmark_list=face_landmarks,
-                connections=mp_face_mesh.FACEMESH_CONTOURS,
-                landmark_drawing_spec=None,
-                connection_drawing_spec=mp_drawing_styles.get_default_face_mesh_contours_style())
-    return annotated_image
\ No newline at end of file
+    annotated_image = bgr_image if in_place else bgr_image.copy()
+    if landmark_frame is not None:
+        height, width = annotated_image.shape[:2]
+        pixels, visible = _landmarks_to_pixels(landmark_frame.points, width, height)
+        _draw_connections(annotated_image, pixels, visible, mp_face_mesh.FACEMESH_TESSELATION,
+                          mp_drawing_styles.get_default_face_mesh_tesselation_style())
+        _draw_connections(annotated_image, pixels, visible, mp_face_mesh.FACEMESH_CONTOURS,
+                          mp_drawing_styles.get_default_face_mesh_contours_style())
+    return annotated_image
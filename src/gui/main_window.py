@@ -1,23 +1,42 @@
-import cv2
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QMessageBox,
-                             QSizePolicy, QFrame, QCheckBox)
+                             QFrame, QCheckBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap
 
-def convert_cv_qt(cv_img):
+from gui.video_widget import VideoWidget
+
+# Parsed once per indicator; state changes only switch the 'status' property.
+STATUS_INDICATOR_STYLE = (
+    'QLabel { color: #AAAAAA; font-size: 18pt; font-weight: bold; }'
+    'QLabel[status="active"] { color: #4CAF50; }'
+    'QLabel[status="disabled"] { color: #666666; }'
+)
+
+def convert_cv_qimage(cv_img):
+    """
+    Converts a BGR frame into a scaled QImage. Safe to call from worker threads.
+
+    The frame is wrapped as BGR888 without a color conversion. The returned
+    image never references the frame's memory.
+    """
     if cv_img is None: return None
     try:
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+        h, w, ch = cv_img.shape
+        if not cv_img.flags.c_contiguous: cv_img = cv_img.copy()
+        convert_to_Qt_format = QImage(cv_img.data, w, h, cv_img.strides[0], QImage.Format.Format_BGR888)
         scaled_img = convert_to_Qt_format.scaled(640, 480, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        return QPixmap.fromImage(scaled_img)
+        # scaled() returns a shallow copy if the size already matches
+        return scaled_img.copy() if scaled_img.size() == convert_to_Qt_format.size() else scaled_img
     except Exception as e:
         print(f"Error converting image for Qt: {e}")
         return None
 
+def convert_cv_qt(cv_img):
+    scaled_img = convert_cv_qimage(cv_img)
+    if scaled_img is None: return None
+    return QPixmap.fromImage(scaled_img)
+
 class MainWindow(QWidget):
     start_requested = pyqtSignal()
     stop_requested = pyqtSignal()
@@ -34,14 +53,13 @@ class MainWindow(QWidget):
         self.edit_action_buttons = {}
         self.status_indicators = {}
         self.enabled_checkboxes = {}
+        self._indicator_states = {}
         self._init_ui()
 
     def _init_ui(self):
         main_layout = QVBoxLayout(self)
-        self.video_label = QLabel("Click 'Start' to begin")
-        self.video_label.setObjectName("VideoLabel")
-        self.video_label.setAlignment(Qt.AlignmentFlag.AlignCenter); self.video_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding); self.video_label.setMinimumSize(640, 480); self.video_label.setStyleSheet("border: 1px solid #555; background-color: #333; color: white;")
-        main_layout.addWidget(self.video_label, stretch=1)
+        self.video_widget = VideoWidget("Click 'Start' to begin")
+        main_layout.addWidget(self.video_widget, stretch=1)
         expression_frame = QFrame(); expression_frame.setFrameShape(QFrame.Shape.StyledPanel); self.expressions_layout = QVBoxLayout(expression_frame); self.expressions_layout.setContentsMargins(5, 5, 5, 5)
         header_layout = QHBoxLayout(); header_layout.addWidget(QLabel("<b>Enabled</b>"), stretch=1); header_layout.addWidget(QLabel("<b>Expression</b>"), stretch=2); header_layout.addWidget(QLabel("<b>Configured Action</b>"), stretch=3); header_layout.addWidget(QLabel("<b>Status</b>"), stretch=1); header_layout.addWidget(QLabel("<b>Edit</b>"), stretch=1); self.expressions_layout.addLayout(header_layout)
         line = QFrame(); line.setFrameShape(QFrame.Shape.HLine); line.setFrameShadow(QFrame.Shadow.Sunken); self.expressions_layout.addWidget(line)
@@ -56,11 +74,11 @@ class MainWindow(QWidget):
 
     def _setup_expression_widgets(self):
         while self.expressions_layout.count() > 2: item = self.expressions_layout.takeAt(2); layout = item.layout();
-        self.action_display_labels.clear(); self.status_indicators.clear(); self.edit_action_buttons.clear(); self.enabled_checkboxes.clear()
+        self.action_display_labels.clear(); self.status_indicators.clear(); self.edit_action_buttons.clear(); self.enabled_checkboxes.clear(); self._indicator_states.clear()
         for expr_key in self.monitored_expressions:
             row_layout = QHBoxLayout(); enabled_checkbox = QCheckBox(); enabled_checkbox.setEnabled(False); enabled_checkbox.stateChanged.connect(lambda state, key=expr_key: self.gesture_enabled_changed.emit(key, state == Qt.CheckState.Checked.value)); self.enabled_checkboxes[expr_key] = enabled_checkbox
             expr_name_label = QLabel(expr_key.replace("_", " ").title()); action_display_label = QLabel("N/A"); self.action_display_labels[expr_key] = action_display_label
-            status_indicator = QLabel("●"); status_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter); status_indicator.setMinimumWidth(30); self.status_indicators[expr_key] = status_indicator; self._update_indicator_style(expr_key, False, False)
+            status_indicator = QLabel("●"); status_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter); status_indicator.setMinimumWidth(30); status_indicator.setStyleSheet(STATUS_INDICATOR_STYLE); self.status_indicators[expr_key] = status_indicator; self._update_indicator_style(expr_key, False, False)
             edit_button = QPushButton("Edit"); edit_button.setEnabled(False); edit_button.clicked.connect(lambda checked=False, key=expr_key: self.edit_action_requested.emit(key)); self.edit_action_buttons[expr_key] = edit_button
             row_layout.addWidget(enabled_checkbox, stretch=1); row_layout.addWidget(expr_name_label, stretch=2); row_layout.addWidget(action_display_label, stretch=3); row_layout.addWidget(status_indicator, stretch=1); row_layout.addWidget(edit_button, stretch=1)
             self.expressions_layout.addLayout(row_layout)
@@ -89,10 +107,8 @@ class MainWindow(QWidget):
             return f"Invalid Type ({action_type}): {action_value}"
 
     def update_video_display(self, cv_frame):
-        if cv_frame is None: self.video_label.setText("No Frame / Error"); return
-        qt_pixmap = convert_cv_qt(cv_frame)
-        if qt_pixmap: self.video_label.setPixmap(qt_pixmap)
-        else: self.video_label.setText("Error displaying frame")
+        if cv_frame is None: self.video_widget.set_text("No Frame / Error"); return
+        self.video_widget.set_frame(cv_frame)
 
     def update_action_displays(self, actions_config):
         print("View: Updating action displays...")
@@ -100,7 +116,12 @@ class MainWindow(QWidget):
             action_config = actions_config.get(expr_key, None); display_text = self._format_action_for_display(action_config); label.setText(display_text)
 
     def _update_indicator_style(self, expression_key, is_active, is_enabled):
-        if expression_key in self.status_indicators: label = self.status_indicators[expression_key]; color = "#666666" if not is_enabled else ("#4CAF50" if is_active else "#AAAAAA"); label.setStyleSheet(f"color: {color}; font-size: 18pt; font-weight: bold;"); label.setEnabled(is_enabled)
+        label = self.status_indicators.get(expression_key)
+        if label is None or self._indicator_states.get(expression_key) == (is_active, is_enabled): return
+        self._indicator_states[expression_key] = (is_active, is_enabled)
+        label.setProperty("status", "disabled" if not is_enabled else ("active" if is_active else "idle"))
+        label.setEnabled(is_enabled)
+        label.style().unpolish(label); label.style().polish(label)
 
     def update_expression_status(self, expression_states, enabled_states):
         for key in self.monitored_expressions: is_active = expression_states.get(key, False); is_enabled = enabled_states.get(key, True); self._update_indicator_style(key, is_active, is_enabled)
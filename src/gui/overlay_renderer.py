@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+
+from gui.drawing_utils import _landmarks_to_pixels
+
+OVERLAY_LEVELS = ("off", "keypoints", "contours", "full")
+KEYPOINT_COLOR = (0, 200, 255)
+KEYPOINT_RADIUS = 2
+
+
+def _connection_array(connections):
+    return np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+
+
+class OverlayRenderer:
+    """
+    Draws the face mesh overlay with precomputed connection arrays.
+
+    All landmarks are projected to pixels in one vectorized step and the
+    segments of one color are drawn with a single cv2.polylines call, instead
+    of one cv2.line call per connection. Produces the same look as MediaPipe's
+    default face mesh styles.
+
+    Instances are callables with the overlay_renderer signature of FramePipeline.
+    """
+    def __init__(self, mp_face_mesh=None, mp_drawing_styles=None, level="full", keypoint_indices=None):
+        """
+        :param mp_face_mesh: The mediapipe.solutions.face_mesh module (imported if None).
+        :param mp_drawing_styles: The mediapipe.solutions.drawing_styles module (imported if None).
+        :param level: One of OVERLAY_LEVELS.
+        :param keypoint_indices: Landmarks drawn at the 'keypoints' level,
+                                 defaults to the landmarks used by the gestures.
+        """
+        if mp_face_mesh is None or mp_drawing_styles is None:
+            import mediapipe as mp
+            mp_face_mesh = mp_face_mesh or mp.solutions.face_mesh
+            mp_drawing_styles = mp_drawing_styles or mp.solutions.drawing_styles
+        if keypoint_indices is None:
+            from core.gesture_registry import gesture_landmark_indices
+            keypoint_indices = gesture_landmark_indices()
+        self.keypoint_indices = np.array(keypoint_indices, dtype=np.intp)
+
+        tesselation_spec = mp_drawing_styles.get_default_face_mesh_tesselation_style()
+        self._tesselation_groups = [(_connection_array(mp_face_mesh.FACEMESH_TESSELATION), tesselation_spec.color, tesselation_spec.thickness)]
+        contour_styles = mp_drawing_styles.get_default_face_mesh_contours_style()
+        grouped = {}
+        for connection in mp_face_mesh.FACEMESH_CONTOURS:
+            spec = contour_styles[connection] if isinstance(contour_styles, dict) else contour_styles
+            grouped.setdefault((spec.color, spec.thickness), []).append(connection)
+        self._contour_groups = [(_connection_array(connections), color, thickness) for (color, thickness), connections in grouped.items()]
+        self.level = None
+        self.set_level(level)
+
+    def set_level(self, level):
+        if level not in OVERLAY_LEVELS:
+            print(f"Warning: Unknown overlay level '{level}', using 'full'.")
+            level = "full"
+        self.level = level
+
+    def __call__(self, bgr_image, landmark_frame, in_place=False):
+        return self.render(bgr_image, landmark_frame, in_place)
+
+    def render(self, bgr_image, landmark_frame, in_place=False):
+        """
+        :param bgr_image: The BGR image (numpy array) to draw upon.
+        :param landmark_frame: The LandmarkFrame of the detected face, or None.
+        :param in_place: Draw onto bgr_image itself instead of a copy.
+        :return: The image with the overlay drawn.
+        """
+        if self.level == "off" or landmark_frame is None: return bgr_image
+        annotated_image = bgr_image if in_place else bgr_image.copy()
+        height, width = annotated_image.shape[:2]
+        pixels, visible = _landmarks_to_pixels(landmark_frame.points, width, height)
+        if self.level == "keypoints":
+            indices = self.keypoint_indices[self.keypoint_indices < len(pixels)]
+            for x, y in pixels[indices[visible[indices]]].tolist():
+                cv2.circle(annotated_image, (x, y), KEYPOINT_RADIUS, KEYPOINT_COLOR, -1)
+            return annotated_image
+        groups = self._contour_groups if self.level == "contours" else self._tesselation_groups + self._contour_groups
+        for connections, color, thickness in groups:
+            self._draw_segments(annotated_image, pixels, visible, connections, color, thickness)
+        return annotated_image
+
+    @staticmethod
+    def _draw_segments(image, pixels, visible, connections, color, thickness):
+        connections = connections[(connections < len(pixels)).all(axis=1)]
+        connections = connections[visible[connections].all(axis=1)]
+        if len(connections) == 0: return
+        cv2.polylines(image, pixels[connections], False, color, thickness)
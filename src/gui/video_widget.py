@@ -0,0 +1,115 @@
+import time
+
+from PyQt6.QtCore import QRect, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+BACKGROUND_COLOR = QColor("#333333")
+TEXT_COLOR = QColor("white")
+BORDER_COLOR = QColor("#555555")
+
+
+class VideoWidget(QWidget):
+    """
+    Paints BGR frames directly, without converting them to a QPixmap first.
+
+    set_frame() only keeps a reference to the frame and schedules a repaint.
+    paintEvent() wraps the frame as a Format_BGR888 QImage and draws it once,
+    scaled to the widget with the aspect ratio kept. The target rectangle is
+    cached until the widget or the frame size changes. Repaints are capped at
+    `max_fps`, and nothing is scheduled while the window is hidden or minimized.
+
+    The frame must not be written to while it is shown; FramePipeline hands
+    out a new frame with every result for that reason.
+    """
+    display_size_changed = pyqtSignal(int, int)
+
+    def __init__(self, text="", max_fps=60, parent=None):
+        """
+        :param text: Text shown while there is no frame.
+        :param max_fps: Maximum repaints per second, 0 for no limit.
+        """
+        super().__init__(parent)
+        self.setObjectName("VideoLabel")
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(640, 480)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent) # paintEvent fills every pixel itself
+        self.profiler = None
+        self.painted_frames = 0
+        self.skipped_frames = 0
+        self._text = text
+        self._frame = None
+        self._target_rect = None
+        self._target_key = None
+        self._last_repaint = 0.0
+        self._min_interval = 0.0
+        self.set_max_fps(max_fps)
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.timeout.connect(self._request_repaint)
+
+    def set_max_fps(self, max_fps):
+        self._min_interval = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+
+    def set_text(self, text):
+        """Replaces the frame with a centered text."""
+        self._frame = None
+        self._text = text
+        self.update()
+
+    def set_frame(self, frame):
+        """
+        Shows a BGR frame (numpy array, HxWx3 uint8).
+
+        :return: False if the frame will not be painted because the window is
+                 hidden or minimized. It is still shown once the window is restored.
+        """
+        self._frame = frame
+        if not self.isVisible() or self.window().isMinimized():
+            self.skipped_frames += 1
+            return False
+        if self._repaint_timer.isActive(): return True # The pending repaint picks up this frame
+        wait = self._min_interval - (time.monotonic() - self._last_repaint)
+        if wait > 0: self._repaint_timer.start(int(wait * 1000) + 1)
+        else: self._request_repaint()
+        return True
+
+    def _request_repaint(self):
+        self._last_repaint = time.monotonic()
+        self.update()
+
+    def frame_rect(self, frame_width, frame_height):
+        """Returns the cached rectangle the frame is painted into."""
+        key = (frame_width, frame_height, self.width(), self.height())
+        if key != self._target_key:
+            scale = min(self.width() / frame_width, self.height() / frame_height)
+            width, height = max(1, round(frame_width * scale)), max(1, round(frame_height * scale))
+            self._target_rect = QRect((self.width() - width) // 2, (self.height() - height) // 2, width, height)
+            self._target_key = key
+        return self._target_rect
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.display_size_changed.emit(self.width(), self.height())
+
+    def paintEvent(self, event):
+        profiler = self.profiler if self.profiler is not None and self.profiler.enabled else None
+        started = time.perf_counter_ns() if profiler is not None else 0
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND_COLOR)
+        frame = self._frame
+        if frame is None:
+            painter.setPen(TEXT_COLOR)
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._text)
+        else:
+            height, width = frame.shape[:2]
+            if not frame.flags.c_contiguous: frame = frame.copy()
+            image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888)
+            target = self.frame_rect(width, height)
+            if target.size() != image.size(): painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawImage(target, image)
+            self.painted_frames += 1
+        painter.setPen(BORDER_COLOR)
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()
+        if profiler is not None: profiler.record("paint", time.perf_counter_ns() - started)
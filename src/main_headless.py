@@ -0,0 +1,209 @@
+"""
+Runs capture, detection, analysis and triggers without the GUI.
+
+Nothing here imports Qt, so the runner works without a display, e.g. as a
+service on a kiosk. Settings come from the same config.json as the GUI.
+SIGINT and SIGTERM stop the runner cleanly; throughput is printed every
+--stats-interval seconds.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+import time
+
+from core.action_dispatcher import ActionDispatcher
+from core.calibrator import Calibrator
+from core.config_manager import ConfigManager
+from core.detection_process import DetectionProcess
+from core.frame_pipeline import FramePipeline
+from core.frame_sources import open_frame_source
+from core.output_backends import create_output_backend
+
+FRAME_INTERVAL_MS = 30
+
+
+class HeadlessRunner:
+    """Drives the FramePipeline in a plain loop, like the GUI's pipeline worker without the view."""
+    def __init__(self, config_manager, source=None, stats_interval_s=10.0, clock=None):
+        """
+        :param config_manager: The ConfigManager providing thresholds, actions and settings.
+        :param source: Capture source overriding the capture_source setting.
+        :param stats_interval_s: Time between two printed statistics lines, 0 disables them.
+        :param clock: Callable returning monotonic seconds. Defaults to time.monotonic.
+        """
+        self.config_manager = config_manager
+        self.source = config_manager.get_setting("capture_source", 0) if source is None else source
+        self.stats_interval_s = stats_interval_s
+        self.clock = clock or time.monotonic
+        self.calibrator = Calibrator(phase_ms=config_manager.get_setting("calibration_phase_ms", 2000),
+                                     statistic=config_manager.get_setting("calibration_statistic", "mean"))
+        self.monitored_expressions = list(config_manager.get_thresholds().keys()) or list(config_manager.DEFAULT_CONFIG.get("thresholds", {}).keys())
+        self.action_dispatcher = ActionDispatcher(rate_limit_ms=config_manager.get_setting("action_rate_limit_ms", 0),
+                                                  max_pending=config_manager.get_setting("action_queue_size", 8),
+                                                  backend=create_output_backend(config_manager.get_setting("output_backend", "pyautogui")))
+        self.pipeline = FramePipeline(config_manager, self.calibrator, self.monitored_expressions, action_executor=self.action_dispatcher)
+        self.webcam = None
+        self.detector = None
+        self.interval_s = FRAME_INTERVAL_MS / 1000.0
+        self._stop_event = threading.Event()
+        self._last_instruction = None
+        self._reset_stats(self.clock())
+
+    def open(self):
+        """Opens the capture source and the detector, as AppController.start_capture does."""
+        settings = self.config_manager.get_setting
+        if settings("pipeline_mode", "worker_thread") == "process":
+            print("Headless: Starting DetectionProcess...")
+            self.webcam = DetectionProcess(source=self.source, frame_size=(settings("capture_width", 640), settings("capture_height", 480)), max_faces=1,
+                                           pacing=settings("source_pacing", "realtime"), loop=bool(settings("source_loop", False)))
+        else:
+            self.webcam = open_frame_source(self.source, threaded=bool(settings("threaded_capture", True)), pacing=settings("source_pacing", "realtime"),
+                                            loop=bool(settings("source_loop", False)))
+        if hasattr(self.webcam, "read_detection"): self.detector = self.webcam # The source delivers landmarks (detection process or replay)
+        else:
+            from core.landmark_detector import LandmarkDetector
+            self.detector = LandmarkDetector(max_faces=1)
+        # Fast-paced file sources are processed back to back
+        if getattr(self.webcam, "pacing", None) == "fast": self.interval_s = 0.0
+        self.pipeline.webcam = self.webcam
+        self.pipeline.detector = self.detector
+        self.pipeline.reset_trigger_state()
+        self.action_dispatcher.start()
+
+    def start_calibration(self):
+        enabled = [key for key, value in self.config_manager.get_enabled_gestures().items() if value and key in self.monitored_expressions]
+        if not enabled: print("Headless: No gestures enabled for calibration."); return False
+        with self.pipeline.lock: started = self.calibrator.start(enabled)
+        if started: print("Headless: Calibration started, follow the instructions below.")
+        return started
+
+    def request_stop(self, signum=None, frame=None):
+        """Stops the loop after the current frame. Usable as a signal handler."""
+        if signum is not None: print(f"Headless: Received signal {signum}, stopping...")
+        self._stop_event.set()
+
+    def run(self, max_frames=None, duration_s=None):
+        """
+        Processes frames until stopped, the source ends, `max_frames` frames were
+        processed or `duration_s` seconds passed.
+
+        :return: The number of processed frames.
+        """
+        processed = 0
+        started_at = self.clock()
+        while not self._stop_event.is_set():
+            if duration_s and self.clock() - started_at >= duration_s: break
+            frame_started = time.monotonic()
+            try:
+                result = self.pipeline.step()
+            except Exception as e:
+                print(f"Headless: Error processing frame: {e}")
+                result = None
+            if result is None:
+                self._stop_event.wait(0.002); continue
+            if result.frame is None and not result.idle:
+                if not self.webcam.is_opened(): print("Headless: Capture source ended."); break
+                self._stop_event.wait(0.01); continue
+            self._handle_result(result)
+            processed += 1
+            if max_frames is not None and processed >= max_frames: break
+            remaining = self.pipeline.frame_interval(self.interval_s) - (time.monotonic() - frame_started)
+            if remaining > 0: self._stop_event.wait(remaining)
+        return processed
+
+    def _handle_result(self, result):
+        self._frames += 1
+        self._faces += result.landmark_frame is not None
+        self._processing_ms += result.processing_ms
+        if result.calibration_state in ("done", "error"): self._finish_calibration()
+        elif result.calibration_state != "idle" and result.calibration_instruction != self._last_instruction:
+            self._last_instruction = result.calibration_instruction
+            print(f"Headless: Calibration: {result.calibration_instruction}")
+        now = self.clock()
+        if self.stats_interval_s and now - self._stats_started >= self.stats_interval_s:
+            print(self.format_stats(now))
+            self._reset_stats(now)
+
+    def _finish_calibration(self):
+        with self.pipeline.lock:
+            calibration_state = self.calibrator.state
+            new_thresholds = self.calibrator.get_calculated_thresholds()
+            neutral_ratios = self.calibrator.get_neutral_ratios()
+            error_msg = self.calibrator.get_error_message()
+            self.calibrator.state = "idle"
+        self._last_instruction = None
+        if calibration_state == "error" or not new_thresholds: print(f"Headless: Calibration failed: {error_msg}"); return
+        if self.config_manager.update_neutral_ratios(neutral_ratios or {}) and self.config_manager.update_thresholds(new_thresholds):
+            self.pipeline.load_settings()
+            print(f"Headless: Calibration complete, new thresholds saved: {new_thresholds}")
+        else: print("Headless: Failed to save calibrated thresholds.")
+
+    def _reset_stats(self, now):
+        self._stats_started = now
+        self._frames = 0
+        self._faces = 0
+        self._processing_ms = 0.0
+
+    def format_stats(self, now=None):
+        """:return: One line with the throughput since the last statistics line."""
+        elapsed = max((self.clock() if now is None else now) - self._stats_started, 1e-9)
+        frames = self._frames
+        actions = self.action_dispatcher.get_stats()
+        capture_stats = self.webcam.get_capture_stats() if hasattr(self.webcam, "get_capture_stats") else {}
+        line = (f"Headless: {frames} frames in {elapsed:.1f} s ({frames / elapsed:.1f} fps), "
+                f"face in {100.0 * self._faces / frames if frames else 0.0:.0f}%, "
+                f"processing {self._processing_ms / frames if frames else 0.0:.2f} ms/frame, "
+                f"capture dropped {capture_stats.get('dropped_frames', 0)}, actions executed {actions['executed']}")
+        idle_monitor = self.pipeline.idle_monitor
+        if idle_monitor is not None: line += f", {idle_monitor.state}"
+        return line
+
+    def close(self):
+        print("Headless: Cleaning up resources...")
+        self.action_dispatcher.shutdown()
+        self.config_manager.close()
+        if self.webcam is not None: self.webcam.release()
+        if self.detector is not None and self.detector is not self.webcam: self.detector.close()
+        print("Headless: Resources released.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the facial expression triggers without the GUI.")
+    parser.add_argument("--config", default=os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "config.json")),
+                        help="Path of config.json (default: the one the GUI uses)")
+    parser.add_argument("--source", help="Camera index, video file, image directory or landmark archive, overrides capture_source")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between throughput lines, 0 disables them")
+    parser.add_argument("--duration", type=float, default=0.0, help="Stop after this many seconds, 0 runs until stopped")
+    parser.add_argument("--calibrate", action="store_true", help="Run the calibration first and save the thresholds")
+    args = parser.parse_args(argv)
+
+    try:
+        mp.set_start_method('spawn', force=True)
+    except RuntimeError:
+        pass
+    config_manager = ConfigManager(config_file_path=args.config)
+    runner = HeadlessRunner(config_manager, source=args.source, stats_interval_s=args.stats_interval)
+    for signal_name in ("SIGINT", "SIGTERM"):
+        if hasattr(signal, signal_name): signal.signal(getattr(signal, signal_name), runner.request_stop)
+    try:
+        runner.open()
+    except (SystemExit, Exception) as e:
+        print(f"Headless: Could not open capture source {runner.source}: {e}")
+        runner.close()
+        return 1
+    try:
+        if args.calibrate: runner.start_calibration()
+        print("Headless: Running, press Ctrl+C to stop.")
+        processed = runner.run(duration_s=args.duration or None)
+        print(runner.format_stats())
+        print(f"Headless: Processed {processed} frames.")
+    finally:
+        runner.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from src.core.action_dispatcher import ActionDispatcher
+from src.core.output_backends import RecordingBackend, compile_action
+
+PRESS_A = compile_action({"type": "press", "value": "a"})
+
+
+class BlockingExecutor:
+    """Records calls and blocks every call until released."""
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.done = threading.Semaphore(0)
+    def __call__(self, expr_key, action_config):
+        self.calls.append(expr_key)
+        self.started.set()
+        self.release.wait(2.0)
+        self.done.release()
+
+
+@pytest.fixture
+def executor():
+    executor = BlockingExecutor()
+    yield executor
+    executor.release.set()
+
+@pytest.fixture
+def dispatcher(executor):
+    dispatcher = ActionDispatcher(executor)
+    dispatcher.start()
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def test_submit_returns_while_action_executes(dispatcher, executor):
+    assert dispatcher.submit("mouth_open", PRESS_A)
+    assert executor.started.wait(1.0)
+
+    executor.release.set()
+    assert executor.done.acquire(timeout=1.0)
+    assert executor.calls == ["mouth_open"]
+
+def test_pending_actions_are_coalesced_per_gesture(dispatcher, executor):
+    dispatcher.submit("mouth_open", PRESS_A)
+    assert executor.started.wait(1.0) # mouth_open is executing, the queue is empty
+
+    assert dispatcher.submit("smile", PRESS_A)
+    assert not dispatcher.submit("smile", PRESS_A)
+    assert dispatcher.submit("mouth_open", PRESS_A)
+    executor.release.set()
+    for _ in range(3): assert executor.done.acquire(timeout=1.0)
+
+    stats = dispatcher.get_stats()
+    assert executor.calls == ["mouth_open", "smile", "mouth_open"]
+    assert stats["coalesced"] == 1 and stats["executed"] == 3
+    assert stats["latencies"]["execute"]["count"] == 3
+    assert stats["latencies"]["enqueue"]["count"] == 4
+
+def test_rate_limit_drops_repeated_gesture(executor):
+    executor.release.set()
+    dispatcher = ActionDispatcher(executor, rate_limit_ms=10_000)
+
+    assert dispatcher.submit("mouth_open", PRESS_A)
+    dispatcher.cancel_pending()
+    assert not dispatcher.submit("mouth_open", PRESS_A)
+    assert dispatcher.submit("smile", PRESS_A)
+    assert dispatcher.get_stats()["rate_limited"] == 1
+
+def test_shutdown_cancels_pending_actions(dispatcher, executor):
+    dispatcher.submit("mouth_open", PRESS_A)
+    assert executor.started.wait(1.0)
+    dispatcher.submit("smile", PRESS_A)
+
+    executor.release.set()
+    dispatcher.shutdown()
+
+    assert executor.calls == ["mouth_open"]
+    assert dispatcher.get_stats()["cancelled"] == 1
+
+def test_default_executor_injects_through_backend():
+    backend = RecordingBackend()
+    dispatcher = ActionDispatcher(backend=backend)
+    dispatcher.start()
+
+    dispatcher.submit("smile", compile_action({"type": "hotkey", "value": "ctrl, c"}))
+
+    assert backend.wait_for_events(4)
+    dispatcher.shutdown()
+    assert [event[1:] for event in backend.events] == [("down", "ctrl"), ("down", "c"), ("up", "c"), ("up", "ctrl")]
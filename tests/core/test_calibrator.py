@@ -1,290 +1,213 @@
 import pytest
 import numpy as np
-from src.core.calibrator import Calibrator
-from src.core import calibrator as calibrator_module
+from src.core.calibrator import Calibrator, build_phase_table
+from src.core.gesture_registry import GestureDefinition
 
-import src.core.expression_analyzer as expression_analyzer
 
+DEFAULT_ENABLED_KEYS = ["mouth_open", "eyebrows_raised", "smile"]
+NEUTRAL_RATIOS = {"mouth_open": 0.1, "eyebrows_raised": 0.2, "smile": 0.5}
+ACTIVE_RATIOS = {"mouth_open": 0.7, "eyebrows_raised": 0.4, "smile": 0.8}
 
-class MockLandmark:
-    def __init__(self, x=0.0, y=0.0, z=0.0): self.x = x; self.y = y; self.z = z
 
-class MockFaceLandmarks:
-    def __init__(self, num_landmarks=478): self.landmark = {i: MockLandmark() for i in range(num_landmarks)}
-    def set_landmark(self, index, x, y, z=0.0):
-        if index in self.landmark: self.landmark[index].x = x; self.landmark[index].y = y; self.landmark[index].z = z
+def face_points(mouth_gap):
+    """Landmark array with the eye corners 0.6 apart and the lips `mouth_gap` apart."""
+    points = np.zeros((478, 3), dtype=np.float32)
+    points[33] = (0.8, 0.4, 0.0); points[263] = (0.2, 0.4, 0.0)
+    points[13] = (0.5, 0.6, 0.0); points[14] = (0.5, 0.6 + mouth_gap, 0.0)
+    return points
 
+def run_phase(calibrator, ratios, frames):
+    for _ in range(frames): calibrator.process_ratios(ratios)
 
-DEFAULT_ENABLED_KEYS = ["mouth_open", "eyebrows_raised", "smile", "left_wink", "right_wink"]
+class FakeClock:
+    """Advances by `step` seconds on every call."""
+    def __init__(self, step=0.25): self.step = step; self.now = -step
+    def __call__(self): self.now += self.step; return self.now
+
+def make_calibrator(frames, **kwargs):
+    """Calibrator whose phases end after `frames` frames of its fake clock."""
+    return Calibrator(phase_ms=(frames - 1) * 250, min_samples=1, clock=FakeClock(), **kwargs)
 
 
 
 def test_calibrator_initialization():
-    calibrator = Calibrator(frames_to_collect=50, threshold_factor=0.7)
+    calibrator = Calibrator(phase_ms=1500, threshold_factor=0.7)
     assert calibrator.state == "idle"
-    assert calibrator.frames_to_collect == 50
+    assert calibrator.phase_seconds == 1.5
     assert calibrator.threshold_factor == 0.7
     assert not calibrator.is_calibrating()
     assert calibrator.get_calculated_thresholds() is None
-    assert "neutral" in calibrator.data and "mouth_ratios" in calibrator.data["neutral"]
     assert calibrator.frame_count == 0
     assert calibrator.enabled_keys_in_run == set()
     assert calibrator.active_phases_in_run == []
 
-def test_calibrator_start():
-    calibrator = Calibrator(frames_to_collect=60)
+def test_phase_table_follows_registry():
+    registry = {
+        "mouth_open": GestureDefinition("mouth_open", ((13, 14),), "dy", "mouth", "Open Mouth Wide"),
+        "pucker": GestureDefinition("pucker", ((61, 291),), "dx", "lips", "Pucker Lips"),
+        "smile": GestureDefinition("smile", ((61, 291),), "distance", "lips", "Smile Naturally"),
+    }
 
-    calibrator.state = "done"; calibrator.frame_count = 10; calibrator.calculated_thresholds = {"test": 1}
-    calibrator.data["neutral"]["mouth_ratios"].append(0.1)
-    calibrator.enabled_keys_in_run = {"previous_run"}
-    calibrator.active_phases_in_run = ["mouth"]
+    phases = build_phase_table(registry)
 
+    assert [(p.name, p.gesture_keys, p.instruction) for p in phases] == [("mouth", ("mouth_open",), "Open Mouth Wide"), ("lips", ("pucker", "smile"), "Pucker Lips")]
+    assert [p.name for p in build_phase_table()] == ["mouth", "eyebrows", "smile"]
 
-    start_success = calibrator.start(DEFAULT_ENABLED_KEYS)
+def test_calibrator_start_resets_previous_run():
+    calibrator = make_calibrator(4)
+    calibrator.start(DEFAULT_ENABLED_KEYS)
+    run_phase(calibrator, NEUTRAL_RATIOS, 2)
 
+    start_success = calibrator.start(["mouth_open", "smile"])
 
     assert start_success == True
     assert calibrator.state == "neutral"
     assert calibrator.is_calibrating() == True
     assert calibrator.frame_count == 0
     assert calibrator.calculated_thresholds == {}
-    assert calibrator.data["neutral"]["mouth_ratios"] == []
-    assert calibrator.enabled_keys_in_run == set(DEFAULT_ENABLED_KEYS)
-    assert calibrator.active_phases_in_run == ["mouth", "eyebrows", "smile"]
+    assert calibrator.enabled_keys_in_run == {"mouth_open", "smile"}
+    assert calibrator.active_phases_in_run == ["mouth", "smile"]
+    assert set(calibrator.stats) == {"neutral", "mouth", "smile"}
+    assert calibrator.stats["neutral"]["mouth_open"].count == 0
     assert "Look Neutral" in calibrator.get_current_instruction()
 
-def test_calibration_neutral_phase_collects_data_and_transitions(mocker):
-    frames = 3
-    calibrator_instance = Calibrator(frames_to_collect=frames)
-    mock_landmarks = MockFaceLandmarks()
-    mock_landmarks.set_landmark(33, 0.8, 0.4); mock_landmarks.set_landmark(263, 0.2, 0.4)
-
-
-    mock_mouth = mocker.patch.object(calibrator_module, 'get_mouth_open_ratio', return_value=0.1)
-    mock_brows = mocker.patch.object(calibrator_module, 'get_eyebrows_raised_ratio', return_value=0.2)
-    mock_smile = mocker.patch.object(calibrator_module, 'get_smile_ratio', return_value=0.5)
-    mock_l_ear = mocker.patch.object(calibrator_module, 'get_left_ear', return_value=0.35)
-    mock_r_ear = mocker.patch.object(calibrator_module, 'get_right_ear', return_value=0.36)
-
-
-    calibrator_instance.start(DEFAULT_ENABLED_KEYS)
-    for _ in range(frames):
-        assert calibrator_instance.state == "neutral"
-        calibrator_instance.process_landmarks(mock_landmarks)
-
-
-    assert calibrator_instance.state == "mouth"
-    assert calibrator_instance.frame_count == 0
-    assert "Open Mouth Wide" in calibrator_instance.get_current_instruction()
-    assert len(calibrator_instance.data["neutral"]["mouth_ratios"]) == frames
-    assert calibrator_instance.data["neutral"]["mouth_ratios"] == [0.1] * frames
-    assert len(calibrator_instance.data["neutral"]["eyebrow_ratios"]) == frames
-    assert calibrator_instance.data["neutral"]["eyebrow_ratios"] == [0.2] * frames
-    assert len(calibrator_instance.data["neutral"]["smile_ratios"]) == frames
-    assert calibrator_instance.data["neutral"]["smile_ratios"] == [0.5] * frames
-    assert len(calibrator_instance.data["neutral"]["left_ears"]) == frames
-    assert calibrator_instance.data["neutral"]["left_ears"] == [0.35] * frames
-    assert len(calibrator_instance.data["neutral"]["right_ears"]) == frames
-    assert calibrator_instance.data["neutral"]["right_ears"] == [0.36] * frames
-    assert mock_mouth.call_count == frames
-    assert mock_brows.call_count == frames
-    assert mock_smile.call_count == frames
-    assert mock_l_ear.call_count == frames
-    assert mock_r_ear.call_count == frames
-
-def test_calculate_thresholds_success(mocker):
+def test_full_run_calculates_thresholds():
     frames = 10
-    calibrator = Calibrator(frames_to_collect=frames, threshold_factor=0.6)
-
-    calibrator.data["neutral"]["mouth_ratios"] = [0.1] * frames
-    calibrator.data["neutral"]["eyebrow_ratios"] = [0.2] * frames
-    calibrator.data["neutral"]["smile_ratios"] = [0.5] * frames
-    calibrator.data["neutral"]["left_ears"] = [0.35] * frames
-    calibrator.data["neutral"]["right_ears"] = [0.36] * frames
-    calibrator.data["mouth"]["mouth_ratios"] = [0.7] * frames
-    calibrator.data["eyebrows"]["eyebrow_ratios"] = [0.4] * frames
-    calibrator.data["smile"]["smile_ratios"] = [0.8] * frames
-
-    calibrator.enabled_keys_in_run = {"mouth_open", "eyebrows_raised", "smile", "left_wink", "right_wink"}
-
-
-    calibrator._calculate_thresholds()
-
+    calibrator = make_calibrator(frames, threshold_factor=0.6)
+    calibrator.start(DEFAULT_ENABLED_KEYS)
+
+    run_phase(calibrator, NEUTRAL_RATIOS, frames)
+    assert calibrator.state == "mouth"
+    assert "Open Mouth Wide" in calibrator.get_current_instruction()
+    run_phase(calibrator, {"mouth_open": 0.7}, frames)
+    assert calibrator.state == "eyebrows"
+    run_phase(calibrator, {"eyebrows_raised": 0.4}, frames)
+    assert calibrator.state == "smile"
+    run_phase(calibrator, {"smile": 0.8}, frames)
 
     assert calibrator.state == "done"
     assert calibrator.error_message == ""
+    expected = {key: round(NEUTRAL_RATIOS[key] + 0.6 * (ACTIVE_RATIOS[key] - NEUTRAL_RATIOS[key]), 4) for key in DEFAULT_ENABLED_KEYS}
+    assert calibrator.get_calculated_thresholds() == pytest.approx(expected)
+    assert calibrator.get_neutral_ratios() == pytest.approx(NEUTRAL_RATIOS)
+    assert "Complete" in calibrator.get_current_instruction()
+
+def test_statistics_use_constant_memory():
+    calibrator = make_calibrator(5000)
+    calibrator.start(["mouth_open"])
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0.1, 0.01, 3000)
+
+    for value in samples: calibrator.process_ratios({"mouth_open": float(value)})
+
+    stats = calibrator.stats["neutral"]["mouth_open"]
+    assert stats.count == len(samples)
+    assert stats.mean == pytest.approx(samples.mean())
+    assert stats.variance == pytest.approx(samples.var(ddof=1))
+    assert not any(isinstance(value, list) for value in vars(stats).values())
+
+def test_median_statistic_ignores_outliers():
+    frames = 20
+    neutral = [0.1] * (frames - 3) + [0.9] * 3 # A few frames with a lost or blinking face
+    results = {}
+    for statistic in ("mean", "median"):
+        calibrator = make_calibrator(frames, threshold_factor=0.5, statistic=statistic)
+        calibrator.start(["mouth_open"])
+        for value in neutral: calibrator.process_ratios({"mouth_open": value})
+        run_phase(calibrator, {"mouth_open": 0.7}, frames)
+        results[statistic] = calibrator.get_calculated_thresholds()
+
+    assert results["median"]["mouth_open"] == pytest.approx(0.4)
+    assert results["mean"]["mouth_open"] > results["median"]["mouth_open"]
+
+def test_unknown_statistic_falls_back_to_mean():
+    assert Calibrator(statistic="mode").statistic == "mean"
+
+def test_process_landmarks_only_computes_phase_gestures():
+    frames = 3
+    calibrator = make_calibrator(frames)
+    calibrator.start(DEFAULT_ENABLED_KEYS)
+    for _ in range(frames): calibrator.process_landmarks(face_points(0.06))
+
+    for _ in range(frames): calibrator.process_landmarks(face_points(0.3))
+
+    assert calibrator.stats["neutral"]["mouth_open"].mean == pytest.approx(0.1)
+    assert calibrator.stats["mouth"]["mouth_open"].mean == pytest.approx(0.5)
+    assert set(calibrator.stats["mouth"]) == {"mouth_open"}
+    assert calibrator.state == "eyebrows"
+
+@pytest.mark.parametrize("fps", [15, 30, 60])
+def test_phase_length_follows_timestamps(fps):
+    calibrator = Calibrator(phase_ms=1000, min_samples=5)
+    calibrator.start(["mouth_open"])
+    frames = 0
+
+    while calibrator.state == "neutral":
+        calibrator.process_ratios({"mouth_open": 0.1}, timestamp=50.0 + frames / fps)
+        frames += 1
+
+    assert frames == fps + 1
+    assert calibrator.state == "mouth"
+    assert "Open Mouth Wide for 1 sec" in calibrator.get_current_instruction()
+
+def test_phase_waits_for_min_samples():
+    calibrator = Calibrator(phase_ms=1000, min_samples=3)
+    calibrator.start(["mouth_open"])
+    for t in (0.0, 0.5, 1.0): calibrator.process_landmarks(None, timestamp=t)
+
+    calibrator.process_ratios({"mouth_open": 0.1}, timestamp=1.5)
+    calibrator.process_ratios({"mouth_open": 0.1}, timestamp=1.6)
+    assert calibrator.state == "neutral"
+    assert "(1.0/1.0 s)" in calibrator.get_current_instruction()
+    calibrator.process_ratios({"mouth_open": 0.1}, timestamp=1.7)
 
-    expected_thresholds = {
-        "mouth_open": round(0.1 + 0.6 * (0.7 - 0.1), 4),
-        "eyebrows_raised": round(0.2 + 0.6 * (0.4 - 0.2), 4),
-        "smile": round(0.5 + 0.6 * (0.8 - 0.5), 4),
-        "left_wink": round(0.35 * Calibrator.WINK_THRESHOLD_FACTOR, 4),
-        "right_wink": round(0.36 * Calibrator.WINK_THRESHOLD_FACTOR, 4)
-    }
+    assert calibrator.state == "mouth"
 
-    assert calibrator.calculated_thresholds == pytest.approx(expected_thresholds)
-    assert "Complete" in calibrator.current_instruction
+def test_calculate_thresholds_error_active_not_higher():
+    frames = 10
+    calibrator = make_calibrator(frames, threshold_factor=0.6)
+    calibrator.start(DEFAULT_ENABLED_KEYS)
+    run_phase(calibrator, NEUTRAL_RATIOS, frames)
+    run_phase(calibrator, {"mouth_open": 0.7}, frames)
+    run_phase(calibrator, {"eyebrows_raised": 0.4}, frames)
+    run_phase(calibrator, {"smile": 0.4}, frames)
 
-def test_calculate_thresholds_error_active_not_higher(mocker):
+    assert calibrator.state == "error"
+    assert calibrator.calculated_thresholds == {}
+    assert calibrator.get_calculated_thresholds() is None
+    assert "Active smile ratio not higher than neutral" in calibrator.error_message
+
+def test_calculate_thresholds_error_insufficient_data():
     frames = 10
-    min_samples = max(1, frames // 4)
-    calibrator = Calibrator(frames_to_collect=frames, threshold_factor=0.6)
-    calibrator.data["neutral"]["mouth_ratios"] = [0.1] * frames
-    calibrator.data["neutral"]["eyebrow_ratios"] = [0.2] * frames
-    calibrator.data["neutral"]["smile_ratios"] = [0.5] * frames
-    calibrator.data["neutral"]["left_ears"] = [0.35] * frames
-    calibrator.data["neutral"]["right_ears"] = [0.36] * frames
-    calibrator.data["mouth"]["mouth_ratios"] = [0.7] * frames
-    calibrator.data["eyebrows"]["eyebrow_ratios"] = [0.4] * frames
-    calibrator.data["smile"]["smile_ratios"] = [0.4] * frames
-    calibrator.enabled_keys_in_run = {"mouth_open", "eyebrows_raised", "smile"}
+    calibrator = make_calibrator(frames)
+    calibrator.start(["mouth_open"])
+    run_phase(calibrator, NEUTRAL_RATIOS, frames)
+    calibrator.state = "calculating"
 
     calibrator._calculate_thresholds()
 
     assert calibrator.state == "error"
     assert calibrator.calculated_thresholds == {}
-    assert "Active smile ratio not higher than neutral" in calibrator.error_message
-
-def test_calibration_mouth_phase(mocker):
-    frames = 3
-    calibrator_instance = Calibrator(frames_to_collect=frames)
-    mock_landmarks = MockFaceLandmarks()
-    mock_landmarks.set_landmark(33, 0.8, 0.4); mock_landmarks.set_landmark(263, 0.2, 0.4)
+    assert "Not enough data collected for mouth open" in calibrator.error_message
 
-    mocker.patch.object(calibrator_module, 'get_mouth_open_ratio', return_value=0.7)
-    mocker.patch.object(calibrator_module, 'get_eyebrows_raised_ratio', return_value=0.2)
-    mocker.patch.object(calibrator_module, 'get_smile_ratio', return_value=0.5)
-    mocker.patch.object(calibrator_module, 'get_left_ear', return_value=0.35)
-    mocker.patch.object(calibrator_module, 'get_right_ear', return_value=0.36)
+def test_process_landmarks_no_face():
+    calibrator = Calibrator()
+    calibrator.start(DEFAULT_ENABLED_KEYS)
 
+    calibrator.process_landmarks(None)
 
-    calibrator_instance.start(["mouth_open", "eyebrows_raised"])
-    for _ in range(frames): calibrator_instance.process_landmarks(mock_landmarks)
-    assert calibrator_instance.state == "mouth"
-    for _ in range(frames): calibrator_instance.process_landmarks(mock_landmarks)
+    assert calibrator.state == "neutral"
+    assert calibrator.frame_count == 0
+    assert calibrator.stats["neutral"]["mouth_open"].count == 0
+    assert "(No face detected!)" in calibrator.get_current_instruction()
 
+def test_process_landmarks_incomplete_landmarks():
+    calibrator = Calibrator()
+    calibrator.start(DEFAULT_ENABLED_KEYS)
 
-    assert calibrator_instance.state == "eyebrows"
-    assert calibrator_instance.frame_count == 0
-    assert "Raise Eyebrows High" in calibrator_instance.get_current_instruction()
-    assert len(calibrator_instance.data["mouth"]["mouth_ratios"]) == frames
+    calibrator.process_landmarks(np.zeros((10, 3), dtype=np.float32))
 
-def test_calibration_eyebrows_phase(mocker):
-    frames = 3
-    calibrator_instance = Calibrator(frames_to_collect=frames)
-    mock_landmarks = MockFaceLandmarks()
-    mock_landmarks.set_landmark(33, 0.8, 0.4); mock_landmarks.set_landmark(263, 0.2, 0.4)
-    mocker.patch.object(calibrator_module, 'get_mouth_open_ratio', return_value=0.7)
-    mocker.patch.object(calibrator_module, 'get_eyebrows_raised_ratio', return_value=0.4)
-    mocker.patch.object(calibrator_module, 'get_smile_ratio', return_value=0.5)
-    mocker.patch.object(calibrator_module, 'get_left_ear', return_value=0.35)
-    mocker.patch.object(calibrator_module, 'get_right_ear', return_value=0.36)
-
-    enabled_keys = ["mouth_open", "eyebrows_raised", "smile"]
-    calibrator_instance.start(enabled_keys)
-    for _ in range(frames): calibrator_instance.process_landmarks(mock_landmarks)
-    for _ in range(frames): calibrator_instance.process_landmarks(mock_landmarks)
-    assert calibrator_instance.state == "eyebrows"
-    for i in range(frames):
-         calibrator_instance.process_landmarks(mock_landmarks)
-         if i < frames - 1:
-              assert calibrator_instance.state == "eyebrows"
-
-    assert calibrator_instance.state == "smile"
-    assert calibrator_instance.frame_count == 0
-    assert "Smile Naturally" in calibrator_instance.get_current_instruction()
-    assert len(calibrator_instance.data["eyebrows"]["eyebrow_ratios"]) == frames
-
-def test_calibration_smile_phase_ends_in_calc(mocker):
-    """Test data collection in smile phase and transition to calculating/done."""
-    frames = 3
-    calibrator_instance = Calibrator(frames_to_collect=frames)
-    mock_landmarks = MockFaceLandmarks()
-    mock_landmarks.set_landmark(33, 0.8, 0.4); mock_landmarks.set_landmark(263, 0.2, 0.4)
-    calibrator_instance.data["neutral"]["mouth_ratios"] = [0.1] * frames
-    calibrator_instance.data["neutral"]["eyebrow_ratios"] = [0.2] * frames
-    calibrator_instance.data["neutral"]["smile_ratios"] = [0.5] * frames
-    calibrator_instance.data["neutral"]["left_ears"] = [0.35] * frames
-    calibrator_instance.data["neutral"]["right_ears"] = [0.36] * frames
-    calibrator_instance.data["mouth"]["mouth_ratios"] = [0.7] * frames
-    calibrator_instance.data["eyebrows"]["eyebrow_ratios"] = [0.4] * frames
-    calibrator_instance.state = "smile"
-    calibrator_instance.frame_count = 0
-    calibrator_instance.active_phases_in_run = ["mouth", "eyebrows", "smile"]
-    calibrator_instance.current_phase_index = 2
-    calibrator_instance.enabled_keys_in_run = {"mouth_open", "eyebrows_raised", "smile"}
-
-    mocker.patch.object(calibrator_module, 'get_mouth_open_ratio', return_value=0.1)
-    mocker.patch.object(calibrator_module, 'get_eyebrows_raised_ratio', return_value=0.2)
-    mock_smile = mocker.patch.object(calibrator_module, 'get_smile_ratio', return_value=0.8)
-    mocker.patch.object(calibrator_module, 'get_left_ear', return_value=0.35)
-    mocker.patch.object(calibrator_module, 'get_right_ear', return_value=0.36)
-    spy_calculate = mocker.spy(calibrator_instance, '_calculate_thresholds')
-
-    for i in range(frames):
-        assert calibrator_instance.state == "smile"
-        calibrator_instance.process_landmarks(mock_landmarks)
-
-    spy_calculate.assert_called_once()
-    assert calibrator_instance.state == "done"
-    assert "Complete" in calibrator_instance.get_current_instruction()
-    assert len(calibrator_instance.data["smile"]["smile_ratios"]) == frames
-    assert calibrator_instance.data["smile"]["smile_ratios"] == [0.8] * frames
-    assert mock_smile.call_count == frames
-    assert "smile" in calibrator_instance.calculated_thresholds
-    assert calibrator_instance.calculated_thresholds["smile"] == pytest.approx(0.5 + 0.6 * (0.8 - 0.5))
-
-def test_process_landmarks_no_face(mocker):
-    calibrator_instance = Calibrator()
-
-    calibrator_instance.start(DEFAULT_ENABLED_KEYS)
-    initial_instruction = calibrator_instance.get_current_instruction()
-    calibrator_instance.process_landmarks(None)
-
-
-    assert calibrator_instance.state == "neutral"
-    assert calibrator_instance.frame_count == 0
-    assert calibrator_instance.data["neutral"]["mouth_ratios"] == []
-    assert "(No face detected!)" in calibrator_instance.get_current_instruction()
-
-def test_process_landmarks_ratio_none(mocker):
-    calibrator_instance = Calibrator()
-    mock_landmarks = MockFaceLandmarks()
-    mock_landmarks.set_landmark(33, 0.8, 0.4); mock_landmarks.set_landmark(263, 0.2, 0.4)
-
-    mocker.patch.object(calibrator_module, 'get_mouth_open_ratio', return_value=None)
-    mocker.patch.object(calibrator_module, 'get_eyebrows_raised_ratio', return_value=0.2)
-    mocker.patch.object(calibrator_module, 'get_smile_ratio', return_value=0.5)
-    mocker.patch.object(calibrator_module, 'get_left_ear', return_value=0.35)
-    mocker.patch.object(calibrator_module, 'get_right_ear', return_value=0.36)
-
-
-    calibrator_instance.start(DEFAULT_ENABLED_KEYS)
-    initial_instruction = calibrator_instance.get_current_instruction()
-    calibrator_instance.process_landmarks(mock_landmarks)
-
-
-    assert calibrator_instance.state == "neutral"
-    assert calibrator_instance.frame_count == 0
-    assert calibrator_instance.data["neutral"]["mouth_ratios"] == []
-    assert "(Ratio Error!)" in calibrator_instance.get_current_instruction()
-
-def test_calculate_thresholds_error_insufficient_data(mocker):
-    frames_needed = 10
-    min_samples = max(1, frames_needed // 4)
-    calibrator_instance = Calibrator(frames_to_collect=frames_needed)
-    calibrator_instance.data["neutral"]["mouth_ratios"] = [0.1] * frames_needed
-    calibrator_instance.data["neutral"]["eyebrow_ratios"] = [0.2] * frames_needed
-    calibrator_instance.data["neutral"]["smile_ratios"] = [0.5] * frames_needed
-    calibrator_instance.data["neutral"]["left_ears"] = [0.35] * frames_needed
-    calibrator_instance.data["neutral"]["right_ears"] = [0.36] * frames_needed
-    calibrator_instance.data["mouth"]["mouth_ratios"] = [0.7] * (min_samples - 1)
-    calibrator_instance.data["eyebrows"]["eyebrow_ratios"] = [0.4] * frames_needed
-    calibrator_instance.data["smile"]["smile_ratios"] = [0.8] * frames_needed
-    calibrator_instance.enabled_keys_in_run = {"mouth_open", "eyebrows_raised", "smile"}
-
-    calibrator_instance._calculate_thresholds()
-
-    assert calibrator_instance.state == "error"
-    assert calibrator_instance.calculated_thresholds == {}
-    assert "Not enough data collected for mouth open" in calibrator_instance.error_message
\ No newline at end of file
+    assert calibrator.state == "neutral"
+    assert calibrator.frame_count == 0
+    assert calibrator.stats["neutral"]["mouth_open"].count == 0
+    assert "(Ratio Error!)" in calibrator.get_current_instruction()
@@ -1,6 +1,7 @@
 import pytest
 import json
 import os
+import time
 from src.core.config_manager import ConfigManager
 
 def test_init_no_config_file_creates_default(fs):
@@ -123,4 +124,71 @@ def test_getters_with_nonexistent_keys(fs):
     assert manager.get_action(non_existent_key) is None
     enabled_gestures = manager.get_enabled_gestures()
     assert non_existent_key not in enabled_gestures
-    assert enabled_gestures.get(non_existent_key, "fallback") == "fallback"
\ No newline at end of file
+    assert enabled_gestures.get(non_existent_key, "fallback") == "fallback"
+def test_save_replaces_file_atomically(tmp_path, mocker):
+    config_path = str(tmp_path / "config.json")
+    manager = ConfigManager(config_file_path=config_path, write_behind=False)
+    manager.update_gesture_enabled("smile", False)
+    mocker.patch("src.core.config_manager.os.replace", side_effect=OSError("disk full"))
+
+    assert manager.update_gesture_enabled("smile", True) == False
+
+    with open(config_path, 'r') as f:
+        assert json.load(f)["enabled_gestures"]["smile"] == False # The previous file is untouched
+    assert not os.path.exists(config_path + ".tmp")
+
+def test_write_behind_coalesces_changes_and_flushes_on_close(tmp_path, mocker):
+    config_path = str(tmp_path / "config.json")
+    manager = ConfigManager(config_file_path=config_path, write_behind=True)
+    manager.write_delay_s = 60.0
+    save_internal = mocker.spy(manager, "_save_internal")
+
+    assert manager.update_gesture_enabled("smile", False) == True
+    assert manager.update_action("smile", {"type": "press", "value": "b"}) == True
+
+    assert manager.get_enabled_gestures()["smile"] == False # In memory immediately
+    assert manager.is_dirty() and not os.path.exists(config_path)
+    assert manager.close() == True
+    assert save_internal.call_count == 1
+    with open(config_path, 'r') as f:
+        content_on_disk = json.load(f)
+    assert content_on_disk["enabled_gestures"]["smile"] == False
+    assert content_on_disk["actions"]["smile"] == {"type": "press", "value": "b"}
+
+def test_write_behind_writes_after_delay(tmp_path):
+    config_path = str(tmp_path / "config.json")
+    manager = ConfigManager(config_file_path=config_path, write_behind=True)
+    manager.write_delay_s = 0.01
+
+    manager.update_thresholds({"smile": 0.42})
+    for _ in range(200):
+        if not manager.is_dirty() and os.path.exists(config_path): break
+        time.sleep(0.01)
+
+    with open(config_path, 'r') as f:
+        assert json.load(f)["thresholds"]["smile"] == 0.42
+    manager.close()
+
+def test_settings_from_file_are_kept(tmp_path):
+    config_path = str(tmp_path / "config.json")
+    with open(config_path, "w") as f: json.dump({"settings": {"idle_mode": True, "hold_ms": 50, "pipeline_mode": "process"}}, f)
+
+    manager = ConfigManager(config_file_path=config_path)
+
+    assert manager.get_setting("idle_mode") is True
+    assert manager.get_setting("hold_ms") == 50
+    assert manager.get_setting("pipeline_mode") == "process"
+    assert manager.get_setting("overlay_level") == ConfigManager.DEFAULT_CONFIG["settings"]["overlay_level"]
+    assert manager.save()
+    with open(config_path) as f: assert json.load(f)["settings"]["hold_ms"] == 50
+
+def test_hold_frames_is_migrated_to_hold_ms(tmp_path):
+    config_path = str(tmp_path / "config.json")
+    with open(config_path, "w") as f: json.dump({"settings": {"hold_frames": 6}}, f)
+
+    manager = ConfigManager(config_file_path=config_path)
+
+    assert manager.get_setting("hold_ms") == 167
+    assert manager.save()
+    with open(config_path) as f: settings = json.load(f)["settings"]
+    assert settings["hold_ms"] == 167 and "hold_frames" not in settings
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from src.core.detection_scheduler import DetectionScheduler
+from src.core.landmark_frame import LandmarkFrame
+from src.core.ratio_filter import Hysteresis
+
+
+def face_at(x, timestamp):
+    return LandmarkFrame(np.full((468, 3), x, dtype=np.float32), timestamp, 0, (640, 480))
+
+def run(scheduler, hysteresis, ratios, timestamps):
+    """Returns the timestamps of the frames that had to be inferred."""
+    inferred = []
+    for ratio, timestamp in zip(ratios, timestamps):
+        if scheduler.check(timestamp) is None: scheduler.update(face_at(0.5, timestamp), timestamp); inferred.append(timestamp)
+        ratio = np.array([ratio])
+        hysteresis(ratio)
+        scheduler.plan(ratio, hysteresis, timestamp)
+    return inferred
+
+
+def test_infers_every_frame_until_planned():
+    scheduler = DetectionScheduler()
+    assert scheduler.check(0.0) is None
+    scheduler.update(face_at(0.5, 0.0), 0.0)
+
+    assert scheduler.check(1 / 30) is None
+
+def test_stable_ratios_far_from_threshold_back_off_within_budget():
+    scheduler = DetectionScheduler(budget_ms=90, margin=0.25)
+    timestamps = [i / 30 for i in range(12)]
+
+    inferred = run(scheduler, Hysteresis([0.4]), [0.1] * 12, timestamps)
+
+    assert inferred == pytest.approx([0.0, 3 / 30, 6 / 30, 9 / 30]) # Every third frame at 30 fps
+    assert scheduler.get_stats() == {"checked": 12, "predicted": 8, "predict_rate": 0.6667}
+
+def test_ratios_near_threshold_are_inferred_every_frame():
+    scheduler = DetectionScheduler(budget_ms=100, margin=0.25)
+    timestamps = [i / 30 for i in range(6)]
+
+    assert run(scheduler, Hysteresis([0.4]), [0.35] * 6, timestamps) == timestamps
+
+def test_active_gesture_is_compared_with_off_threshold():
+    scheduler = DetectionScheduler(budget_ms=90, margin=0.25)
+    timestamps = [i / 30 for i in range(6)]
+
+    assert run(scheduler, Hysteresis([0.4], [0.2]), [0.45] * 6, timestamps) == pytest.approx([0.0, 3 / 30])
+    assert run(DetectionScheduler(), Hysteresis([0.4], [0.4]), [0.45] * 6, timestamps) == timestamps
+
+def test_ratio_moving_towards_threshold_shortens_interval():
+    scheduler = DetectionScheduler(budget_ms=200, margin=0.25)
+    timestamps = [i / 30 for i in range(8)]
+
+    inferred = run(scheduler, Hysteresis([0.4]), [0.0, 0.07, 0.14, 0.14, 0.14, 0.14, 0.14, 0.14], timestamps)
+
+    assert inferred[:2] == pytest.approx([0.0, 5 / 30]) # Was expected to reach the margin (0.3) after 143 ms
+
+def test_landmarks_are_extrapolated_between_inferences():
+    scheduler = DetectionScheduler(budget_ms=100)
+    scheduler.update(face_at(0.50, 0.0), 0.0)
+    scheduler.update(face_at(0.52, 0.04), 0.04)
+    scheduler.plan(np.array([0.1]), Hysteresis([0.4]), 0.04)
+
+    predicted = scheduler.check(0.06)
+
+    assert predicted.points[0, 0] == pytest.approx(0.53)
+    assert predicted.timestamp == 0.06 and predicted.image_size == (640, 480)
+
+def test_lost_face_resets_scheduler():
+    scheduler = DetectionScheduler()
+    scheduler.update(face_at(0.5, 0.0), 0.0)
+    scheduler.plan(np.array([0.1]), Hysteresis([0.4]), 0.0)
+    scheduler.update(None, 0.03)
+
+    assert scheduler.check(0.06) is None
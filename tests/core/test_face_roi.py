@@ -0,0 +1,56 @@
+import numpy as np
+from src.core.face_roi import FaceRoi
+from src.core.landmark_frame import LandmarkFrame
+
+
+def face_at(x_min, y_min, x_max, y_max):
+    points = np.zeros((468, 3), dtype=np.float32)
+    points[:, 0] = np.linspace(x_min, x_max, 468); points[:, 1] = np.linspace(y_min, y_max, 468)[::-1]
+    return LandmarkFrame(points)
+
+
+def test_no_region_without_previous_face():
+    assert FaceRoi().region(1280, 720) is None
+
+def test_region_is_square_with_margin_and_stays_inside_frame():
+    face_roi = FaceRoi(margin=0.25)
+    face_roi.update(face_at(0.4375, 0.375, 0.5625, 0.625), cropped=False) # 160 x 180 pixels
+
+    assert face_roi.region(1280, 720) == (505, 225, 270)
+    face_roi.update(face_at(0.0, 0.0, 0.125, 0.25), cropped=False)
+    assert face_roi.region(1280, 720) == (0, 0, 270)
+
+def test_face_filling_the_frame_uses_full_frame():
+    face_roi = FaceRoi(margin=0.3)
+    face_roi.update(face_at(0.2, 0.1, 0.8, 0.9), cropped=False)
+
+    assert face_roi.region(1280, 720) is None
+
+def test_crop_is_resized_rgb():
+    face_roi = FaceRoi(input_size=64)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8); frame[..., 0] = 255 # Blue in BGR
+
+    crop = face_roi.crop_rgb(frame, (100, 50, 200))
+
+    assert crop.shape == (64, 64, 3)
+    assert crop[..., 2].min() == 255 and crop[..., :2].max() == 0
+    assert not crop.flags.writeable
+
+def test_landmarks_are_mapped_to_full_frame_coordinates():
+    crop_face = LandmarkFrame(np.array([[0.0, 0.0, 0.1], [0.5, 0.5, 0.0], [1.0, 1.0, -0.2]], dtype=np.float32), 2.0)
+
+    mapped = FaceRoi.to_frame_coordinates(crop_face, (100, 50, 200), 1280, 720)
+
+    np.testing.assert_allclose(mapped.points[:, 0], [100 / 1280, 200 / 1280, 300 / 1280])
+    np.testing.assert_allclose(mapped.points[:, 1], [50 / 720, 150 / 720, 250 / 720])
+    np.testing.assert_allclose(mapped.points[:, 2], [0.1 * 200 / 1280, 0.0, -0.2 * 200 / 1280], rtol=1e-6)
+    assert mapped.timestamp == 2.0 and mapped.image_size == (1280, 720)
+
+def test_stats_count_lost_faces():
+    face_roi = FaceRoi()
+    face_roi.update(face_at(0.4, 0.4, 0.5, 0.5), cropped=False)
+    face_roi.update(None, cropped=True)
+    face_roi.update(None, cropped=False)
+
+    assert face_roi.get_stats() == {"cropped": 1, "full_frame": 2, "lost": 1}
+    assert face_roi.region(1280, 720) is None
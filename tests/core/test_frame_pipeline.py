@@ -0,0 +1,298 @@
+import pytest
+import numpy as np
+
+from src.core.frame_pipeline import FramePipeline, FrameResult
+from src.core.calibrator import Calibrator
+from src.core.landmark_frame import LandmarkFrame
+
+
+class MockLandmark:
+    def __init__(self, x=0.0, y=0.0, z=0.0): self.x = x; self.y = y; self.z = z
+
+class MockFaceLandmarks:
+    def __init__(self, num_landmarks=478): self.landmark = {i: MockLandmark() for i in range(num_landmarks)}
+    def set_landmark(self, index, x, y, z=0.0):
+        if index in self.landmark: self.landmark[index].x = x; self.landmark[index].y = y; self.landmark[index].z = z
+
+
+@pytest.fixture
+def open_mouth_face():
+    face = MockFaceLandmarks()
+    face.set_landmark(33, 0.2, 0.4); face.set_landmark(263, 0.8, 0.4)
+    face.set_landmark(13, 0.5, 0.60); face.set_landmark(14, 0.5, 0.90)
+    return face
+
+@pytest.fixture
+def config_manager(mocker):
+    manager = mocker.Mock()
+    manager.DEFAULT_CONFIG = {"thresholds": {"mouth_open": 0.35}}
+    manager.get_thresholds.return_value = {"mouth_open": 0.35, "eyebrows_raised": 0.28, "smile": 0.35}
+    manager.get_neutral_ratios.return_value = {}
+    manager.get_enabled_gestures.return_value = {"mouth_open": True, "eyebrows_raised": False, "smile": False}
+    manager.get_actions.return_value = {"mouth_open": {"type": "press", "value": "a"}}
+    manager.get_setting.side_effect = lambda key, default=None: {"hold_ms": 60}.get(key, default)
+    return manager
+
+@pytest.fixture
+def pipeline(mocker, config_manager, open_mouth_face):
+    executor = mocker.Mock()
+    pipeline = FramePipeline(config_manager, Calibrator(), ["mouth_open", "eyebrows_raised", "smile"], action_executor=executor)
+    pipeline.detector = mocker.Mock()
+    pipeline.detector.detect_landmarks.return_value = mocker.Mock(multi_face_landmarks=[open_mouth_face])
+    return pipeline
+
+
+def test_process_frame_returns_immutable_result(pipeline):
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    result = pipeline.process_frame(frame, timestamp=1.5)
+
+    assert isinstance(result, FrameResult)
+    assert result.timestamp == 1.5
+    assert result.sequence == 1
+    assert result.expression_states == {"mouth_open": True, "eyebrows_raised": False, "smile": False}
+    assert result.ratios["mouth_open"] == pytest.approx(0.5)
+    assert "smile" not in result.ratios
+    assert result.calibration_state == "idle"
+    assert result.frame is not frame
+    assert not result.frame.flags.writeable
+
+def test_process_frame_triggers_action_once_after_hold_time(pipeline):
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    for i in range(5): pipeline.process_frame(frame, timestamp=i / 30)
+
+    pipeline.action_executor.assert_called_once()
+    expression_key, action = pipeline.action_executor.call_args[0]
+    assert expression_key == "mouth_open"
+    assert (action.kind, action.keys, dict(action.config)) == ("press", ("a",), {"type": "press", "value": "a"})
+
+@pytest.mark.parametrize("fps, trigger_frame", [(30, 2), (15, 1), (60, 4)])
+def test_hold_time_does_not_depend_on_frame_rate(pipeline, fps, trigger_frame):
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    calls = []
+
+    for i in range(trigger_frame + 2):
+        pipeline.process_frame(frame, timestamp=100.0 + i / fps)
+        calls.append(pipeline.action_executor.call_count)
+
+    assert calls.index(1) == trigger_frame
+    assert calls[-1] == 1
+
+def test_hold_restarts_after_expression_ends(pipeline, open_mouth_face):
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    for t in (0.0, 0.1): pipeline.process_frame(frame, timestamp=t)
+    open_mouth_face.set_landmark(14, 0.5, 0.61)
+    pipeline.process_frame(frame, timestamp=0.2)
+    open_mouth_face.set_landmark(14, 0.5, 0.90)
+
+    pipeline.process_frame(frame, timestamp=0.3)
+    assert pipeline.action_executor.call_count == 1
+    pipeline.process_frame(frame, timestamp=0.37)
+    assert pipeline.action_executor.call_count == 2
+
+def test_injected_clock_timestamps_frames(mocker, config_manager, open_mouth_face):
+    clock = iter([5.0, 5.02, 5.07])
+    pipeline = FramePipeline(config_manager, Calibrator(), ["mouth_open"], action_executor=mocker.Mock(), clock=lambda: next(clock))
+    pipeline.detector = mocker.Mock()
+    pipeline.detector.detect_landmarks.return_value = mocker.Mock(multi_face_landmarks=[open_mouth_face])
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    results = [pipeline.process_frame(frame) for _ in range(3)]
+
+    assert [r.timestamp for r in results] == [5.0, 5.02, 5.07]
+    pipeline.action_executor.assert_called_once()
+
+def set_mouth_ratio(face, ratio):
+    face.set_landmark(14, 0.5, 0.60 + 0.6 * ratio) # The eye corners are 0.6 apart
+
+@pytest.mark.parametrize("hysteresis, expected", [(0.0, [True, False, False, True]), (0.5, [True, True, False, True])])
+def test_hysteresis_releases_below_lower_threshold(pipeline, config_manager, open_mouth_face, hysteresis, expected):
+    config_manager.get_setting.side_effect = lambda key, default=None: {"ratio_hysteresis": hysteresis}.get(key, default)
+    config_manager.get_neutral_ratios.return_value = {"mouth_open": 0.15}
+    pipeline.load_settings()
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    states = []
+
+    for t, ratio in enumerate([0.4, 0.3, 0.2, 0.4]): # Release threshold with 0.5: 0.35 - 0.5 * (0.35 - 0.15) = 0.25
+        set_mouth_ratio(open_mouth_face, ratio)
+        states.append(pipeline.process_frame(frame, timestamp=float(t)).expression_states["mouth_open"])
+
+    assert states == expected
+
+def test_ratio_filter_suppresses_single_frame_spike(pipeline, config_manager, open_mouth_face):
+    config_manager.get_setting.side_effect = lambda key, default=None: {"ratio_filter": "one_euro", "hold_ms": 0}.get(key, default)
+    pipeline.load_settings()
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    states = []
+
+    for i, ratio in enumerate([0.1] * 5 + [0.5] + [0.1] * 5 + [0.5] * 5):
+        set_mouth_ratio(open_mouth_face, ratio)
+        result = pipeline.process_frame(frame, timestamp=i / 30)
+        states.append(result.expression_states["mouth_open"])
+
+    assert not any(states[:11])
+    assert states[-1]
+    assert result.ratios["mouth_open"] < 0.5 # Ratios are reported filtered
+    pipeline.action_executor.assert_called_once()
+
+def test_motion_gate_skips_detection_on_static_frames(pipeline, config_manager):
+    config_manager.get_setting.side_effect = lambda key, default=None: {"motion_gate": True, "motion_gate_max_stale_ms": 100, "hold_ms": 60}.get(key, default)
+    pipeline.load_settings()
+    frame = np.random.default_rng(5).integers(0, 255, (40, 40, 3), dtype=np.uint8)
+
+    results = [pipeline.process_frame(frame, timestamp=i / 30) for i in range(8)]
+
+    assert pipeline.detector.detect_landmarks.call_count == 2 # Inferred at 0 and 133 ms
+    assert all(r.expression_states["mouth_open"] for r in results)
+    assert results[1].landmark_frame.timestamp == pytest.approx(1 / 30)
+    assert pipeline.motion_gate.get_stats()["skipped"] == 6
+    pipeline.action_executor.assert_called_once()
+
+def test_adaptive_detection_predicts_frames_between_inferences(pipeline, config_manager):
+    config_manager.get_setting.side_effect = lambda key, default=None: {"adaptive_detection": True, "adaptive_detection_budget_ms": 90, "hold_ms": 60}.get(key, default)
+    pipeline.load_settings()
+    frame = np.zeros((40, 40, 3), dtype=np.uint8)
+
+    results = [pipeline.process_frame(frame, timestamp=i / 30) for i in range(8)]
+
+    assert pipeline.detector.detect_landmarks.call_count == 3 # Inferred at 0, 100 and 200 ms
+    assert all(r.expression_states["mouth_open"] for r in results)
+    assert results[1].landmark_frame.timestamp == pytest.approx(1 / 30)
+    assert pipeline.detection_scheduler.get_stats()["predicted"] == 5
+    pipeline.action_executor.assert_called_once()
+
+def test_idle_mode_polls_shrunk_frames_until_a_face_returns(pipeline, config_manager, open_mouth_face, mocker):
+    config_manager.get_setting.side_effect = lambda key, default=None: {"idle_mode": True, "idle_timeout_ms": 1000, "idle_poll_interval_ms": 500, "idle_scale": 0.5, "hold_ms": 60}.get(key, default)
+    pipeline.load_settings()
+    no_face = mocker.Mock(multi_face_landmarks=None)
+    pipeline.detector.detect_landmarks.return_value = no_face
+    frame = np.zeros((40, 60, 3), dtype=np.uint8)
+
+    results = [pipeline.process_frame(frame, timestamp=t) for t in (0.0, 0.5, 1.0, 1.5)]
+    assert [r.idle for r in results] == [False, False, False, True]
+    assert results[-1].frame is None and not results[-1].expression_states["mouth_open"]
+    assert pipeline.frame_interval(0.03) == 0.5
+    assert pipeline.detector.detect_landmarks.call_args.args[0].shape == (20, 30, 3)
+
+    pipeline.detector.detect_landmarks.return_value = mocker.Mock(multi_face_landmarks=[open_mouth_face])
+    result = pipeline.process_frame(frame, timestamp=2.0)
+
+    assert not result.idle and result.expression_states["mouth_open"]
+    assert pipeline.detector.detect_landmarks.call_args.args[0].shape == (40, 60, 3) # Same frame at full resolution
+    assert pipeline.frame_interval(0.03) == 0.03
+    assert pipeline.idle_monitor.get_stats() == {"state": "active", "active_s": 1.0, "idle_s": 1.0, "idle_entries": 1}
+
+def bright_square_results(rgb_image):
+    """Fake detector: the 'face' is the bright square, its landmarks span its bounding box."""
+    rows, cols = np.nonzero(rgb_image[..., 0] > 127)
+    if len(rows) == 0: return type("Results", (), {"multi_face_landmarks": None})()
+    height, width = rgb_image.shape[:2]
+    face = MockFaceLandmarks()
+    for i, t in enumerate(np.linspace(0.0, 1.0, len(face.landmark))):
+        face.set_landmark(i, (cols.min() + t * (cols.max() + 1 - cols.min())) / width, (rows.min() + t * (rows.max() + 1 - rows.min())) / height)
+    return type("Results", (), {"multi_face_landmarks": [face]})()
+
+def test_face_roi_detects_on_crop_and_falls_back_to_full_frame(pipeline, config_manager):
+    config_manager.get_setting.side_effect = lambda key, default=None: {"face_roi": True, "face_roi_size": 128, "hold_ms": 60}.get(key, default)
+    pipeline.load_settings()
+    pipeline.detector.detect_landmarks.side_effect = bright_square_results
+    frame = np.zeros((360, 640, 3), dtype=np.uint8); frame[100:160, 300:360] = 255
+
+    full = pipeline.process_frame(frame, timestamp=0.0).landmark_frame
+    cropped = pipeline.process_frame(frame, timestamp=0.1).landmark_frame
+    moved = np.zeros_like(frame); moved[200:260, 40:100] = 255
+    found_again = pipeline.process_frame(moved, timestamp=0.2).landmark_frame
+
+    input_shapes = [call.args[0].shape for call in pipeline.detector.detect_landmarks.call_args_list]
+    assert input_shapes == [(360, 640, 3), (128, 128, 3), (128, 128, 3), (360, 640, 3)]
+    np.testing.assert_allclose(cropped.points[:, :2], full.points[:, :2], atol=2 / 360)
+    assert cropped.image_size == (640, 360)
+    assert found_again.points[0, 0] == pytest.approx(40 / 640, abs=1e-6)
+    assert pipeline.face_roi.get_stats() == {"cropped": 2, "full_frame": 2, "lost": 1}
+
+def test_step_returns_none_when_threaded_webcam_has_no_new_frame(pipeline, mocker):
+    pipeline.webcam = mocker.Mock(spec=["read_frame", "is_opened", "threaded"], threaded=True)
+    pipeline.webcam.read_frame.return_value = (False, None)
+    pipeline.webcam.is_opened.return_value = True
+
+    assert pipeline.step() is None
+    pipeline.detector.detect_landmarks.assert_not_called()
+
+def test_step_returns_empty_result_when_capture_fails(pipeline, mocker):
+    pipeline.webcam = mocker.Mock(spec=["read_frame", "is_opened", "threaded"], threaded=False)
+    pipeline.webcam.read_frame.return_value = (False, None)
+
+    result = pipeline.step()
+
+    assert result.frame is None
+    assert result.expression_states == {}
+
+def test_process_frame_builds_landmark_frame_once(pipeline):
+    frame = np.zeros((10, 20, 3), dtype=np.uint8)
+
+    result = pipeline.process_frame(frame, timestamp=3.0)
+
+    assert isinstance(result.landmark_frame, LandmarkFrame)
+    assert result.landmark_frame.points.dtype == np.float32
+    assert result.landmark_frame.image_size == (20, 10)
+    assert result.landmark_frame.timestamp == 3.0
+
+def test_step_uses_landmarks_from_detection_process(pipeline, mocker, open_mouth_face):
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    landmark_frame = LandmarkFrame.from_face_landmarks(open_mouth_face)
+    pipeline.webcam = mocker.Mock(spec=["read_detection", "is_opened", "threaded", "last_timestamp"], threaded=True, last_timestamp=2.0)
+    pipeline.webcam.read_detection.return_value = (True, frame, landmark_frame)
+
+    result = pipeline.step()
+
+    pipeline.detector.detect_landmarks.assert_not_called()
+    assert result.landmark_frame is landmark_frame
+    assert result.expression_states["mouth_open"] == True
+    assert result.timestamp == 2.0
+
+def test_profiler_times_pipeline_stages_when_enabled(pipeline):
+    pipeline.profiler.enabled = True
+    pipeline.webcam = type("Webcam", (), {"threaded": False, "last_timestamp": 1.0,
+                                          "read_frame": lambda self: (True, np.zeros((10, 10, 3), dtype=np.uint8)),
+                                          "is_opened": lambda self: True})()
+
+    pipeline.step()
+    stats = pipeline.profiler.snapshot()
+
+    assert stats["frames"] == 1
+    assert {"capture", "convert", "detect", "analyze", "draw", "triggers", "total"} <= set(stats["stages"])
+
+def test_profiler_disabled_collects_nothing(pipeline):
+    pipeline.process_frame(np.zeros((10, 10, 3), dtype=np.uint8))
+
+    assert pipeline.profiler.snapshot()["frames"] == 0
+
+def dot_renderer(image, landmark_frame, in_place=False):
+    image = image if in_place else image.copy()
+    height, width = image.shape[:2]
+    x, y = landmark_frame.points[33, :2]
+    image[int(y * height), int(x * width)] = 255
+    return image
+
+def test_every_result_gets_its_own_frame(pipeline):
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    frames = [pipeline.process_frame(frame).frame for _ in range(4)]
+
+    assert len({id(output) for output in frames}) == 4 # A frame still shown is never drawn on again
+    assert all(output is not frame for output in frames)
+
+def test_overlay_at_display_resolution_shrinks_output_frame(pipeline, config_manager):
+    settings = {"hold_ms": 60, "overlay_resolution": "display"}
+    config_manager.get_setting.side_effect = lambda key, default=None: settings.get(key, default)
+    pipeline.load_settings()
+    pipeline.overlay_renderer = dot_renderer
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    result = pipeline.process_frame(frame)
+
+    assert result.frame.shape == (360, 640, 3)
+    assert result.frame[144, 128].max() == 255 # Landmark 33 at (0.2 | 0.4) drawn in display coordinates
+    assert result.ratios["mouth_open"] == pytest.approx(0.5)
+    assert pipeline.detector.detect_landmarks.call_args[0][0].shape == (1080, 1920, 3) # Detection keeps the full frame
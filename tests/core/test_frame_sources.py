@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+import cv2
+
+from src.core.frame_sources import _PrefetchFrameSource, ImageSequenceSource, VideoFileSource, open_frame_source
+from src.core.webcam_handler import WebcamHandler
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    for i in range(5):
+        cv2.imwrite(str(tmp_path / f"frame_{i:03d}.png"), np.full((24, 32, 3), i * 10, dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("not an image")
+    return tmp_path
+
+def read_all(source, limit=100):
+    frames, timestamps = [], []
+    while source.is_opened() and len(frames) < limit:
+        success, frame = source.read_frame()
+        if success: frames.append(frame); timestamps.append(source.last_timestamp)
+    return frames, timestamps
+
+
+def test_image_sequence_fast_reads_all_frames_in_order(image_dir):
+    source = ImageSequenceSource(str(image_dir), pacing="fast", fps=20.0)
+
+    frames, timestamps = read_all(source)
+    source.release()
+
+    assert [int(frame[0, 0, 0]) for frame in frames] == [0, 10, 20, 30, 40]
+    assert np.diff(timestamps) == pytest.approx([0.05] * 4)
+    assert not source.is_opened()
+    assert source.read_frame() == (False, None)
+
+def test_image_sequence_loop_restarts(image_dir):
+    source = ImageSequenceSource(str(image_dir), pacing="fast", loop=True)
+
+    frames, _ = read_all(source, limit=7)
+    source.release()
+
+    assert [int(frame[0, 0, 0]) for frame in frames] == [0, 10, 20, 30, 40, 0, 10]
+
+def test_realtime_pacing_waits_for_next_frame(image_dir):
+    source = ImageSequenceSource(str(image_dir), pacing="realtime", fps=1.0)
+    success = False
+    while not success: success, _ = source.read_frame()
+
+    assert source.read_frame() == (False, None)
+    assert source.is_opened()
+    source.release()
+
+def test_video_file_source_reads_frames(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (32, 24))
+    for i in range(6): writer.write(np.full((24, 32, 3), i * 40, dtype=np.uint8))
+    writer.release()
+
+    source = VideoFileSource(path, pacing="fast")
+    frames, _ = read_all(source)
+    source.release()
+
+    assert source.fps == pytest.approx(25.0)
+    assert len(frames) == 6
+    assert frames[0].shape == (24, 32, 3)
+
+def test_open_frame_source_dispatches_by_source(mocker, image_dir):
+    mock_capture = mocker.Mock(spec=cv2.VideoCapture)
+    mock_capture.isOpened.return_value = True
+    mock_videocapture_class = mocker.patch('cv2.VideoCapture', return_value=mock_capture)
+
+    webcam = open_frame_source("1", threaded=False)
+    images = open_frame_source(str(image_dir), pacing="fast")
+    images.release()
+
+    assert isinstance(webcam, WebcamHandler)
+    mock_videocapture_class.assert_called_once_with(1)
+    assert isinstance(images, ImageSequenceSource)
+
+def test_invalid_pacing_raises(image_dir):
+    with pytest.raises(ValueError):
+        ImageSequenceSource(str(image_dir), pacing="slow")
+
+def test_prefetch_source_requires_decoding():
+    class RewindOnlySource(_PrefetchFrameSource):
+        def _rewind(self): return True
+
+    with pytest.raises(TypeError): RewindOnlySource("nothing", 30.0)
@@ -0,0 +1,55 @@
+import pytest
+import numpy as np
+
+from src.core.gesture_registry import GESTURE_REGISTRY, GestureDefinition, GestureFeatureEngine, register_gesture
+from src.core.expression_analyzer import get_mouth_open_ratio, get_eyebrows_raised_ratio, get_smile_ratio
+from src.core.landmark_frame import LandmarkFrame
+
+
+@pytest.fixture
+def random_points():
+    return np.random.default_rng(0).random((478, 3)).astype(np.float32)
+
+
+def test_engine_matches_analyzer_functions(random_points):
+    engine = GestureFeatureEngine(["mouth_open", "eyebrows_raised", "smile"])
+
+    ratios = engine.compute_dict(LandmarkFrame(random_points))
+
+    assert ratios["mouth_open"] == pytest.approx(get_mouth_open_ratio(random_points), rel=1e-5)
+    assert ratios["eyebrows_raised"] == pytest.approx(get_eyebrows_raised_ratio(random_points), rel=1e-5)
+    assert ratios["smile"] == pytest.approx(get_smile_ratio(random_points), rel=1e-5)
+
+def test_compute_batch_returns_one_row_per_frame(random_points):
+    engine = GestureFeatureEngine()
+    batch = np.stack([random_points, random_points * 0.5])
+
+    ratios = engine.compute(batch)
+
+    assert ratios.shape == (2, len(engine))
+    np.testing.assert_allclose(ratios[0], engine.compute(random_points), rtol=1e-5)
+
+def test_zero_eye_distance_yields_zero():
+    engine = GestureFeatureEngine()
+    points = np.ones((478, 3), dtype=np.float32)
+    points[13, 1] = 0.0
+
+    assert engine.compute(points).tolist() == [0.0] * len(engine)
+
+def test_compute_dict_returns_empty_for_incomplete_landmarks():
+    assert GestureFeatureEngine().compute_dict(np.zeros((100, 3), dtype=np.float32)) == {}
+
+def test_registered_gesture_adds_a_column(random_points):
+    registry = dict(GESTURE_REGISTRY)
+    registry["mouth_wide"] = GestureDefinition("mouth_wide", ((61, 291),), "dx", "mouth_wide", "Stretch Mouth")
+
+    engine = GestureFeatureEngine(registry=registry)
+
+    assert engine.keys[-1] == "mouth_wide"
+    expected = abs(random_points[61, 0] - random_points[291, 0]) / abs(random_points[33, 0] - random_points[263, 0])
+    assert engine.compute(random_points)[-1] == pytest.approx(expected, rel=1e-5)
+
+def test_register_gesture_rejects_unknown_metric():
+    with pytest.raises(ValueError):
+        register_gesture(GestureDefinition("bad", ((1, 2),), "angle", "bad", ""))
+    assert "bad" not in GESTURE_REGISTRY
@@ -0,0 +1,32 @@
+from src.core.idle_monitor import IdleMonitor
+
+
+def test_becomes_idle_after_timeout_without_face():
+    monitor = IdleMonitor(timeout_ms=1000)
+
+    assert monitor.observe(True, 0.0) == "active"
+    assert monitor.observe(False, 0.5) == "active"
+    assert monitor.observe(False, 1.0) == "idle"
+    assert monitor.idle
+
+def test_first_face_ends_idle():
+    monitor = IdleMonitor(timeout_ms=100)
+    monitor.observe(False, 0.0); monitor.observe(False, 0.2)
+
+    assert monitor.observe(True, 0.7) == "active"
+    assert monitor.observe(False, 0.75) == "active" # The timeout restarts
+
+def test_time_in_each_state_is_tracked():
+    monitor = IdleMonitor(timeout_ms=1000)
+    for timestamp in (0.0, 0.5, 1.0, 3.0, 5.0): monitor.observe(False, timestamp)
+    monitor.observe(True, 5.5)
+
+    assert monitor.get_stats() == {"state": "active", "active_s": 1.0, "idle_s": 4.5, "idle_entries": 1}
+
+def test_reset_returns_to_active():
+    monitor = IdleMonitor(timeout_ms=100)
+    monitor.observe(False, 0.0); monitor.observe(False, 0.2)
+    monitor.reset()
+
+    assert not monitor.idle
+    assert monitor.observe(False, 10.0) == "active"
@@ -0,0 +1,134 @@
+import pytest
+import numpy as np
+
+from src.core.gesture_registry import gesture_landmark_indices
+from src.core.landmark_archive import (LandmarkArchive, LandmarkRecorder, LandmarkReplayDetector, LandmarkReplaySource,
+                                       MISSING_COORDINATE)
+from src.core.landmark_frame import LandmarkFrame
+from src.core.frame_pipeline import FramePipeline
+from src.core.calibrator import Calibrator
+from src.core.output_backends import compile_action
+
+
+@pytest.fixture
+def faces():
+    rng = np.random.default_rng(1)
+    return [LandmarkFrame(rng.random((468, 3)).astype(np.float32)) for _ in range(5)]
+
+def record_session(path, faces, **kwargs):
+    recorder = LandmarkRecorder(str(path), chunk_frames=2, **kwargs)
+    for i, face in enumerate(faces): recorder.record(10.0 + i / 30, face)
+    recorder.record(20.0, None)
+    recorder.close()
+
+
+def test_float32_round_trip_is_exact(tmp_path, faces):
+    path = tmp_path / "session.landmarks"
+    record_session(path, faces, dtype=np.float32)
+
+    archive = LandmarkArchive(str(path))
+
+    assert len(archive) == 6
+    assert archive.header_size % 64 == 0
+    assert isinstance(archive.records, np.memmap)
+    np.testing.assert_array_equal(archive.points[3], faces[3].points)
+    assert archive.face_present.tolist() == [True] * 5 + [False]
+    assert archive.timestamps[1] == pytest.approx(10.0 + 1 / 30)
+    assert archive.landmark_frame(5) is None
+
+def test_gesture_subset_expands_to_original_indices(tmp_path, faces):
+    path = tmp_path / "subset.landmarks"
+    record_session(path, faces, landmark_indices=gesture_landmark_indices())
+
+    archive = LandmarkArchive(str(path))
+    frame = archive.landmark_frame(2)
+
+    assert archive.dtype == np.float16
+    assert archive.points.shape == (6, len(gesture_landmark_indices()), 3)
+    indices = gesture_landmark_indices()
+    np.testing.assert_allclose(frame.points[indices], faces[2].points[indices], atol=1e-3)
+    assert frame.points.shape == (468, 3)
+    assert frame.points[0, 0] == MISSING_COORDINATE
+
+def test_short_frame_records_missing_landmarks(tmp_path, faces):
+    path = tmp_path / "short.landmarks"
+    recorder = LandmarkRecorder(str(path), landmark_indices=[10, 300, 400], dtype=np.float32)
+    recorder.record(1.0, LandmarkFrame(faces[0].points[:350]))
+    recorder.close()
+
+    frame = LandmarkArchive(str(path)).landmark_frame(0)
+
+    np.testing.assert_array_equal(frame.points[[10, 300]], faces[0].points[[10, 300]])
+    assert np.all(frame.points[400] == MISSING_COORDINATE)
+
+def test_append_keeps_existing_records_and_ignores_partial_record(tmp_path, faces):
+    path = tmp_path / "append.landmarks"
+    record_session(path, faces[:2])
+    record_session(path, faces[2:], append=True)
+    with open(path, "ab") as file: file.write(b"\x00" * 7)
+
+    assert len(LandmarkArchive(str(path))) == 7
+
+def test_append_truncates_partial_record_first(tmp_path, faces):
+    path = tmp_path / "crashed.landmarks"
+    record_session(path, faces[:2], dtype=np.float32)
+    with open(path, "ab") as file: file.write(b"\x00" * 7)
+    record_session(path, faces[2:], dtype=np.float32, append=True)
+
+    archive = LandmarkArchive(str(path))
+
+    assert len(archive) == 7
+    np.testing.assert_array_equal(archive.points[3], faces[2].points)
+    assert archive.timestamps[3] == pytest.approx(10.0)
+
+def test_replay_detector_returns_recorded_landmarks(tmp_path, faces):
+    path = tmp_path / "replay.landmarks"
+    record_session(path, faces[:1], dtype=np.float32)
+    detector = LandmarkReplayDetector(str(path))
+
+    first = detector.detect_landmarks(np.zeros((120, 160, 3), dtype=np.uint8))
+    second = detector.detect_landmarks()
+
+    assert isinstance(first.multi_face_landmarks[0], LandmarkFrame)
+    assert first.multi_face_landmarks[0].image_size == (160, 120)
+    np.testing.assert_array_equal(first.multi_face_landmarks[0].points, faces[0].points)
+    assert second.multi_face_landmarks is None
+    assert detector.is_finished()
+
+def test_realtime_replay_restarts_pacing_when_looping(mocker, tmp_path, faces):
+    path = tmp_path / "loop.landmarks"
+    recorder = LandmarkRecorder(str(path))
+    recorder.record(10.0, faces[0]); recorder.record(10.5, faces[1])
+    recorder.close()
+    clock = mocker.patch("src.core.landmark_archive.time.monotonic")
+    source = LandmarkReplaySource(str(path), pacing="realtime", loop=True)
+
+    def read_at(now):
+        clock.return_value = now
+        return source.read_detection()[0]
+
+    assert [read_at(100.0), read_at(100.5), read_at(100.6)] == [True, True, True]
+    assert not read_at(100.7) # The second record is due half a second after the loop restarted
+    assert read_at(101.1)
+
+def test_replay_source_drives_pipeline_without_detector(mocker, tmp_path):
+    face = np.full((468, 3), 0.5, dtype=np.float32)
+    face[33, 0] = 0.2; face[263, 0] = 0.8; face[13, 1] = 0.6; face[14, 1] = 0.9
+    path = tmp_path / "pipeline.landmarks"
+    record_session(path, [LandmarkFrame(face)] * 4)
+    config_manager = mocker.Mock(DEFAULT_CONFIG={"thresholds": {}})
+    config_manager.get_thresholds.return_value = {"mouth_open": 0.35}
+    config_manager.get_neutral_ratios.return_value = {}
+    config_manager.get_enabled_gestures.return_value = {"mouth_open": True}
+    config_manager.get_actions.return_value = {"mouth_open": {"type": "press", "value": "a"}}
+    config_manager.get_setting.side_effect = lambda key, default=None: {"hold_ms": 60}.get(key, default)
+    executor = mocker.Mock()
+    pipeline = FramePipeline(config_manager, Calibrator(), ["mouth_open"], action_executor=executor)
+    pipeline.webcam = pipeline.detector = LandmarkReplaySource(str(path))
+
+    results = []
+    while pipeline.webcam.is_opened(): results.append(pipeline.step())
+
+    assert [r.expression_states["mouth_open"] for r in results] == [True] * 4 + [False]
+    assert results[0].timestamp == pytest.approx(10.0)
+    executor.assert_called_once_with("mouth_open", compile_action({"type": "press", "value": "a"}))
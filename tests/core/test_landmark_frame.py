@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+
+from src.core.landmark_frame import LandmarkFrame, landmark_points
+from src.core.expression_analyzer import get_mouth_open_ratio, get_smile_ratio
+
+
+class MockLandmark:
+    def __init__(self, x=0.0, y=0.0, z=0.0): self.x = x; self.y = y; self.z = z
+
+class MockFaceLandmarks:
+    def __init__(self, num_landmarks=478): self.landmark = [MockLandmark(i / num_landmarks, 0.5, -0.1) for i in range(num_landmarks)]
+
+
+def test_from_results_builds_contiguous_float32_array(mocker):
+    face = MockFaceLandmarks(num_landmarks=468)
+    results = mocker.Mock(multi_face_landmarks=[face])
+
+    frame = LandmarkFrame.from_results(results, timestamp=1.25, image_size=(640, 480))
+
+    assert frame.points.shape == (468, 3)
+    assert frame.points.dtype == np.float32
+    assert frame.points.flags.c_contiguous
+    assert frame.points[10, 0] == pytest.approx(10 / 468)
+    assert frame.points[10, 2] == pytest.approx(-0.1)
+    assert frame.timestamp == 1.25
+    assert frame.face_index == 0
+    assert frame.image_size == (640, 480)
+    assert len(frame) == 468
+
+def test_from_results_without_face_returns_none(mocker):
+    assert LandmarkFrame.from_results(mocker.Mock(multi_face_landmarks=None)) is None
+    assert LandmarkFrame.from_results(mocker.Mock(multi_face_landmarks=[MockFaceLandmarks()]), face_index=1) is None
+
+def test_landmark_frame_uses_slots():
+    frame = LandmarkFrame(np.zeros((3, 3)))
+    with pytest.raises(AttributeError):
+        frame.extra = 1
+
+def test_landmark_points_returns_view_for_landmark_frame():
+    frame = LandmarkFrame(np.zeros((478, 3), dtype=np.float32))
+    assert landmark_points(frame) is frame.points
+
+def test_ratio_functions_accept_landmark_frame():
+    points = np.zeros((478, 3), dtype=np.float32)
+    points[33, 0] = 0.2; points[263, 0] = 0.8
+    points[13, 1] = 0.6; points[14, 1] = 0.9
+    points[61, :2] = (0.35, 0.75); points[291, :2] = (0.65, 0.75)
+    frame = LandmarkFrame(points)
+
+    assert get_mouth_open_ratio(frame) == pytest.approx(0.5, rel=1e-5)
+    assert get_smile_ratio(frame) == pytest.approx(0.5, rel=1e-5)
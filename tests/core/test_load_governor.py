@@ -0,0 +1,44 @@
+import pytest
+from src.core.load_governor import LoadGovernor
+
+BASELINE = {"display_fps": 60, "overlay_level": "full", "frame_interval_ms": 30, "capture_scale": 1.0}
+
+
+def run_windows(governor, frame_ms_per_window, start=0.0, window_s=1.0, frames=10):
+    """Feeds one window per value and returns the level after each window."""
+    levels = []
+    for window, frame_ms in enumerate(frame_ms_per_window):
+        for i in range(frames + 1): governor.observe(frame_ms, start + window * window_s + i * window_s / frames)
+        levels.append(governor.level)
+    return levels
+
+
+def test_overload_applies_one_step_per_window():
+    governor = LoadGovernor(BASELINE, metric="latency", target_ms=20.0, window_ms=1000)
+
+    assert run_windows(governor, [30.0, 30.0]) == [1, 2]
+    assert governor.decisions == {"display_fps": 60, "overlay_level": "keypoints", "frame_interval_ms": 30, "capture_scale": 1.0}
+    assert [knob for knob, _ in governor.steps] == ["overlay_level", "overlay_level", "capture_scale", "capture_scale"]
+
+def test_hysteresis_holds_level_near_target_and_restores_slowly():
+    governor = LoadGovernor(BASELINE, metric="latency", target_ms=20.0, hysteresis=0.2, window_ms=1000, restore_windows=2)
+    run_windows(governor, [30.0])
+
+    assert run_windows(governor, [18.0, 22.0, 10.0, 22.0, 10.0, 10.0], start=1.0) == [1, 1, 1, 1, 1, 0]
+    assert governor.decisions == BASELINE
+
+def test_cpu_metric_uses_process_cpu_time():
+    cpu_time = iter([0.0, 0.0, 0.9, 0.9, 1.1, 1.1])
+    governor = LoadGovernor(BASELINE, metric="cpu", target_cpu_percent=50.0, window_ms=1000, restore_windows=1, cpu_clock=lambda: next(cpu_time))
+
+    assert governor.observe(5.0, 0.0) is False # Starts the first window
+    assert governor.observe(5.0, 1.0) is True # 90 % of a core
+    assert governor.decisions["display_fps"] == 30 and governor.get_stats()["load"] == pytest.approx(90.0)
+    assert governor.observe(5.0, 2.0) is True and governor.level == 0 # 20 %
+
+def test_steps_never_raise_the_baseline():
+    governor = LoadGovernor({"display_fps": 0, "overlay_level": "off", "frame_interval_ms": 80, "capture_scale": 0.5}, metric="cpu")
+
+    governor.set_level(len(governor.steps))
+
+    assert governor.decisions == {"display_fps": 15, "overlay_level": "off", "frame_interval_ms": 100, "capture_scale": 0.5}
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from src.core.landmark_frame import LandmarkFrame
+from src.core.motion_gate import MotionGate
+
+
+@pytest.fixture
+def face():
+    points = np.zeros((468, 3), dtype=np.float32)
+    points[:, 0] = np.linspace(0.4, 0.6, 468); points[:, 1] = np.linspace(0.3, 0.7, 468)
+    return LandmarkFrame(points, 1.0, 0, (200, 100))
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(4).integers(0, 255, (100, 200, 3), dtype=np.uint8)
+
+
+def test_static_face_reuses_last_landmarks(face, frame):
+    gate = MotionGate(threshold=1.5, max_stale_ms=250)
+    assert gate.check(frame, 1.0) is None # No face known yet
+    gate.update(frame, face, 1.0)
+
+    reused = gate.check(frame.copy(), 1.1)
+
+    assert reused.points is face.points
+    assert reused.timestamp == 1.1
+    assert gate.get_stats() == {"checked": 2, "skipped": 1, "skip_rate": 0.5}
+
+def test_motion_in_face_region_requires_inference(face, frame):
+    gate = MotionGate()
+    gate.update(frame, face, 1.0)
+    moved = frame.copy(); moved[40:60, 85:115] = 255 - moved[40:60, 85:115]
+
+    assert gate.check(moved, 1.05) is None
+    assert gate.last_difference > 1.5
+
+def test_motion_outside_face_region_is_ignored(face, frame):
+    gate = MotionGate()
+    gate.update(frame, face, 1.0)
+    moved = frame.copy(); moved[:, :50] = 0
+
+    assert gate.check(moved, 1.05) is not None
+
+def test_landmarks_are_not_reused_longer_than_max_staleness(face, frame):
+    gate = MotionGate(max_stale_ms=100)
+    gate.update(frame, face, 1.0)
+
+    assert gate.check(frame, 1.09) is not None
+    assert gate.check(frame, 1.11) is None
+
+def test_lost_face_resets_gate(face, frame):
+    gate = MotionGate()
+    gate.update(frame, face, 1.0)
+    gate.update(frame, None, 1.1)
+
+    assert gate.check(frame, 1.15) is None
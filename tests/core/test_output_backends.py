@@ -0,0 +1,63 @@
+import sys
+import threading
+
+import pytest
+
+from src.core.output_backends import (CompiledAction, LowLatencyBackend, OutputBackend, PyAutoGUIBackend, RecordingBackend,
+                                      compile_action, compile_actions, create_output_backend)
+
+
+def test_compile_action_parses_once_into_immutable_action():
+    action = compile_action({"type": "hotkey", "value": " Ctrl, Shift ,,s"})
+
+    assert isinstance(action, CompiledAction)
+    assert action.kind == "hotkey"
+    assert action.keys == ("ctrl", "shift", "s")
+    with pytest.raises(TypeError): action.config["value"] = "x"
+
+def test_compile_actions_skips_invalid_actions():
+    actions = compile_actions({"mouth_open": {"type": "press", "value": "Enter"}, "smile": {"type": "write", "value": ""},
+                               "eyebrows_raised": {"type": "jump", "value": "a"}, "wink": None})
+
+    assert list(actions) == ["mouth_open"]
+    assert actions["mouth_open"].keys == ("enter",)
+
+def test_output_backend_requires_key_events():
+    class PressOnlyBackend(OutputBackend):
+        def press(self, key): pass
+
+    with pytest.raises(TypeError): PressOnlyBackend()
+
+def test_recording_backend_types_text_until_cancelled():
+    cancel_event = threading.Event()
+    backend = RecordingBackend()
+    backend.key_up = lambda key: (RecordingBackend.key_up(backend, key), cancel_event.set() if key == "B" else None)
+
+    completed = backend.execute(compile_action({"type": "write", "value": "aBcd"}), cancel_event)
+
+    assert not completed
+    assert [event[1:] for event in backend.events] == [("down", "a"), ("up", "a"), ("down", "B"), ("up", "B")]
+    assert all(earlier[0] <= later[0] for earlier, later in zip(backend.events, backend.events[1:]))
+
+def test_low_latency_backend_bypasses_pyautogui_pause(mocker):
+    pyautogui = mocker.Mock()
+    mocker.patch.dict(sys.modules, {"pyautogui": pyautogui})
+
+    LowLatencyBackend().execute(compile_action({"type": "hotkey", "value": "ctrl,v"}))
+
+    platform = pyautogui.platformModule
+    assert [c.args[0] for c in platform._keyDown.call_args_list] == ["ctrl", "v"]
+    assert [c.args[0] for c in platform._keyUp.call_args_list] == ["v", "ctrl"]
+    pyautogui.hotkey.assert_not_called()
+
+def test_pyautogui_backend_uses_public_functions(mocker):
+    pyautogui = mocker.Mock()
+    mocker.patch.dict(sys.modules, {"pyautogui": pyautogui})
+
+    PyAutoGUIBackend().execute(compile_action({"type": "hotkey", "value": "ctrl,v"}))
+
+    pyautogui.hotkey.assert_called_once_with("ctrl", "v")
+
+def test_create_output_backend_falls_back_to_pyautogui():
+    assert create_output_backend("recording").name == "recording"
+    assert create_output_backend("teleport").name == "pyautogui"
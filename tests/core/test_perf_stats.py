@@ -0,0 +1,60 @@
+import pytest
+
+from src.core.perf_stats import PipelineProfiler, compare_results, summarize_latencies
+
+
+def test_summarize_latencies_reports_fps_and_percentiles():
+    samples_ns = [1_000_000] * 98 + [5_000_000, 10_000_000]
+
+    summary = summarize_latencies(samples_ns)
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(1.0)
+    assert summary["p99_ms"] == pytest.approx(5.05)
+    assert summary["mean_ms"] == pytest.approx(1.13)
+    assert summary["fps"] == pytest.approx(1000 / 1.13, rel=1e-3)
+
+def test_summarize_latencies_handles_empty_input():
+    assert summarize_latencies([])["count"] == 0
+
+def test_compare_results_flags_only_significant_regressions():
+    baseline = {"draw": {"p50_ms": 10.0, "p95_ms": 12.0, "fps": 100.0},
+                "tiny": {"p50_ms": 0.002, "p95_ms": 0.003, "fps": 400000.0},
+                "removed": {"p50_ms": 1.0}}
+    current = {"draw": {"p50_ms": 10.5, "p95_ms": 15.0, "fps": 80.0},
+               "tiny": {"p50_ms": 0.004, "p95_ms": 0.009, "fps": 200000.0},
+               "new": {"p50_ms": 3.0}}
+
+    regressions = compare_results(current, baseline, tolerance=0.15)
+
+    assert [(r["stage"], r["metric"]) for r in regressions] == [("draw", "p95_ms"), ("draw", "fps")]
+    assert regressions[0]["change"] == pytest.approx(0.25)
+
+def test_profiler_records_marked_stages_and_late_frames(mocker):
+    clock = iter([0, 2_000_000, 5_000_000, 40_000_000, 50_000_000, 51_000_000, 52_000_000])
+    mocker.patch("src.core.perf_stats.time.perf_counter_ns", side_effect=lambda: next(clock))
+    profiler = PipelineProfiler(enabled=True, frame_budget_ms=33.3)
+
+    profiler.begin_frame(); profiler.mark("capture"); profiler.mark("detect"); profiler.end_frame()
+    profiler.begin_frame(); profiler.mark("capture"); profiler.end_frame()
+    profiler.record("qt_convert", 500_000)
+    profiler.add_dropped(2)
+    stats = profiler.snapshot()
+
+    assert stats["frames"] == 2
+    assert stats["late_frames"] == 1
+    assert stats["dropped_frames"] == 2
+    assert stats["fps"] == pytest.approx(1e9 / 12_000_000, abs=0.01)
+    assert stats["stages"]["capture"]["count"] == 2
+    assert stats["stages"]["detect"]["max_ms"] == pytest.approx(3.0)
+    assert stats["stages"]["total"]["max_ms"] == pytest.approx(40.0)
+    assert sum(stats["stages"]["qt_convert"]["histogram"]) == 1
+
+def test_profiler_window_keeps_most_recent_samples():
+    profiler = PipelineProfiler(enabled=True, window=3)
+
+    for duration in (10, 20, 30, 40): profiler.record("stage", duration * 1_000_000)
+
+    summary = profiler.snapshot()["stages"]["stage"]
+    assert summary["count"] == 3
+    assert summary["mean_ms"] == pytest.approx(30.0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from src.core.ratio_filter import Hysteresis, RatioFilter, release_thresholds
+
+
+def run_filter(ratio_filter, values, fps, start=0.0):
+    return [ratio_filter(value, start + i / fps) for i, value in enumerate(values)]
+
+
+def test_off_returns_ratios_unchanged():
+    ratio_filter = RatioFilter(2, "off")
+    assert ratio_filter([0.1, 0.9], 0.0).tolist() == [0.1, 0.9]
+    assert ratio_filter([0.5, 0.2], 0.1).tolist() == [0.5, 0.2]
+
+def test_unknown_mode_falls_back_to_off():
+    assert RatioFilter(1, "kalman").mode == "off"
+
+@pytest.mark.parametrize("mode", ["ema", "one_euro"])
+def test_smoothing_does_not_depend_on_frame_rate(mode):
+    results = {}
+    for fps in (15, 30, 60):
+        step = [[0.1]] + [[0.5]] * int(fps * 0.2)  # 200 ms after a step
+        results[fps] = run_filter(RatioFilter(1, mode), step, fps)[-1][0]
+
+    assert results[15] == pytest.approx(results[60], abs=0.03)
+    assert 0.1 < results[30] < 0.5
+
+def test_one_euro_follows_fast_changes_with_less_lag_than_ema():
+    step = [[0.1]] * 5 + [[0.5]] * 3
+    ema = run_filter(RatioFilter(1, "ema", min_cutoff_hz=2.0), step, 30)
+    one_euro = run_filter(RatioFilter(1, "one_euro", min_cutoff_hz=2.0, beta=1.0), step, 30)
+
+    assert one_euro[-1][0] > ema[-1][0]
+    assert one_euro[4][0] == pytest.approx(0.1) # Constant input is not changed
+
+def test_gestures_are_filtered_independently():
+    rng = np.random.default_rng(3)
+    values = rng.uniform(0.0, 1.0, (20, 3))
+    together = np.array(run_filter(RatioFilter(3, "one_euro"), values, 30))
+
+    for column in range(3):
+        alone = np.array(run_filter(RatioFilter(1, "one_euro"), values[:, column:column + 1], 30))
+        np.testing.assert_allclose(together[:, column], alone[:, 0])
+
+def test_reset_and_restarted_timestamps_start_from_raw_ratio():
+    ratio_filter = RatioFilter(1, "ema")
+    run_filter(ratio_filter, [[0.1]] * 5, 30, start=10.0)
+
+    assert ratio_filter([0.7], 1.0)[0] == pytest.approx(0.7) # Timestamps went backwards, e.g. a looping replay
+    ratio_filter.reset()
+    assert ratio_filter([0.3], 1.1)[0] == pytest.approx(0.3)
+
+def test_hysteresis_uses_separate_on_and_off_thresholds():
+    hysteresis = Hysteresis([0.4, 0.4], [0.2, 0.4])
+
+    states = [hysteresis(np.array([value, value])).tolist() for value in (0.5, 0.3, 0.1, 0.3)]
+
+    assert states == [[True, True], [True, False], [False, False], [False, False]]
+    hysteresis(np.array([0.5, 0.5])); hysteresis.reset()
+    assert hysteresis.active.tolist() == [False, False]
+
+def test_release_thresholds_use_neutral_ratios():
+    on = np.array([0.4, 0.4, 0.4])
+
+    off = release_thresholds(on, 0.5, np.array([0.2, np.nan, 0.6]))
+
+    np.testing.assert_allclose(off, [0.3, 0.2, 0.4]) # Unknown neutral counts as 0, a neutral above the threshold disables it
+    np.testing.assert_allclose(release_thresholds(on, 0.0), on)
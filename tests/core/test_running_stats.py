@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from src.core.running_stats import P2Quantile, RunningStats
+
+
+def test_running_stats_match_numpy():
+    samples = np.random.default_rng(1).normal(0.3, 0.05, 1000)
+    stats = RunningStats()
+
+    for value in samples: stats.add(value)
+
+    assert stats.count == 1000
+    assert stats.mean == pytest.approx(samples.mean())
+    assert stats.variance == pytest.approx(samples.var(ddof=1))
+    assert stats.std == pytest.approx(samples.std(ddof=1))
+    assert stats.min == samples.min() and stats.max == samples.max()
+
+def test_running_stats_empty_and_single_value():
+    stats = RunningStats(quantiles=(0.5,))
+    assert stats.count == 0 and stats.variance == 0.0 and stats.quantile(0.5) is None
+    stats.add(2.0)
+    assert stats.mean == 2.0 and stats.variance == 0.0 and stats.quantile(0.5) == 2.0
+
+@pytest.mark.parametrize("values", [[3.0, 1.0], [5.0, 1.0, 4.0, 2.0], [0.4, 0.1, 0.3, 0.2, 0.5]])
+def test_p2_quantile_is_exact_for_few_samples(values):
+    estimator = P2Quantile(0.5)
+    for value in values: estimator.add(value)
+    assert estimator.value() == pytest.approx(np.percentile(values, 50))
+
+@pytest.mark.parametrize("p", [0.1, 0.5, 0.9])
+def test_p2_quantile_approximates_large_streams(p):
+    samples = np.random.default_rng(2).uniform(0.0, 1.0, 5000)
+    estimator = P2Quantile(p)
+
+    for value in samples: estimator.add(value)
+
+    assert estimator.value() == pytest.approx(np.percentile(samples, p * 100), abs=0.02)
+    assert len(estimator._heights) == 5
+
+def test_p2_quantile_rejects_invalid_quantile():
+    with pytest.raises(ValueError): P2Quantile(1.5)
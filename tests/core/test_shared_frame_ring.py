@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+
+from src.core.shared_frame_ring import SharedFrameRing
+from src.core import detection_process
+from src.core.detection_process import DetectionProcess
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(slots=3, shape=(4, 5, 3), dtype=np.uint8)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_ring_read_latest_returns_newest_frame(ring):
+    out = np.empty(ring.shape, dtype=np.uint8)
+    assert ring.read_latest(out) is None
+
+    for sequence in range(1, 5):
+        ring.write(np.full(ring.shape, sequence, dtype=np.uint8), sequence, timestamp_ns=sequence * 100, meta=7)
+
+    assert ring.read_latest(out) == (4, 400, 7)
+    assert np.all(out == 4)
+    assert ring.read_latest(out, newer_than=4) is None
+
+def test_ring_read_overwritten_sequence_returns_none(ring):
+    out = np.empty(ring.shape, dtype=np.uint8)
+    for sequence in range(1, 5):
+        ring.write(np.full(ring.shape, sequence, dtype=np.uint8), sequence, timestamp_ns=0)
+
+    assert ring.read(1, out) is None
+    assert ring.read(2, out) == (2, 0, 0)
+    assert np.all(out == 2)
+
+def test_ring_read_slot_being_written_returns_none(ring):
+    out = np.empty(ring.shape, dtype=np.uint8)
+    ring.write(np.ones(ring.shape, dtype=np.uint8), 1, timestamp_ns=0)
+    ring._control[1, 0] += 1 # writer is in the middle of the copy
+
+    assert ring.read(1, out) is None
+
+def test_ring_attach_shares_buffers(ring):
+    attached = SharedFrameRing.attach(*ring.spec())
+    out = np.empty(ring.shape, dtype=np.uint8)
+
+    attached.write(np.full(ring.shape, 9, dtype=np.uint8), 1, timestamp_ns=5)
+
+    assert ring.read_latest(out) == (1, 5, 0)
+    assert np.all(out == 9)
+    attached.close()
+
+
+def test_detection_process_restarts_crashed_child(mocker):
+    mock_start = mocker.patch.object(DetectionProcess, '_start_process')
+    clock = mocker.patch.object(detection_process.time, 'monotonic', return_value=100.0)
+    process = DetectionProcess(frame_size=(8, 6), max_restarts=1)
+    process._process = mocker.Mock()
+    process._process.is_alive.return_value = False
+
+    process._check_process()
+    assert mock_start.call_count == 1
+    clock.return_value = 101.0
+    process._check_process()
+
+    assert mock_start.call_count == 2
+    assert process.restart_count == 1
+    process._process.is_alive.return_value = False
+    process.stop()
+    assert not process.is_opened()
+
+def test_detection_process_pause_stops_child_until_resumed(mocker):
+    mock_start = mocker.patch.object(DetectionProcess, '_start_process')
+    process = DetectionProcess(frame_size=(8, 6))
+    process._process = mocker.Mock()
+    process._process.is_alive.return_value = False
+
+    process.pause()
+    process._check_process() # A paused child is not restarted
+
+    assert process._stop_event.is_set()
+    assert process._process.join.call_count == 1
+    assert mock_start.call_count == 1
+    assert process.is_opened()
+    process.resume()
+    assert mock_start.call_count == 2
+    process.stop()
+    assert not process.is_opened()
@@ -91,4 +91,67 @@ def test_webcamhandler_is_opened(mocker):
 
     mock_capture.isOpened.return_value = False
     assert handler.is_opened() == False
-    assert mock_capture.isOpened.call_count == 3
\ No newline at end of file
+    assert mock_capture.isOpened.call_count == 3
+
+def _wait_for(condition, timeout=2.0):
+    import time
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+def test_webcamhandler_threaded_read_returns_latest_frame(mocker):
+    mock_capture = mocker.Mock(spec=cv2.VideoCapture)
+    mock_capture.isOpened.return_value = True
+    frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(1, 6)]
+    read_results = iter([(True, f) for f in frames])
+    mock_capture.read.side_effect = lambda: next(read_results, (False, None))
+    mocker.patch('cv2.VideoCapture', return_value=mock_capture)
+    mocker.patch('cv2.flip', side_effect=lambda frame, code: frame)
+
+    handler = WebcamHandler(threaded=True)
+    assert _wait_for(lambda: handler._slot_sequence == len(frames))
+
+    success, frame = handler.read_frame()
+
+    assert success == True
+    assert frame is frames[-1]
+    stats = handler.get_capture_stats()
+    assert stats["sequence"] == len(frames)
+    assert stats["dropped_frames"] == len(frames) - 1
+    assert stats["timestamp"] is not None
+    handler.release()
+
+def test_webcamhandler_threaded_read_without_new_frame_does_not_block(mocker):
+    mock_capture = mocker.Mock(spec=cv2.VideoCapture)
+    mock_capture.isOpened.return_value = True
+    read_results = iter([(True, np.zeros((4, 4, 3), dtype=np.uint8))])
+    mock_capture.read.side_effect = lambda: next(read_results, (False, None))
+    mocker.patch('cv2.VideoCapture', return_value=mock_capture)
+    mocker.patch('cv2.flip', side_effect=lambda frame, code: frame)
+
+    handler = WebcamHandler(threaded=True)
+    assert _wait_for(handler.has_new_frame)
+
+    assert handler.read_frame()[0] == True
+    assert handler.read_frame() == (False, None)
+    assert handler.has_new_frame() == False
+    handler.release()
+    assert handler._reader_thread is None
+    mock_capture.release.assert_called_once()
+
+def test_webcamhandler_set_resolution_applies_before_next_read(mocker):
+    mock_capture = mocker.Mock(spec=cv2.VideoCapture)
+    mock_capture.isOpened.return_value = True
+    mock_capture.read.return_value = (True, np.zeros((10, 10, 3), dtype=np.uint8))
+    mock_capture.get.return_value = 320
+    mocker.patch('cv2.VideoCapture', return_value=mock_capture)
+    mocker.patch('cv2.flip')
+
+    handler = WebcamHandler()
+    handler.set_resolution(320, 240)
+    mock_capture.set.assert_not_called()
+    handler.read_frame()
+    handler.read_frame()
+
+    assert mock_capture.set.call_args_list == [mocker.call(cv2.CAP_PROP_FRAME_WIDTH, 320), mocker.call(cv2.CAP_PROP_FRAME_HEIGHT, 240)]
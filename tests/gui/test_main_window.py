@@ -0,0 +1,39 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from src.gui.main_window import MainWindow
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def window(qt_app):
+    window = MainWindow(["mouth_open", "smile"])
+    yield window
+    window.close()
+
+
+def test_status_indicator_switches_property_on_change(window):
+    label = window.status_indicators["mouth_open"]
+    assert label.property("status") == "disabled" # Until capture reports the enabled gestures
+
+    window.update_expression_status({"mouth_open": True}, {"mouth_open": True, "smile": False})
+
+    assert label.property("status") == "active"
+    assert window.status_indicators["smile"].property("status") == "disabled"
+    assert not window.status_indicators["smile"].isEnabled()
+
+def test_unchanged_status_does_not_touch_widgets(window, mocker):
+    window.update_expression_status({"mouth_open": True}, {"mouth_open": True, "smile": True})
+    spies = [mocker.spy(label, "setProperty") for label in window.status_indicators.values()]
+
+    for _ in range(5): window.update_expression_status({"mouth_open": True}, {"mouth_open": True, "smile": True})
+    window.update_expression_status({"mouth_open": False}, {"mouth_open": True, "smile": True})
+
+    assert spies[0].call_count == 1
+    assert spies[1].call_count == 0
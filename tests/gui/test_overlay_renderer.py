@@ -0,0 +1,54 @@
+import mediapipe as mp
+import numpy as np
+import pytest
+
+from src.gui import drawing_utils
+from src.gui.overlay_renderer import KEYPOINT_COLOR, OverlayRenderer
+from src.core.landmark_frame import LandmarkFrame
+
+
+@pytest.fixture
+def face():
+    rng = np.random.default_rng(7)
+    points = rng.uniform(0.2, 0.8, (468, 3)).astype(np.float32)
+    points[10] = (1.5, 0.5, 0) # Off screen, its connections must be skipped
+    return LandmarkFrame(points, image_size=(320, 240))
+
+@pytest.fixture
+def image():
+    return np.zeros((240, 320, 3), dtype=np.uint8)
+
+
+def test_full_level_tesselation_matches_drawing_utils(face, image):
+    renderer = OverlayRenderer(mp.solutions.face_mesh, mp.solutions.drawing_styles)
+    renderer._contour_groups = []
+    expected = image.copy()
+    pixels, visible = drawing_utils._landmarks_to_pixels(face.points, 320, 240)
+    drawing_utils._draw_connections(expected, pixels, visible, mp.solutions.face_mesh.FACEMESH_TESSELATION,
+                                    mp.solutions.drawing_styles.get_default_face_mesh_tesselation_style())
+
+    np.testing.assert_array_equal(renderer(image, face), expected)
+    assert image.max() == 0
+
+def test_off_level_and_missing_face_return_image_unchanged(face, image):
+    renderer = OverlayRenderer(level="off")
+
+    assert renderer(image, face) is image
+    renderer.set_level("full")
+    assert renderer(image, None) is image
+
+def test_keypoints_level_draws_only_keypoints(image):
+    points = np.full((468, 3), -1.0, dtype=np.float32)
+    points[33] = (0.25, 0.5, 0); points[263] = (0.75, 0.5, 0)
+    renderer = OverlayRenderer(level="keypoints", keypoint_indices=[33])
+
+    result = renderer(image, LandmarkFrame(points), in_place=True)
+
+    assert result is image
+    assert tuple(result[120, 80]) == KEYPOINT_COLOR
+    assert result[:, 160:].max() == 0
+
+def test_unknown_level_falls_back_to_full():
+    renderer = OverlayRenderer(level="sparkles")
+
+    assert renderer.level == "full"
@@ -0,0 +1,61 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PyQt6.QtGui import QColor, QImage
+from PyQt6.QtWidgets import QApplication
+
+from src.gui.video_widget import VideoWidget
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def widget(qt_app):
+    widget = VideoWidget("Waiting", max_fps=0)
+    widget.resize(640, 480)
+    yield widget
+    widget.close()
+
+def grab(widget):
+    image = QImage(widget.size(), QImage.Format.Format_RGB32)
+    widget.render(image)
+    return image
+
+
+def test_paints_bgr_frame_letterboxed(widget):
+    frame = np.zeros((20, 80, 3), dtype=np.uint8)
+    frame[:, :40] = (255, 0, 0) # Blue in BGR
+
+    widget.set_frame(frame)
+    image = grab(widget)
+
+    assert widget.frame_rect(80, 20).getRect() == (0, 160, 640, 160)
+    assert image.pixelColor(100, 240) == QColor(0, 0, 255)
+    assert image.pixelColor(540, 240) == QColor(0, 0, 0)
+    assert image.pixelColor(320, 100) == QColor("#333333") # Letterbox
+
+def test_frame_rect_is_cached_until_resize(widget):
+    rect = widget.frame_rect(640, 480)
+    assert widget.frame_rect(640, 480) is rect
+
+    widget.resize(800, 480)
+
+    assert widget.frame_rect(640, 480).getRect() == (80, 0, 640, 480)
+
+def test_hidden_widget_skips_repaints(widget):
+    assert not widget.set_frame(np.zeros((4, 4, 3), dtype=np.uint8))
+    assert widget.skipped_frames == 1
+
+def test_repaints_are_rate_limited(widget):
+    widget.set_max_fps(10)
+    widget.show()
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    widget.set_frame(frame)
+    assert not widget._repaint_timer.isActive()
+    widget.set_frame(frame)
+    assert widget._repaint_timer.isActive() # The second frame waits for the next repaint slot
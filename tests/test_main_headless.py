@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from main_headless import HeadlessRunner
+from tests.core.test_frame_pipeline import MockFaceLandmarks
+
+
+class FakeWebcam:
+    threaded = False
+    def __init__(self, frames): self.frames = frames; self.last_timestamp = None; self.released = False
+    def read_frame(self):
+        if self.frames == 0: return False, None
+        self.frames -= 1
+        self.last_timestamp = (self.last_timestamp or 0.0) + 1 / 30
+        return True, np.zeros((20, 20, 3), dtype=np.uint8)
+    def is_opened(self): return self.frames > 0
+    def release(self): self.released = True
+
+
+@pytest.fixture
+def config_manager(mocker):
+    manager = mocker.Mock()
+    manager.DEFAULT_CONFIG = {"thresholds": {"mouth_open": 0.35}}
+    manager.get_thresholds.return_value = {"mouth_open": 0.35}
+    manager.get_neutral_ratios.return_value = {}
+    manager.get_enabled_gestures.return_value = {"mouth_open": True}
+    manager.get_actions.return_value = {"mouth_open": {"type": "press", "value": "a"}}
+    manager.get_setting.side_effect = lambda key, default=None: {"hold_ms": 60, "output_backend": "recording"}.get(key, default)
+    return manager
+
+@pytest.fixture
+def runner(mocker, config_manager):
+    face = MockFaceLandmarks()
+    face.set_landmark(33, 0.2, 0.4); face.set_landmark(263, 0.8, 0.4); face.set_landmark(13, 0.5, 0.6); face.set_landmark(14, 0.5, 0.9)
+    runner = HeadlessRunner(config_manager, stats_interval_s=0)
+    runner.webcam = runner.pipeline.webcam = FakeWebcam(6)
+    runner.detector = runner.pipeline.detector = mocker.Mock()
+    runner.detector.detect_landmarks.return_value = mocker.Mock(multi_face_landmarks=[face])
+    runner.interval_s = 0.0
+    runner.action_dispatcher.start()
+    yield runner
+    runner.close()
+
+
+def test_runner_processes_frames_and_triggers_until_source_ends(runner):
+    processed = runner.run()
+
+    assert processed == 6
+    assert runner.action_dispatcher.backend.wait_for_events(2)
+    assert "6 frames" in runner.format_stats() and "face in 100%" in runner.format_stats()
+
+def test_request_stop_ends_the_loop(runner):
+    runner.request_stop()
+
+    assert runner.run() == 0
+
+def test_close_releases_source_and_detector(runner, config_manager):
+    webcam, detector = runner.webcam, runner.detector
+    runner.close()
+
+    assert webcam.released
+    detector.close.assert_called_once()
+    config_manager.close.assert_called()
+
+def test_import_does_not_load_qt():
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    code = "import sys, main_headless; print(sorted({m.split('.')[0] for m in sys.modules if m.startswith('PyQt')}))"
+
+    output = subprocess.run([sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"